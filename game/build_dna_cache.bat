@@ -0,0 +1,9 @@
+@echo off
+
+title CIO DNA Cache
+
+echo Building the AI DNA cache...
+echo -----------------------------------
+
+%OPENCIOENGINE%\python\ppython.exe -m src.coginvasion.ai.AIStart --build-dna-cache
+pause
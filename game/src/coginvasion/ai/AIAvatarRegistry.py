@@ -0,0 +1,158 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file AIAvatarRegistry.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+
+from src.coginvasion.globals.CIGlobals import ToonClasses
+
+KIND_NPC = 0
+KIND_TOON = 1
+
+def getAvatarKind(avatar):
+    if avatar.__class__.__name__ in ToonClasses:
+        return KIND_TOON
+    return KIND_NPC
+
+class ZoneAvatars:
+    """
+    The avatars in a single zone. Adding and removing are O(1).
+
+    Iterating gives a snapshot, so it is safe to add or remove avatars
+    while iterating (an avatar being killed and deleted mid-loop, for example).
+    """
+
+    def __init__(self, zoneId):
+        self.zoneId = zoneId
+        # id(avatar) -> avatar
+        self.avatars = {}
+        self.numToons = 0
+        self.snapshot = None
+
+    def __iter__(self):
+        if self.snapshot is None:
+            self.snapshot = tuple(self.avatars.values())
+        return iter(self.snapshot)
+
+    def __len__(self):
+        return len(self.avatars)
+
+    def __contains__(self, avatar):
+        return id(avatar) in self.avatars
+
+    def add(self, avatar, kind):
+        self.avatars[id(avatar)] = avatar
+        if kind == KIND_TOON:
+            self.numToons += 1
+        self.snapshot = None
+
+    def remove(self, avatar, kind):
+        del self.avatars[id(avatar)]
+        if kind == KIND_TOON:
+            self.numToons -= 1
+        self.snapshot = None
+
+    def getNumToons(self):
+        return self.numToons
+
+    def getNumNPCs(self):
+        return len(self.avatars) - self.numToons
+
+    def getToons(self):
+        return [av for av in self if getAvatarKind(av) == KIND_TOON]
+
+    def getNPCs(self):
+        return [av for av in self if getAvatarKind(av) == KIND_NPC]
+
+class AIAvatarRegistry:
+    """
+    Keeps track of every DistributedAvatarAI on the district, indexed by zone.
+    A zone is only kept while it has avatars in it.
+
+    Listeners can accept these events instead of polling for toons:
+        ToonEnterEvent  [toon, zoneId]  a toon entered a zone
+        ToonLeaveEvent  [toon, zoneId]  a toon left a zone
+    """
+
+    notify = directNotify.newCategory("AIAvatarRegistry")
+
+    ToonEnterEvent = 'AIAvatarRegistry-toonEnter'
+    ToonLeaveEvent = 'AIAvatarRegistry-toonLeave'
+
+    def __init__(self):
+        # zoneId -> ZoneAvatars
+        self.zones = {}
+        # id(avatar) -> (zoneId, kind)
+        self.av2zone = {}
+
+    def getAvatars(self, zoneId):
+        return self.zones.get(zoneId, ())
+
+    def getNumAvatars(self):
+        return len(self.av2zone)
+
+    def getNumToons(self, zoneId):
+        zone = self.zones.get(zoneId, None)
+        if zone is None:
+            return 0
+        return zone.getNumToons()
+
+    def hasToons(self, zoneId):
+        return self.getNumToons(zoneId) > 0
+
+    def getZoneOf(self, avatar):
+        entry = self.av2zone.get(id(avatar), None)
+        if entry is None:
+            return None
+        return entry[0]
+
+    def isRegistered(self, avatar):
+        return id(avatar) in self.av2zone
+
+    def add(self, avatar, zoneId):
+        """Puts the avatar in the zone, taking it out of any zone it was already in."""
+
+        entry = self.av2zone.get(id(avatar), None)
+        if entry is not None:
+            if entry[0] == zoneId:
+                return
+            self.remove(avatar)
+
+        kind = getAvatarKind(avatar)
+        zone = self.zones.get(zoneId, None)
+        if zone is None:
+            zone = ZoneAvatars(zoneId)
+            self.zones[zoneId] = zone
+        zone.add(avatar, kind)
+        self.av2zone[id(avatar)] = (zoneId, kind)
+
+        if kind == KIND_TOON:
+            messenger.send(self.ToonEnterEvent, [avatar, zoneId])
+
+    def remove(self, avatar):
+        """Takes the avatar out of its zone. Returns the zone it was in, or None."""
+
+        entry = self.av2zone.pop(id(avatar), None)
+        if entry is None:
+            return None
+
+        zoneId, kind = entry
+        zone = self.zones[zoneId]
+        zone.remove(avatar, kind)
+        if len(zone) == 0:
+            # Don't hang on to every zone that's ever been visited.
+            del self.zones[zoneId]
+
+        if kind == KIND_TOON:
+            messenger.send(self.ToonLeaveEvent, [avatar, zoneId])
+
+        return zoneId
+
+    def move(self, avatar, zoneId):
+        self.add(avatar, zoneId)
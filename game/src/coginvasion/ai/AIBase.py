@@ -23,6 +23,9 @@ from panda3d.core import VirtualFileSystem, NodePath, GraphicsEngine
 from panda3d.core import ClockObject, TrueClock, Notify, PandaNode
 from pandac.PandaModules import getConfigShowbase
 
+from AITaskStats import AITaskStats
+from AITickLimiter import AITickLimiter
+
 class AIBase:
 	notify = directNotify.newCategory("AIBase")
 
@@ -51,12 +54,21 @@ class AIBase:
 		__builtins__['globalClock'] = globalClock
 		__builtins__['vfs'] = vfs
 		__builtins__['hidden'] = self.hidden
+		self.taskStats = AITaskStats(self.config.GetBool('ai-task-stats', True),
+			self.config.GetFloat('ai-task-stats-report-interval', 0.0))
+		# The AI runs at a fixed tick rate, sleeping only for what's left of each tick.
+		# If server-ticks is 0, we fall back to sleeping ai-sleep seconds every frame.
+		self.tickLimiter = AITickLimiter(self.taskStats, self.config.GetFloat('server-ticks', 30),
+			self.config.GetInt('ai-max-catchup-ticks', 3))
 		self.restart()
 
 	def __sleepCycleTask(self, task):
 		time.sleep(self.AISleep)
 		return Task.cont
 
+	def getTaskStats(self):
+		return self.taskStats
+
 	def __resetPrevTransform(self, state):
 		PandaNode.resetAllPrevTransform()
 		return Task.cont
@@ -88,7 +100,9 @@ class AIBase:
 		self.taskMgr.add(self.__resetPrevTransform, 'resetPrevTransform', priority=-51)
 		self.taskMgr.add(self.__ivalLoop, 'ivalLoop', priority=20)
 		self.taskMgr.add(self.__igLoop, 'igLoop', priority=50)
-		if self.AISleep >= 0:
+		if self.tickLimiter.isEnabled():
+			self.tickLimiter.start()
+		elif self.AISleep >= 0:
 			self.taskMgr.add(self.__sleepCycleTask, 'aiSleep', priority=55)
 		self.eventMgr.restart()
 
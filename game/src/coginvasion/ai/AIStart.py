@@ -50,6 +50,7 @@ parser.add_argument('--max-channels', help='The number of channels the server ma
 parser.add_argument('--stateserver', help="The control channel of this UD's designated State Server.")
 parser.add_argument('--astron-ip', help="The IP address of the Astron Message Director to connect to.")
 parser.add_argument('--eventlogger-ip', help="The IP address of the Astron Event Logger to log to.")
+parser.add_argument('--build-dna-cache', action='store_true', help="Parse the DNA of every hood into the DNA cache and exit.")
 parser.add_argument('config', nargs='*', default = ['config/config_server.prc'], help = "PRC file(s) to load.")
 args = parser.parse_args()
 __builtins__.args = args
@@ -77,8 +78,14 @@ loadPrcFileData('', 'audio-library-name none')
 
 from direct.showbase.ShowBase import ShowBase
 base = ShowBase()
+
 # Limit server to a certain number of ticks per second
-#base.setSleep(1 / base.config.GetFloat('server-ticks', 30))
+from src.coginvasion.ai.AITaskStats import AITaskStats
+from src.coginvasion.ai.AITickLimiter import AITickLimiter
+base.taskStats = AITaskStats(config.GetBool('ai-task-stats', True), config.GetFloat('ai-task-stats-report-interval', 0.0))
+base.tickLimiter = AITickLimiter(base.taskStats, config.GetFloat('server-ticks', 30), config.GetInt('ai-max-catchup-ticks', 3))
+if base.tickLimiter.isEnabled():
+	base.tickLimiter.start()
 
 from p3recastnavigation import RNNavMeshManager
 
@@ -92,6 +99,11 @@ base.nmMgr = nmMgr
 from direct.distributed.ClockDelta import globalClockDelta
 __builtins__.globalClockDelta = globalClockDelta
 
+if args.build_dna_cache:
+	from src.coginvasion.dna.DNACacheAI import buildDNACache
+	buildDNACache()
+	sys.exit(0)
+
 from src.coginvasion.ai.CogInvasionAIRepository import CogInvasionAIRepository as CIAIR
 base.air = CIAIR(config.GetInt('air-base-channel', 401000000), config.GetInt('air-stateserver', 10000))\
 # We deal with attacks on the server side as well
@@ -0,0 +1,175 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file AITaskStats.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+from direct.task.TaskManagerGlobal import taskMgr
+
+class TaskTiming:
+
+    def __init__(self, name):
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def getAverage(self):
+        if self.calls == 0:
+            return 0.0
+        return self.total / self.calls
+
+class AITaskStats:
+    """
+    Timings of the AI server's tick and the per-frame tasks that run inside it.
+
+    Tasks are timed by category (all of the MotorUpdate tasks share one entry,
+    for example), so getStats() tells you which kind of work is eating the tick
+    budget. If `reportInterval` is above 0, a report is logged every that many seconds.
+    """
+
+    notify = directNotify.newCategory("AITaskStats")
+
+    ReportTaskName = "AITaskStats.report"
+
+    def __init__(self, enabled = True, reportInterval = 0.0):
+        # Created by AIBase before the config builtin exists, so it's handed the settings.
+        self.enabled = enabled
+        self.reportInterval = reportInterval
+
+        # category -> TaskTiming
+        self.timings = {}
+
+        self.resetTicks()
+
+        self.reportTask = None
+        if self.enabled and self.reportInterval > 0:
+            self.reportTask = taskMgr.doMethodLater(self.reportInterval, self.__reportTask, self.ReportTaskName)
+
+    def cleanup(self):
+        if self.reportTask:
+            self.reportTask.remove()
+            self.reportTask = None
+        self.timings = None
+
+    def resetTicks(self):
+        self.ticks = 0
+        self.tickWork = TaskTiming('work')
+        self.tickSleep = 0.0
+        self.overruns = 0
+        self.catchUpTicks = 0
+        self.droppedTicks = 0
+
+    def reset(self):
+        for timing in self.timings.values():
+            timing.reset()
+        self.resetTicks()
+
+    def getTiming(self, category):
+        timing = self.timings.get(category, None)
+        if timing is None:
+            timing = TaskTiming(category)
+            self.timings[category] = timing
+        return timing
+
+    def record(self, category, seconds):
+        if self.enabled:
+            self.getTiming(category).record(seconds)
+
+    def wrap(self, category, func):
+        """
+        Returns `func` timed under `category`, for passing to taskMgr.add().
+        Returns `func` itself when stats are turned off, so there is no cost.
+        """
+
+        if not self.enabled:
+            return func
+
+        timing = self.getTiming(category)
+        clock = globalClock.getRealTime
+
+        def timedTask(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timing.record(clock() - start)
+
+        return timedTask
+
+    def recordTick(self, work, sleep, behind, catchUp, dropped):
+        """Called by the AITickLimiter at the end of every tick."""
+
+        self.ticks += 1
+        self.tickWork.record(work)
+        self.tickSleep += sleep
+        if behind:
+            self.overruns += 1
+        if catchUp:
+            self.catchUpTicks += 1
+        self.droppedTicks += dropped
+
+    def getStats(self):
+        """
+        Returns a dictionary of:
+            'tick'  : totals for the AI tick itself
+            'tasks' : category -> calls, total, avg, max and perTick (seconds per tick)
+        """
+
+        ticks = max(1, self.ticks)
+
+        tasks = {}
+        for category, timing in self.timings.items():
+            tasks[category] = {
+                'calls'     : timing.calls,
+                'total'     : timing.total,
+                'avg'       : timing.getAverage(),
+                'max'       : timing.max,
+                'perTick'   : timing.total / ticks
+            }
+
+        tick = {
+            'ticks'        : self.ticks,
+            'avgWork'      : self.tickWork.getAverage(),
+            'maxWork'      : self.tickWork.max,
+            'avgSleep'     : self.tickSleep / ticks,
+            'overruns'     : self.overruns,
+            'catchUpTicks' : self.catchUpTicks,
+            'droppedTicks' : self.droppedTicks
+        }
+
+        return {'tick': tick, 'tasks': tasks}
+
+    def report(self):
+        stats = self.getStats()
+        tick = stats['tick']
+        self.notify.info("{0} ticks: avg work {1:.2f}ms, max work {2:.2f}ms, avg sleep {3:.2f}ms, "
+                         "{4} overruns, {5} catch-up ticks, {6} dropped ticks".format(
+                            tick['ticks'], tick['avgWork'] * 1000, tick['maxWork'] * 1000,
+                            tick['avgSleep'] * 1000, tick['overruns'], tick['catchUpTicks'],
+                            tick['droppedTicks']))
+
+        tasks = sorted(stats['tasks'].items(), key = lambda item: item[1]['total'], reverse = True)
+        for category, timing in tasks:
+            self.notify.info("    {0}: {1:.2f}ms per tick, {2} calls, avg {3:.3f}ms, max {4:.2f}ms".format(
+                category, timing['perTick'] * 1000, timing['calls'],
+                timing['avg'] * 1000, timing['max'] * 1000))
+
+    def __reportTask(self, task):
+        self.report()
+        self.reset()
+        return task.again
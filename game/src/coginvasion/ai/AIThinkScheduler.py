@@ -0,0 +1,189 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file AIThinkScheduler.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+from direct.task import Task
+
+from src.coginvasion.cog.ai.StatesAI import STATE_NONE, STATE_IDLE
+
+import random
+
+class ThinkEntry:
+    # NPCs are NodePaths, which hash and compare by node. Entries are
+    # compared by identity instead, so an NPC whose node has already
+    # been removed can still be found and unscheduled.
+
+    def __init__(self, npc, nextThink, index):
+        self.npc = npc
+        self.nextThink = nextThink
+        # Where the entry is in AIThinkScheduler.entries.
+        self.index = index
+
+class AIThinkScheduler:
+    """
+    Runs the think step of every NPC on the AI server from a single task.
+
+    NPCs in combat think at the combat rate (every frame by default), idle
+    NPCs think at a reduced rate, and NPCs in a zone with no toons don't think
+    at all. The think work done each frame is capped by a time budget; NPCs
+    that didn't get a turn are first in line on the next frame. New NPCs are
+    given a random phase so that a batch of spawns doesn't think on the same frame.
+    """
+
+    notify = directNotify.newCategory("AIThinkScheduler")
+
+    TaskName = "AIThinkScheduler.update"
+    TaskSort = 20
+
+    def __init__(self, air):
+        self.air = air
+
+        # Seconds between thinks for each kind of NPC. 0 means every frame.
+        self.combatInterval = config.GetFloat('ai-think-interval-combat', 0.0)
+        self.idleInterval = config.GetFloat('ai-think-interval-idle', 0.25)
+        # Seconds of think work allowed per frame.
+        self.frameBudget = config.GetFloat('ai-think-budget', 0.008)
+        self.suspendEmptyZones = config.GetBool('ai-think-suspend-empty-zones', True)
+
+        # Round-robin order of ThinkEntries.
+        self.entries = []
+        # id(npc) -> ThinkEntry, which knows its index in the entries
+        self.npc2entry = {}
+        self.cursor = 0
+
+        self.resetStats()
+
+        self.task = None
+
+    def resetStats(self):
+        self.stats = {
+            'thinks'     : 0,
+            'suspended'  : 0,
+            'overBudget' : 0,
+            'maxTime'    : 0.0
+        }
+
+    def getStats(self):
+        stats = dict(self.stats)
+        stats['npcs'] = len(self.entries)
+        return stats
+
+    def start(self):
+        self.stop()
+        self.task = taskMgr.add(self.__update, self.TaskName, sort = self.TaskSort)
+
+    def stop(self):
+        if self.task:
+            self.task.remove()
+            self.task = None
+
+    def cleanup(self):
+        self.stop()
+        self.entries = None
+        self.npc2entry = None
+        self.air = None
+
+    def addNPC(self, npc):
+        if id(npc) in self.npc2entry:
+            return
+
+        # Spread out NPCs that start at the same time across frames.
+        entry = ThinkEntry(npc, globalClock.getFrameTime() + random.uniform(0, self.idleInterval), len(self.entries))
+        self.npc2entry[id(npc)] = entry
+        self.entries.append(entry)
+
+        if not self.task:
+            self.start()
+
+    def removeNPC(self, npc):
+        entry = self.npc2entry.pop(id(npc), None)
+        if not entry:
+            return
+
+        # Fill the hole with the last entry. If that puts it behind the cursor
+        # it just waits for the next time around.
+        last = self.entries.pop()
+        if last is not entry:
+            self.entries[entry.index] = last
+            last.index = entry.index
+
+        if len(self.entries) == 0:
+            self.stop()
+
+    def hasNPC(self, npc):
+        return id(npc) in self.npc2entry
+
+    def wake(self, npc):
+        """Makes the NPC think on the next frame, no matter what its rate is."""
+        entry = self.npc2entry.get(id(npc), None)
+        if entry:
+            entry.nextThink = 0.0
+
+    def getThinkInterval(self, npc):
+        if npc.npcState in (STATE_NONE, STATE_IDLE):
+            return self.idleInterval
+        return self.combatInterval
+
+    def isZoneActive(self, zoneId):
+        return self.air.toonsAreInZone(zoneId)
+
+    def __isSuspended(self, npc):
+        if not self.suspendEmptyZones or not npc.battleZone:
+            return False
+        return not self.isZoneActive(npc.battleZone.zoneId)
+
+    def __update(self, task):
+        numNPCs = len(self.entries)
+        if numNPCs == 0:
+            return Task.cont
+
+        now = globalClock.getFrameTime()
+        clock = globalClock.getRealTime
+        start = clock()
+        thought = 0
+        thinkTiming = base.taskStats.getTiming('BaseNPCAI.runAITask') if base.taskStats.enabled else None
+
+        # Visit every NPC at most once, starting where we left off last frame.
+        for _ in xrange(numNPCs):
+            if len(self.entries) == 0:
+                break
+
+            if self.cursor >= len(self.entries):
+                self.cursor = 0
+
+            entry = self.entries[self.cursor]
+
+            if now < entry.nextThink:
+                self.cursor += 1
+                continue
+
+            if self.__isSuspended(entry.npc):
+                self.stats['suspended'] += 1
+                self.cursor += 1
+                continue
+
+            if thought > 0 and (clock() - start) >= self.frameBudget:
+                # Out of time, the rest of the due NPCs go first next frame.
+                self.stats['overBudget'] += 1
+                break
+
+            entry.nextThink = now + self.getThinkInterval(entry.npc)
+            self.cursor += 1
+
+            thinkStart = clock()
+            entry.npc.runAI()
+            if thinkTiming:
+                thinkTiming.record(clock() - thinkStart)
+            thought += 1
+
+        self.stats['thinks'] += thought
+        self.stats['maxTime'] = max(self.stats['maxTime'], clock() - start)
+
+        return Task.cont
@@ -0,0 +1,76 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file AITickLimiter.py
+@author agent
+@date October 18, 2026
+
+"""
+
+import time
+
+from direct.task import Task
+from direct.task.TaskManagerGlobal import taskMgr
+
+from panda3d.core import TrueClock
+
+class AITickLimiter:
+    """
+    Holds a server to a fixed tick rate, sleeping only for what's left of each tick.
+    A late tick starts the next one right away, unless we are more than `maxCatchUpTicks`
+    behind, in which case the ticks we missed are dropped. Every tick is recorded into `taskStats`.
+    """
+
+    TaskName = 'aiSleep'
+
+    def __init__(self, taskStats, tickRate, maxCatchUpTicks = 3):
+        self.taskStats = taskStats
+        self.tickRate = tickRate
+        self.tickInterval = 1.0 / tickRate if tickRate > 0 else 0.0
+        self.maxCatchUpTicks = maxCatchUpTicks
+        self.trueClock = TrueClock.getGlobalPtr()
+        self.nextTickTime = None
+        self.tickStartTime = None
+
+    def isEnabled(self):
+        return self.tickInterval > 0
+
+    def start(self):
+        self.stop()
+        self.nextTickTime = None
+        # Runs last, so the rest of the frame is measured as the tick's work.
+        taskMgr.add(self.__tickTask, self.TaskName, sort = 100)
+
+    def stop(self):
+        taskMgr.remove(self.TaskName)
+
+    def __tickTask(self, task):
+        now = self.trueClock.getShortTime()
+        if self.nextTickTime is None:
+            self.nextTickTime = now
+            self.tickStartTime = now
+
+        work = now - self.tickStartTime
+        self.nextTickTime += self.tickInterval
+
+        sleep = 0.0
+        catchUp = False
+        dropped = 0
+        behind = now - self.nextTickTime
+
+        if behind <= 0:
+            # Made it with time to spare, sleep for the rest of the tick.
+            sleep = -behind
+            time.sleep(sleep)
+        elif behind <= self.tickInterval * self.maxCatchUpTicks:
+            # Running late, start the next tick right away to catch up.
+            catchUp = True
+        else:
+            # Too far behind to catch up, forget about the ticks we missed.
+            dropped = int(behind / self.tickInterval)
+            self.nextTickTime = now
+
+        self.tickStartTime = self.trueClock.getShortTime()
+        self.taskStats.recordTick(work, sleep, work > self.tickInterval, catchUp, dropped)
+        return Task.cont
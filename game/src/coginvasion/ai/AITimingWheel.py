@@ -0,0 +1,104 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file AITimingWheel.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+from direct.task.TaskManagerGlobal import taskMgr
+
+import math
+
+class AITimingWheel:
+    """
+    Runs callbacks after a delay, for a lot of objects at once, with a single task.
+
+    Timers are put into one of `numSlots` slots, `slotTime` seconds apart, and the
+    wheel turns one slot every `slotTime` seconds. Timers further out than a full turn
+    wait for as many turns as they need. A callback can be late by up to `slotTime`.
+    The task only runs while there are timers on the wheel.
+    """
+
+    notify = directNotify.newCategory("AITimingWheel")
+
+    def __init__(self, name, slotTime = 0.25, numSlots = 64):
+        self.name = name
+        self.slotTime = slotTime
+        self.numSlots = numSlots
+
+        # Each slot maps a key to [turnsLeft, callback, extraArgs].
+        self.slots = [{} for _ in xrange(numSlots)]
+        # key -> index of the slot it's in
+        self.key2slot = {}
+        self.cursor = 0
+
+        self.task = None
+
+    def getTaskName(self):
+        return 'AITimingWheel-{0}'.format(self.name)
+
+    def getNumTimers(self):
+        return len(self.key2slot)
+
+    def hasTimer(self, key):
+        return key in self.key2slot
+
+    def schedule(self, key, delay, callback, extraArgs = []):
+        """
+        Calls `callback(*extraArgs)` in `delay` seconds. There is one timer per key,
+        scheduling an existing key again replaces its timer.
+        """
+
+        self.cancel(key)
+
+        ticks = max(1, int(math.ceil(delay / self.slotTime)))
+        turns, offset = divmod(ticks - 1, self.numSlots)
+        slot = (self.cursor + offset + 1) % self.numSlots
+
+        self.slots[slot][key] = [turns, callback, extraArgs]
+        self.key2slot[key] = slot
+
+        if not self.task:
+            self.task = taskMgr.doMethodLater(self.slotTime, self.__turn, self.getTaskName())
+
+    def cancel(self, key):
+        slot = self.key2slot.pop(key, None)
+        if slot is not None:
+            del self.slots[slot][key]
+            if not self.key2slot:
+                self.stop()
+
+    def stop(self):
+        if self.task:
+            self.task.remove()
+            self.task = None
+
+    def __turn(self, task):
+        self.cursor = (self.cursor + 1) % self.numSlots
+        slot = self.slots[self.cursor]
+
+        due = []
+        for key, timer in slot.items():
+            if timer[0] > 0:
+                timer[0] -= 1
+                continue
+            del slot[key]
+            del self.key2slot[key]
+            due.append(timer)
+
+        for _, callback, extraArgs in due:
+            callback(*extraArgs)
+
+        if not self.key2slot:
+            self.task = None
+            return task.done
+        return task.again
+
+    def cleanup(self):
+        self.stop()
+        self.slots = None
+        self.key2slot = None
@@ -7,6 +7,8 @@ from panda3d.core import NodePath, CollisionTraverser
 
 from src.coginvasion.globals import CIGlobals
 
+from AITimingWheel import AITimingWheel
+
 class AIZoneData:
     notify = directNotify.newCategory('AIZoneData')
 
@@ -65,6 +67,9 @@ class AIZoneDataObj:
 
         del self._collTravsStarted
         del self._collTravs
+        if hasattr(self, '_timingWheel'):
+            self._timingWheel.cleanup()
+            del self._timingWheel
         if hasattr(self, '_nonCollidableParent'):
             self._nonCollidableParent.removeNode()
             del self._nonCollidableParent
@@ -105,6 +110,13 @@ class AIZoneDataObj:
             self._parentMgr.registerParent(CIGlobals.SPRender, self.getRender())
         return self._parentMgr
 
+    def getTimingWheel(self):
+        # Shared by the objects in the zone for their short timers, so that they don't need a task each.
+        if not hasattr(self, '_timingWheel'):
+            self._timingWheel = AITimingWheel('%s-%s' % (self._parentId, self._zoneId),
+                                              config.GetFloat('ai-timing-wheel-slot-time', 0.25))
+        return self._timingWheel
+
     def hasCollTrav(self, name = None):
         if name is None:
             name = AIZoneDataObj.DefaultCTravName
@@ -28,11 +28,15 @@ from src.coginvasion.hood.DDHoodAI import DDHoodAI
 from src.coginvasion.cogtropolis.CTHoodAI import CTHoodAI
 
 from src.coginvasion.phys import PhysicsUtils
+from src.coginvasion.dna.DNACacheAI import DNACacheAI
+from src.coginvasion.battle.BSPLevelCacheAI import BSPLevelCacheAI
 
 from panda3d.core import UniqueIdAllocator
 from src.coginvasion.hood import ZoneUtil
-from src.coginvasion.globals.CIGlobals import ToonClasses
 from AIZoneData import AIZoneDataStore
+from AIAvatarRegistry import AIAvatarRegistry
+from AIThinkScheduler import AIThinkScheduler
+from ZoneActivationManagerAI import ZoneActivationManagerAI
 from direct.directnotify.DirectNotifyGlobal import directNotify
 from src.coginvasion.distributed.CogInvasionDoGlobals import (DO_ID_DISTRICT_NAME_MANAGER,
                                                               DO_ID_HOLIDAY_MANAGER,
@@ -60,8 +64,9 @@ class CogInvasionAIRepository(CogInvasionInternalRepository):
                                             ZoneUtil.DynamicZonesEnd)
         self.zoneDataStore = AIZoneDataStore()
         self.hoods = {}
-        self.dnaStoreMap = {}
+        # zoneId -> DNAZoneDataAI of the street or playground
         self.dnaDataMap = {}
+        self.dnaCache = DNACacheAI(enabled = config.GetBool('ai-dna-cache', True))
         self.districtNameMgr = self.generateGlobalObject(DO_ID_DISTRICT_NAME_MANAGER, 'DistrictNameManager')
         self.holidayMgr = self.generateGlobalObject(DO_ID_HOLIDAY_MANAGER, 'HolidayManager')
         self.uin = self.generateGlobalObject(DO_ID_UNIQUE_INTEREST_NOTIFIER, 'UniqueInterestNotifier')
@@ -69,11 +74,20 @@ class CogInvasionAIRepository(CogInvasionInternalRepository):
         self.statsMgr = self.generateGlobalObject(DO_ID_STATS_MANAGER, 'StatsManager')
         
         # Anything that is a DistributedAvatarAI (Toons, Suits, etc).
-        # This is a per-zone list of avatars.
-        self.avatars = {}
-        self.numAvatars = 0
+        # `avatars` maps a zone to the ZoneAvatars in it, only for zones that have avatars,
+        # use getAvatarsInZone() to look one up.
+        self.avatarRegistry = AIAvatarRegistry()
+        self.avatars = self.avatarRegistry.zones
 
         self.battleZones = {}
+        # Level data shared by the battle zones of this process, see BSPLevelCacheAI.
+        self.bspLevelCache = BSPLevelCacheAI()
+
+        # Runs the think step of every NPC, see AIThinkScheduler.
+        self.aiScheduler = AIThinkScheduler(self)
+
+        # Makes playgrounds and streets when toons show up in them, see ZoneActivationManagerAI.
+        self.zoneActivationMgr = ZoneActivationManagerAI(self)
         
         if DO_SIMULATION:
             self.zonePhysics = {}
@@ -82,8 +96,9 @@ class CogInvasionAIRepository(CogInvasionInternalRepository):
             self.bspLoader.setMaterialsFile("phase_14/etc/materials.txt")
             #self.bspLoader.setTextureContentsFile("phase_14/etc/texturecontents.txt")
             #self.bspLoader.setServerEntityDispatcher(self)
-            self.bspLoader.read("phase_14/etc/sewer_entrance_room_indoors/sewer_entrance_room_indoors.bsp")
-            PhysicsUtils.makeBulletCollFromGeoms(self.bspLoader.getResult(), enableNow = False)
+            levelFile = "phase_14/etc/sewer_entrance_room_indoors/sewer_entrance_room_indoors.bsp"
+            self.bspLoader.read(levelFile)
+            PhysicsUtils.makeBulletCollFromGeoms(self.bspLoader.getResult(), enableNow = False, levelFile = levelFile)
 
     def getBattleZone(self, zoneId):
         return self.battleZones.get(zoneId, None)
@@ -116,11 +131,7 @@ class CogInvasionAIRepository(CogInvasionInternalRepository):
             else:
                 zoneId = avatar.zoneId
         
-        if not zoneId in self.avatars:
-            self.avatars[zoneId] = []
-            
-        self.avatars[zoneId].append(avatar)
-        self.numAvatars += 1
+        self.avatarRegistry.add(avatar, zoneId)
 
         if zoneId in self.battleZones:
             print "Adding avatar to battle zone at {0}".format(zoneId)
@@ -156,19 +167,7 @@ class CogInvasionAIRepository(CogInvasionInternalRepository):
                 self.zonePhysics[zoneId] = physicsWorld
         
     def removeAvatar(self, avatar):
-        removed = False
-
-        zoneOfAv = 0
-        
-        for zoneId in self.avatars.keys():
-            if avatar in self.avatars[zoneId]:
-                self.avatars[zoneId].remove(avatar)
-                zoneOfAv = zoneId
-                removed = True
-                break
-                
-        if removed:
-            self.numAvatars -= 1
+        zoneOfAv = self.avatarRegistry.remove(avatar)
 
         if avatar.battleZone:
             print "Removing avatar from battle zone at {0}".format(zoneOfAv)
@@ -208,16 +207,22 @@ class CogInvasionAIRepository(CogInvasionInternalRepository):
         area = self.areas[self.areaIndex]
         area(self)
         self.areaIndex += 1
-        task.delayTime = 0.5
-        return task.again
+        if self.dnaCache.isDirty():
+            # This hood had to parse its DNA, give the district a breather before the next one.
+            task.delayTime = 0.5
+            return task.again
+        return task.cont
 
     def done(self):
+        # Remember any DNA we had to parse for the next time we start.
+        self.dnaCache.save()
+
         self.notify.info("Setting shard available.")
         self.district.b_setAvailable(1)
         self.notify.info("Done.")
         
         if DO_SIMULATION:
-            print "There are {0} avatars.".format(self.numAvatars)
+            print "There are {0} avatars.".format(self.avatarRegistry.getNumAvatars())
             print "There are {0} zones.".format(len(self.zonePhysics.keys()))
         
             taskMgr.add(self.__update, "AIUpdate")
@@ -231,18 +236,22 @@ class CogInvasionAIRepository(CogInvasionInternalRepository):
         self.holidayMgr.d_srvRequestHoliday()
 
     def toonsAreInZone(self, zoneId):
-        numToons = 0
-        for obj in self.doId2do.values():
-            if obj.__class__.__name__ in ToonClasses:
-                if obj.zoneId == zoneId:
-                    numToons += 1
-        return numToons > 0
+        return self.avatarRegistry.hasToons(zoneId)
+
+    def getNumToonsInZone(self, zoneId):
+        return self.avatarRegistry.getNumToons(zoneId)
+
+    def getAvatarsInZone(self, zoneId):
+        return self.avatarRegistry.getAvatars(zoneId)
 
     def shutdown(self):
         if DO_SIMULATION:
             taskMgr.remove("AIUpdate")
+        self.aiScheduler.stop()
+        self.zoneActivationMgr.cleanup()
         for hood in self.hoods.values():
             hood.shutdown()
+        self.bspLevelCache.cleanup()
         if self.timeManager:
             self.timeManager.requestDelete()
             self.timeManager = None
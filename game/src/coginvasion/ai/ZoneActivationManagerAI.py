@@ -0,0 +1,109 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file ZoneActivationManagerAI.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+from direct.showbase.DirectObject import DirectObject
+from direct.task import Task
+
+from AIAvatarRegistry import AIAvatarRegistry
+
+class ZoneActivationManagerAI(DirectObject):
+    """
+    Generates the objects of a playground or street when the first toon shows up in it,
+    and deletes them again once it has been empty for a while.
+
+    An area is a playground or street together with its visgroups and building interiors,
+    so a toon walking from a street into one of its buildings keeps the street alive.
+    The hood decides what an area holds, see HoodAI.activateArea() and deactivateArea().
+    Turned on with ai-lazy-zones, otherwise every area is made when the district starts.
+    """
+
+    notify = directNotify.newCategory("ZoneActivationManagerAI")
+
+    def __init__(self, air):
+        self.air = air
+        self.enabled = config.GetBool('ai-lazy-zones', False)
+        # Seconds an area stays up after its last toon left.
+        self.idleTime = config.GetFloat('ai-lazy-zone-idle-time', 300.0)
+
+        # Area zoneId -> HoodAI that owns it
+        self.areas = {}
+        # Area zoneId -> number of toons in it
+        self.numToons = {}
+        self.started = False
+
+    def isEnabled(self):
+        return self.enabled
+
+    @staticmethod
+    def getAreaZone(zoneId):
+        """
+        Returns the playground or street zoneId that `zoneId` belongs to.
+        Visgroups and interiors of a street (2105, 2601) belong to the street (2100),
+        interiors of a playground (2501) belong to the playground (2000).
+        """
+
+        area = zoneId - (zoneId % 100)
+        if area % 1000 >= 500:
+            area -= 500
+        return area
+
+    def addArea(self, zoneId, hood):
+        self.areas[zoneId] = hood
+        self.numToons.setdefault(zoneId, 0)
+        self.start()
+
+    def start(self):
+        if self.started:
+            return
+        self.started = True
+        self.accept(AIAvatarRegistry.ToonEnterEvent, self.__handleToonEnter)
+        self.accept(AIAvatarRegistry.ToonLeaveEvent, self.__handleToonLeave)
+
+    def getIdleTaskName(self, zoneId):
+        return "ZoneActivationManagerAI-idle-{0}".format(zoneId)
+
+    def __handleToonEnter(self, toon, zoneId):
+        area = self.getAreaZone(zoneId)
+        hood = self.areas.get(area)
+        if not hood:
+            return
+
+        self.numToons[area] += 1
+        taskMgr.remove(self.getIdleTaskName(area))
+        if not hood.isAreaActive(area):
+            self.notify.info("Activating area {0}".format(area))
+            hood.activateArea(area)
+
+    def __handleToonLeave(self, toon, zoneId):
+        area = self.getAreaZone(zoneId)
+        if not area in self.areas:
+            return
+
+        self.numToons[area] = max(0, self.numToons[area] - 1)
+        if self.numToons[area] == 0:
+            taskMgr.doMethodLater(self.idleTime, self.__idleTask, self.getIdleTaskName(area),
+                                  extraArgs = [area], appendTask = True)
+
+    def __idleTask(self, area, task):
+        hood = self.areas.get(area)
+        if hood and self.numToons.get(area, 0) == 0:
+            hood.deactivateArea(area)
+        return Task.done
+
+    def cleanup(self):
+        if self.started:
+            self.ignore(AIAvatarRegistry.ToonEnterEvent)
+            self.ignore(AIAvatarRegistry.ToonLeaveEvent)
+            self.started = False
+        for area in self.areas.keys():
+            taskMgr.remove(self.getIdleTaskName(area))
+        self.areas = {}
+        self.numToons = {}
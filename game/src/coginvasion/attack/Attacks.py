@@ -94,3 +94,12 @@ ATTACK_HOLD_NONE                = 0
 ATTACK_HOLD_LEFT                = 1
 ATTACK_HOLD_RIGHT               = 2
 
+
+# ===============================================
+# Projectiles, simulated by the projectile managers of the battle zones.
+
+PROJECTILE_NONE                 = 0
+PROJECTILE_WHOLECREAMPIE        = 1
+PROJECTILE_GUMBALL              = 2
+PROJECTILE_FIRED                = 3
+PROJECTILE_GENERIC_THROWABLE    = 4
@@ -1,15 +1,14 @@
 from panda3d.core import Point3, Vec3, NodePath, ModelRoot
 
-from direct.distributed.DistributedSmoothNode import DistributedSmoothNode
-
 from src.coginvasion.phys.PhysicsNodePath import BasePhysicsObject
 from src.coginvasion.base.Precache import Precacheable, precacheModel, precacheSound
 from src.coginvasion.attack.BaseProjectileShared import BaseProjectileShared
 
-class BaseProjectile(DistributedSmoothNode, BaseProjectileShared, BasePhysicsObject, Precacheable):
+class BaseProjectile(NodePath, BaseProjectileShared, BasePhysicsObject, Precacheable):
     """
     A projectile.
-    This impl just renders the projectile model at the positions reported by the server.
+    This impl just renders the projectile model along the trajectory the server spawned it with.
+    It is not a distributed object, the ProjectileManager of the battle zone makes and removes it.
     """
 
     ModelPath = None
@@ -20,17 +19,29 @@ class BaseProjectile(DistributedSmoothNode, BaseProjectileShared, BasePhysicsObj
     ImpactSoundPath = None
 
     def __init__(self, cr):
-        DistributedSmoothNode.__init__(self, cr)
+        NodePath.__init__(self, ModelRoot("BaseProjectile"))
         BaseProjectileShared.__init__(self)
         BasePhysicsObject.__init__(self)
-        NodePath.__init__(self, ModelRoot("BaseProjectile"))
 
+        self.cr = cr
+        self.projectileId = None
+        self.manager = None
         self.model = None
         self.impactSound = None
 
+    def setData(self, data):
+        pass
+
+    def setSpawnParams(self, duration, start, end, gravity, timestamp):
+        raise NotImplementedError
+
     def impact(self, pos, lastPos):
         pass
 
+    def ivalFinished(self):
+        if self.manager:
+            self.manager.removeProjectile(self.projectileId)
+
     @classmethod
     def doPrecache(cls):
         if cls.ModelPath:
@@ -38,9 +49,6 @@ class BaseProjectile(DistributedSmoothNode, BaseProjectileShared, BasePhysicsObj
         if cls.ImpactSoundPath:
             precacheSound(cls.ImpactSoundPath)
 
-    def wantsSmoothing(self):
-        return 0
-
     def disable(self):
         self.stopWaterCheck()
         self.cleanupPhysics()
@@ -48,12 +56,10 @@ class BaseProjectile(DistributedSmoothNode, BaseProjectileShared, BasePhysicsObj
             self.model.removeNode()
             self.model = None
         self.impactSound = None
+        self.manager = None
         BaseProjectileShared.cleanup(self)
-        DistributedSmoothNode.disable(self)
 
     def announceGenerate(self):
-        DistributedSmoothNode.announceGenerate(self)
-        self.stopSmooth()
         if self.ImpactSoundPath:
             self.impactSound = base.audio3d.loadSfx(self.ImpactSoundPath)
         if self.ModelPath:
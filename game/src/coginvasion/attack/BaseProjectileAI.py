@@ -1,44 +1,100 @@
-from direct.distributed.DistributedSmoothNodeAI import DistributedSmoothNodeAI
+from panda3d.core import Point3, NodePath
+from panda3d.bullet import BulletSphereShape
 
-from src.coginvasion.phys.WorldColliderAI import WorldColliderAI
 from src.coginvasion.globals import CIGlobals
+from src.coginvasion.attack.Attacks import PROJECTILE_NONE
 from src.coginvasion.attack.BaseProjectileShared import BaseProjectileShared
 
-class BaseProjectileAI(DistributedSmoothNodeAI, BaseProjectileShared, WorldColliderAI):
+class BaseProjectileAI(BaseProjectileShared):
+    """
+    A projectile, simulated by the ProjectileManagerAI of the battle zone it is spawned in.
 
-    WantNPInit = False
+    It is not a distributed object. The manager tells the clients when it is spawned
+    and where it impacts, both sides play out the trajectory from the spawn parameters.
+    """
+
+    ProjectileType = PROJECTILE_NONE
+    Radius = 1.0
+    Mask = CIGlobals.WorldGroup | CIGlobals.CharacterGroup
+
+    # Radius -> sphere used to sweep every projectile of that size.
+    Shapes = {}
 
     def __init__(self, air):
-        DistributedSmoothNodeAI.__init__(self, air)
         BaseProjectileShared.__init__(self)
-        # Defer initialization of WorldCollider, so each projectile
-        # can have a unique WorldCollider setup.
+        self.air = air
+        self.projectileId = None
+        self.manager = None
+        self.spawnTime = 0.0
+        self.pos = Point3(0)
+        self.initialPos = Point3(0)
+        self.lastPos = Point3(0)
+        self.exclusions = []
+        self.hitCallbacks = []
+
+    @classmethod
+    def getShape(cls):
+        shape = cls.Shapes.get(cls.Radius)
+        if not shape:
+            shape = BulletSphereShape(cls.Radius)
+            cls.Shapes[cls.Radius] = shape
+        return shape
+
+    def getData(self):
+        return 0
+
+    def getDuration(self):
+        raise NotImplementedError
+
+    def getSpawnParams(self):
+        # [duration, start, end, gravity, timestamp], gravity is 0 for a straight line.
+        raise NotImplementedError
+
+    def getPosAt(self, t):
+        raise NotImplementedError
+
+    def onSpawn(self):
+        pass
+
+    def isSpawned(self):
+        return self.manager is not None
+
+    def addExclusion(self, excl):
+        self.exclusions.append(excl)
+
+    def addHitCallback(self, cbk):
+        self.hitCallbacks.append(cbk)
+
+    def isExcluded(self, intoNode):
+        intoNP = NodePath(intoNode)
+        for excl in self.exclusions:
+            if excl.isAncestorOf(intoNP) or excl == intoNP:
+                return True
+        return False
+
+    def setPos(self, *args):
+        self.pos = Point3(*args)
+
+    def getPos(self, other = None):
+        # Projectiles always live in world space.
+        return Point3(self.pos)
+
+    def getInitialPos(self):
+        return self.initialPos
 
     def ivalFinished(self):
         self.requestDelete()
 
     def d_impact(self, pos):
-        pos = [pos[0], pos[1], pos[2]]
-        lastPos = [self.lastPos[0], self.lastPos[1], self.lastPos[2]]
-        self.sendUpdate('impact', [pos, lastPos])
-
-    def doInitCollider(self):
-        WorldColliderAI.__init__(self, "none", 1.0, needSelfInArgs = True, resultInArgs = True,
-                          useSweep = True, startNow = False, initNp = False, mask = CIGlobals.WorldGroup | CIGlobals.CharacterGroup)
-        self.world = self.air.getPhysicsWorld(self.zoneId)
-
-    def announceGenerate(self):
-        pos = self.getPos(render)
-        self.doInitCollider()
-        self.setPythonTag("projectile", self)
-        self.reparentTo(render)
-        self.setPos(pos)
-        DistributedSmoothNodeAI.announceGenerate(self)
-        self.stopPosHprBroadcast()
-        self.start()
-        self.onSpawn()
+        if self.manager:
+            self.manager.d_impact(self, pos)
+
+    def requestDelete(self):
+        if self.manager:
+            self.manager.removeProjectile(self)
 
     def delete(self):
         BaseProjectileShared.cleanup(self)
-        self.stop()
-        DistributedSmoothNodeAI.delete(self)
+        self.exclusions = []
+        self.hitCallbacks = []
+        self.air = None
@@ -7,6 +7,9 @@ class LinearProjectile(BaseProjectile, LinearProjectileShared):
         BaseProjectile.__init__(self, cr)
         LinearProjectileShared.__init__(self)
 
+    def setSpawnParams(self, duration, start, end, gravity, timestamp):
+        self.setLinear(duration, start, end, timestamp)
+
     def onSpawn(self):
         self.playLinear()
 
@@ -1,3 +1,5 @@
+from panda3d.core import Point3
+
 from src.coginvasion.attack.BaseProjectileAI import BaseProjectileAI
 from src.coginvasion.attack.LinearProjectileShared import LinearProjectileShared
 
@@ -6,10 +8,23 @@ class LinearProjectileAI(BaseProjectileAI, LinearProjectileShared):
     def __init__(self, air):
         BaseProjectileAI.__init__(self, air)
         LinearProjectileShared.__init__(self)
+        self.linearDelta = None
+
+    def getDuration(self):
+        return self.linearDuration
+
+    def getSpawnParams(self):
+        return [self.linearDuration, self.linearStart, self.linearEnd, 0.0, self.linearTimestamp]
 
     def onSpawn(self):
-        self.playLinear()
+        self.linearDelta = Point3(*self.linearEnd) - Point3(*self.linearStart)
+
+    def getPosAt(self, t):
+        if self.linearDuration <= 0.0:
+            return Point3(*self.linearEnd)
+        return Point3(*self.linearStart) + self.linearDelta * (min(t, self.linearDuration) / self.linearDuration)
 
     def delete(self):
         LinearProjectileShared.cleanup(self)
+        self.linearDelta = None
         BaseProjectileAI.delete(self)
@@ -8,6 +8,9 @@ class LobProjectile(BaseProjectile, LobProjectileShared):
         BaseProjectile.__init__(self, cr)
         LobProjectileShared.__init__(self)
 
+    def setSpawnParams(self, duration, start, end, gravity, timestamp):
+        self.setProjectile(duration, start, end, gravity, timestamp)
+
     def onSpawn(self):
         self.playProjectile()
 
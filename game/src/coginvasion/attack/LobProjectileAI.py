@@ -1,3 +1,7 @@
+from panda3d.core import Point3, Vec3
+
+from direct.interval.ProjectileInterval import ProjectileInterval
+
 from src.coginvasion.attack.BaseProjectileAI import BaseProjectileAI
 from src.coginvasion.attack.LobProjectileShared import LobProjectileShared
 
@@ -6,10 +10,33 @@ class LobProjectileAI(BaseProjectileAI, LobProjectileShared):
     def __init__(self, air):
         LobProjectileShared.__init__(self)
         BaseProjectileAI.__init__(self, air)
+        self.projStartVel = None
+        self.projZAcc = 0.0
+
+    def getDuration(self):
+        return self.projDuration
+
+    def getSpawnParams(self):
+        return [self.projDuration, self.projStart, self.projEnd, self.projGravity, self.projTimestamp]
 
     def onSpawn(self):
-        self.playProjectile()
+        # Same trajectory as the FlightProjectileInterval the clients play.
+        self.projZAcc = -ProjectileInterval.gravity * self.projGravity
+        if self.projDuration <= 0.0:
+            self.projStartVel = Vec3(0)
+            return
+        start = Point3(*self.projStart)
+        end = Point3(*self.projEnd)
+        self.projStartVel = (end - start) / self.projDuration
+        self.projStartVel[2] -= 0.5 * self.projZAcc * self.projDuration
+
+    def getPosAt(self, t):
+        if self.projDuration <= 0.0:
+            return Point3(*self.projEnd)
+        t = min(t, self.projDuration)
+        return Point3(*self.projStart) + self.projStartVel * t + Vec3(0, 0, 0.5 * self.projZAcc * t * t)
 
     def delete(self):
         LobProjectileShared.cleanup(self)
+        self.projStartVel = None
         BaseProjectileAI.delete(self)
@@ -20,8 +20,9 @@ from AvatarShared import AvatarShared
 from Activities import ACT_NONE
 from src.coginvasion.phys.PhysicsNodePathAI import BasePhysicsObjectAI
 from src.coginvasion.cog.ai.RelationshipsAI import RELATIONSHIP_NONE
+from src.coginvasion.battle.SnapshotBroadcasterAI import SnapshotNodeAI
 
-class DistributedAvatarAI(DistributedSmoothNodeAI.DistributedSmoothNodeAI, AvatarShared, BasePhysicsObjectAI):
+class DistributedAvatarAI(SnapshotNodeAI, DistributedSmoothNodeAI.DistributedSmoothNodeAI, AvatarShared, BasePhysicsObjectAI):
     notify = directNotify.newCategory("DistributedAvatarAI")
     
     AvatarType = AVATAR_NONE
@@ -30,6 +31,8 @@ class DistributedAvatarAI(DistributedSmoothNodeAI.DistributedSmoothNodeAI, Avata
     
     Moving = True
     NeedsPhysics = True
+    # If we haven't moved for this long, we've stopped.
+    MovementTimeout = 0.5
 
     def __init__(self, air):
         DistributedSmoothNodeAI.DistributedSmoothNodeAI.__init__(self, air)
@@ -37,6 +40,7 @@ class DistributedAvatarAI(DistributedSmoothNodeAI.DistributedSmoothNodeAI, Avata
         AvatarShared.__init__(self)
         
         self.lastPos = Point3(0)
+        self.lastMoveTime = 0.0
         self.movementDelta = Vec3(0)
         self.movementVector = Vec3(0)
         return
@@ -44,6 +48,10 @@ class DistributedAvatarAI(DistributedSmoothNodeAI.DistributedSmoothNodeAI, Avata
     def getAttackMgr(self):
         return self.air.attackMgr
 
+    def handleAttackAmmoChanged(self, attack):
+        # Called when one of our attacks uses up ammo.
+        pass
+
     def getActivityDuration(self, act):
         return self.activities.get(act, 0.0)
 
@@ -94,27 +102,99 @@ class DistributedAvatarAI(DistributedSmoothNodeAI.DistributedSmoothNodeAI, Avata
         self.setAttackState(state)
         
     def getMovementVector(self):
+        self.sampleMovement()
         return self.movementVector
+
+    def getMovementDelta(self):
+        self.sampleMovement()
+        return self.movementDelta
         
-    def __avatarTick(self, task):
-        if self.isEmpty():
-            return task.done
-            
+    def updateMovement(self):
+        """
+        Works out our movement vector, used by AI sensing, from how far we moved
+        since the last call. Called whenever we move: by our Motor for NPCs, and
+        when the client sends us a new position for players.
+
+        The movement delta is how far we move in one frame at our current speed,
+        however long it has been since the last call.
+        """
+
+        if not self.Moving or self.isEmpty():
+            return
+
+        now = globalClock.getFrameTime()
+        elapsed = now - self.lastMoveTime
+        if elapsed <= 0:
+            # Already updated this frame, the next update picks up the rest.
+            return
+
         pos = self.getPos()
-        
-        if (pos - self.lastPos).lengthSquared() <= 0.001:
+        delta = pos - self.lastPos
+        self.lastPos = pos
+        self.lastMoveTime = now
+
+        if delta.lengthSquared() <= 0.001 or elapsed > self.MovementTimeout:
+            self.stopMovement()
+            return
+
+        self.movementDelta = delta * (globalClock.getDt() / elapsed)
+        self.movementVector = delta.normalized()
+
+    def sampleMovement(self):
+        # Picks up movement nobody told us about, like an interval or physics moving us,
+        # and notices when the updates have stopped coming.
+        if not self.Moving or self.isEmpty():
+            return
+
+        if self.getPos() != self.lastPos:
+            self.updateMovement()
+        elif globalClock.getFrameTime() - self.lastMoveTime > self.MovementTimeout:
+            self.stopMovement()
+
+    def stopMovement(self):
+        # We aren't moving anymore, so our movement vector is zero until we move again.
+        if self.movementDelta is not None:
             self.movementDelta.set(0, 0, 0)
             self.movementVector.set(0, 0, 0)
-            self.lastPos = pos
-            return task.cont
-        
-        # Determine movement vector, used by AI sensing.
-        self.movementDelta = pos - self.lastPos
-        self.movementVector = self.movementDelta.normalized()
-        self.lastPos = pos
-            
-        return task.cont
-        
+
+    # The position updates sent by the client of a player avatar.
+
+    def setSmStop(self, t = None):
+        DistributedSmoothNodeAI.DistributedSmoothNodeAI.setSmStop(self, t)
+        self.stopMovement()
+
+    def setSmZ(self, z, t = None):
+        DistributedSmoothNodeAI.DistributedSmoothNodeAI.setSmZ(self, z, t)
+        self.updateMovement()
+
+    def setSmXY(self, x, y, t = None):
+        DistributedSmoothNodeAI.DistributedSmoothNodeAI.setSmXY(self, x, y, t)
+        self.updateMovement()
+
+    def setSmXZ(self, x, z, t = None):
+        DistributedSmoothNodeAI.DistributedSmoothNodeAI.setSmXZ(self, x, z, t)
+        self.updateMovement()
+
+    def setSmPos(self, x, y, z, t = None):
+        DistributedSmoothNodeAI.DistributedSmoothNodeAI.setSmPos(self, x, y, z, t)
+        self.updateMovement()
+
+    def setSmXYH(self, x, y, h, t = None):
+        DistributedSmoothNodeAI.DistributedSmoothNodeAI.setSmXYH(self, x, y, h, t)
+        self.updateMovement()
+
+    def setSmXYZH(self, x, y, z, h, t = None):
+        DistributedSmoothNodeAI.DistributedSmoothNodeAI.setSmXYZH(self, x, y, z, h, t)
+        self.updateMovement()
+
+    def setSmPosHpr(self, x, y, z, h, p, r, t = None):
+        DistributedSmoothNodeAI.DistributedSmoothNodeAI.setSmPosHpr(self, x, y, z, h, p, r, t)
+        self.updateMovement()
+
+    def setSmPosHprL(self, l, x, y, z, h, p, r, t = None):
+        DistributedSmoothNodeAI.DistributedSmoothNodeAI.setSmPosHprL(self, l, x, y, z, h, p, r, t)
+        self.updateMovement()
+
     def takeDamage(self, dmgInfo):
         hp = self.getHealth() - dmgInfo.damageAmount
         if hp < 0:
@@ -235,15 +315,12 @@ class DistributedAvatarAI(DistributedSmoothNodeAI.DistributedSmoothNodeAI, Avata
         base.air.addAvatar(self)
         
         if self.Moving:
-            self.lastPos = self.getPos(render)
-            taskMgr.add(self.__avatarTick, self.uniqueName('avatarTick'))
+            self.lastPos = self.getPos()
+            self.lastMoveTime = globalClock.getFrameTime()
     
     def delete(self):
         self.__stopActivityTask()
         base.air.removeAvatar(self)
-        
-        if self.Moving:
-            taskMgr.remove(self.uniqueName('avatarTick'))
 
         self.movementVector = None
         self.movementDelta = None
@@ -6,26 +6,64 @@ class Motor:
         self.task = None
         self.fwdSpeed = 10.0
         self.rotSpeed = 75.0
+        # Waypoints before waypointIndex have been reached already.
         self.waypoints = []
+        self.waypointIndex = 0
         self.lookAtWaypoints = True
+        # The motor is on, but it only does work while there are waypoints to walk.
+        self.running = False
+        # When the NPC is in a battle zone, the zone's MotorSystemAI moves us
+        # along with every other NPC there, instead of us having a task.
+        self.system = None
+        # Lets an avatar keep its movement vector up to date as we move it.
+        self.updateMovement = getattr(node, 'updateMovement', None)
+        self.stopMovement = getattr(node, 'stopMovement', None)
 
     def setFwdSpeed(self, spd):
         self.fwdSpeed = spd
+        self.__waypointsChanged()
 
     def setRotSpeed(self, spd):
         self.rotSpeed = spd
 
     def addWaypoints(self, waypoints):
         self.waypoints += waypoints
-    
+        self.__waypointsChanged()
+
     def setWaypoints(self, waypoints):
         self.waypoints = waypoints
+        self.waypointIndex = 0
+        self.__waypointsChanged()
 
     def getWaypoints(self):
-        return self.waypoints
+        return self.waypoints[self.waypointIndex:]
 
     def clearWaypoints(self):
         self.waypoints = []
+        self.waypointIndex = 0
+        self.__waypointsChanged()
+
+    def getGoal(self):
+        if self.waypointIndex < len(self.waypoints):
+            return self.waypoints[self.waypointIndex]
+        return None
+
+    def advanceWaypoint(self):
+        # We made it to our goal, returns the next one.
+        self.waypointIndex += 1
+        goal = self.getGoal()
+
+        # Look at the new waypoint
+        if goal is not None and self.lookAtWaypoints:
+            self.node.makeIdealYaw(goal)
+
+        return goal
+
+    def handleMoved(self):
+        if self.updateMovement:
+            self.updateMovement()
+        if self.getGoal() is None and self.stopMovement:
+            self.stopMovement()
 
     def cleanup(self):
         self.stopMotor()
@@ -34,25 +72,70 @@ class Motor:
         del self.fwdSpeed
         del self.rotSpeed
         del self.waypoints
+        del self.waypointIndex
+        del self.system
+        del self.updateMovement
+        del self.stopMovement
+
+    def getSystem(self):
+        getBattleZone = getattr(self.node, 'getBattleZone', None)
+        if getBattleZone:
+            battleZone = getBattleZone()
+            if battleZone:
+                return getattr(battleZone, 'motorSystem', None)
+        return None
 
     def startMotor(self):
         self.stopMotor()
 
-        self.task = taskMgr.add(self.__update, "MotorUpdate-" + str(id(self)))
+        self.running = True
+        self.system = self.getSystem()
+        if self.system:
+            self.system.addMotor(self)
+        else:
+            self.__startTask()
 
     def stopMotor(self):
+        self.running = False
+        if self.system:
+            self.system.removeMotor(self)
+            self.system = None
+        self.__stopTask()
+
+    def handleSystemGone(self):
+        # Our battle zone is going away.
+        self.system = None
+        if self.running:
+            self.__startTask()
+
+    def __waypointsChanged(self):
+        if self.system:
+            self.system.syncMotor(self)
+        else:
+            self.__startTask()
+
+    def __startTask(self):
+        if self.running and not self.task and self.getGoal() is not None:
+            self.task = taskMgr.add(base.taskStats.wrap("MotorUpdate", self.__update), "MotorUpdate-" + str(id(self)))
+
+    def __stopTask(self):
         if self.task:
             self.task.remove()
             self.task = None
+        if self.stopMovement:
+            self.stopMovement()
 
-    def __update(self, task):
-        if len(self.waypoints) == 0:
-            return task.cont
+    def step(self, dt):
+        """
+        Moves us `dt` seconds along towards our goal waypoint.
+        Returns False if there's nowhere left to go.
+        """
 
-        dt = globalClock.getDt()
+        waypoint = self.getGoal()
+        if waypoint is None:
+            return False
 
         # Step towards goal waypoint
-        waypoint = self.waypoints[0]
         currPos = self.node.getPos(render)
         delta = waypoint - currPos
         # Distance from here to waypoint
@@ -64,12 +147,21 @@ class Motor:
             # We would move past our waypoint
             # snap to the waypoint, then complete this waypoint
             self.node.setPos(waypoint)
-            self.waypoints.pop(0)
-
-            # Look at the new waypoint
-            if len(self.waypoints) > 0 and self.lookAtWaypoints:
-                self.node.makeIdealYaw(self.waypoints[0])
+            self.advanceWaypoint()
         else:
             self.node.setPos(currPos + moveAmount)
 
+        return True
+
+    def __update(self, task):
+        if not self.step(globalClock.getDt()):
+            # Nowhere left to go, sleep until we're given more waypoints.
+            self.task = None
+            if self.stopMovement:
+                self.stopMovement()
+            return task.done
+
+        if self.updateMovement:
+            self.updateMovement()
+
         return task.cont
@@ -164,6 +164,7 @@ class CIBase(ShowBase):
         #self.bspLoader.setShadowResolution(60 * 2, 1024 * 1)
         self.bspLoader.setPhysicsWorld(self.physicsWorld)
         self.bspLevel = None
+        self.bspLevelFile = None
         self.materialData = {}
         self.skyBox = None
         self.skyBoxUtil = None
@@ -376,6 +377,7 @@ class CIBase(ShowBase):
             self.disableAndRemovePhysicsNodes(self.bspLevel)
             self.bspLevel.removeNode()
             self.bspLevel = None
+        self.bspLevelFile = None
         self.bspLoader.cleanup()
         base.materialData = {}
         
@@ -427,6 +429,7 @@ class CIBase(ShowBase):
         
         base.bspLoader.read(mapFile)
         base.bspLevel = base.bspLoader.getResult()
+        base.bspLevelFile = mapFile
         base.bspLoader.doOptimizations()
         for prop in base.bspLevel.findAllMatches("**/+BSPProp"):
             base.createAndEnablePhysicsNodes(prop)
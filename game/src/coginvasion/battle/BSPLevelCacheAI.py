@@ -0,0 +1,147 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file BSPLevelCacheAI.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from panda3d.core import NodePath, Vec3
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+from direct.task import Task
+
+from CoverTableAI import CoverTableAI
+
+try:
+    from scipy.spatial.ckdtree import cKDTree
+except:
+    raise ImportError("You need to pull in the scipy package")
+
+class BSPLevelDataAI:
+    """
+    The parts of a level that are the same in every battle zone that loads it:
+    the nav mesh, the cover hint positions and their kd-tree, and the cover table.
+    Nothing in here may be changed once it is built, battle zones only read it.
+    """
+
+    def __init__(self, levelFile):
+        self.levelFile = levelFile
+        self.refCount = 0
+
+        self.navMeshNp = None
+        # The nav mesh keeps its own copy of the level geometry, battle zones come and go.
+        self.navMeshOwnerNp = None
+
+        self.coverPositions = []
+        self.coverKDTree = None
+        # Parallel to coverPositions, see CoverTableAI.
+        self.hintLeafs = None
+        self.coveredFrom = None
+        self.exposedTo = None
+
+    def hasCoverTable(self):
+        return self.hintLeafs is not None
+
+    def build(self, battleZone):
+        """
+        Builds everything from the level `battleZone` just loaded.
+        The battle zone's coverHints must already be set.
+        """
+
+        bspLoader = battleZone.bspLoader
+
+        self.navMeshOwnerNp = bspLoader.getResult().copyTo(NodePath())
+        self.navMeshNp = base.nmMgr.create_nav_mesh()
+        self.navMeshNp.node().set_owner_node_path(self.navMeshOwnerNp)
+        self.navMeshNp.node().setup()
+
+        for hint in battleZone.getCoverHints():
+            pos = hint.getCEntity().getOrigin()
+            self.coverPositions.append([pos[0], pos[1], pos[2]])
+        if len(self.coverPositions) > 0:
+            self.coverKDTree = cKDTree(self.coverPositions)
+            coverTable = CoverTableAI(battleZone)
+            coverTable.load(self.levelFile)
+            self.hintLeafs, self.coveredFrom, self.exposedTo = coverTable.getTable()
+            coverTable.cleanup()
+
+    def cleanup(self):
+        if self.navMeshNp:
+            self.navMeshNp.removeNode()
+            self.navMeshNp = None
+        if self.navMeshOwnerNp:
+            self.navMeshOwnerNp.removeNode()
+            self.navMeshOwnerNp = None
+        self.coverPositions = None
+        self.coverKDTree = None
+        self.hintLeafs = None
+        self.coveredFrom = None
+        self.exposedTo = None
+
+class BSPLevelCacheAI:
+    """
+    Shares the BSPLevelDataAI of each level between the battle zones on this AI process,
+    so ten floors of the same cog office build the nav mesh and cover data once.
+
+    Levels are reference counted. A level nobody is using anymore is kept for
+    ai-bsp-level-linger seconds, since the next floor of an office often loads it again.
+    Each battle zone still reads the .bsp with its own BSPLoader, which spawns the
+    entities of that zone and fills its physics world.
+    """
+
+    notify = directNotify.newCategory("BSPLevelCacheAI")
+
+    def __init__(self):
+        self.lingerTime = config.GetFloat('ai-bsp-level-linger', 60.0)
+        # levelFile -> BSPLevelDataAI
+        self.levels = {}
+
+    def getLingerTaskName(self, levelFile):
+        return "BSPLevelCacheAI-linger-{0}".format(levelFile)
+
+    def acquire(self, levelFile, battleZone):
+        """
+        Returns the BSPLevelDataAI of `levelFile`, building it from `battleZone` if no one
+        has it yet. Hand it back with release() when the battle zone unloads the level.
+        """
+
+        data = self.levels.get(levelFile)
+        if not data:
+            self.notify.info("Building shared data of {0}".format(levelFile))
+            data = BSPLevelDataAI(levelFile)
+            data.build(battleZone)
+            self.levels[levelFile] = data
+
+        taskMgr.remove(self.getLingerTaskName(levelFile))
+        data.refCount += 1
+        return data
+
+    def release(self, data):
+        data.refCount -= 1
+        if data.refCount > 0:
+            return
+
+        if self.lingerTime > 0:
+            taskMgr.doMethodLater(self.lingerTime, self.__lingerTask, self.getLingerTaskName(data.levelFile),
+                                  extraArgs = [data], appendTask = True)
+        else:
+            self.__free(data)
+
+    def __lingerTask(self, data, task):
+        if data.refCount <= 0:
+            self.__free(data)
+        return Task.done
+
+    def __free(self, data):
+        if self.levels.get(data.levelFile) is data:
+            del self.levels[data.levelFile]
+        data.cleanup()
+
+    def cleanup(self):
+        for data in self.levels.values():
+            taskMgr.remove(self.getLingerTaskName(data.levelFile))
+            data.cleanup()
+        self.levels = {}
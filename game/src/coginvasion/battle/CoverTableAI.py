@@ -0,0 +1,255 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file CoverTableAI.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from panda3d.core import Vec3, Filename, GeomVertexReader
+from libpandabsp import BSPFaceAttrib
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+
+import json
+import os
+
+# What a cover hint looks like from a given leaf.
+COVER_HIDDEN    = 0 # PVS says the leaf can't see the hint at all.
+COVER_PROBABLE  = 1 # Every probe in the leaf had its view of the hint blocked, one trace confirms it.
+COVER_EXPOSED   = 2 # Every probe in the leaf could see the hint, and there were enough of them.
+COVER_UNKNOWN   = 3 # No probes in the leaf, or the probes disagreed.
+
+class CoverTableAI:
+    """
+    Precomputed visibility of a level's info_hint_cover nodes.
+
+    When a level is loaded, every cover hint is traced against probe points spread
+    over the level: the cover hints, the player starts and a spot on each floor
+    triangle, at most MaxProbesPerLeaf of them in each leaf. For each hint we
+    remember which leafs had their view of it blocked from every probe, and which
+    leafs saw it from at least MinExposedProbes probes. Together with the PVS, a
+    cover search takes a hidden hint without tracing at all, and otherwise needs
+    one trace to confirm the best hint the table gives it.
+
+    The table is written to the ai-cover-cache-dir directory, keyed by the size and
+    timestamp of the level, so it only has to be built the first time a level is loaded.
+    """
+
+    notify = directNotify.newCategory("CoverTableAI")
+
+    Version = 3
+    Extension = ".cover"
+
+    # A leaf only counts as seeing a hint if this many of its probes saw it.
+    MinExposedProbes = 2
+    # Most probes traced from a single leaf.
+    MaxProbesPerLeaf = 8
+
+    LeafOffset = Vec3(0, 0, 0.05)
+    ProbeEyeOffset = Vec3(0, 0, 2.0)
+    HintEyeOffset = Vec3(0, 0, 3.5 / 2)
+
+    ProbeClassnames = ["info_hint_cover", "info_player_start"]
+
+    def __init__(self, battleZone):
+        self.battleZone = battleZone
+        # Parallel to battleZone.coverHints
+        self.hintLeafs = []
+        self.coveredFrom = []
+        self.exposedTo = []
+
+    def cleanup(self):
+        self.battleZone = None
+        self.hintLeafs = None
+        self.coveredFrom = None
+        self.exposedTo = None
+
+    def getTable(self):
+        return [self.hintLeafs, self.coveredFrom, self.exposedTo]
+
+    def setTable(self, hintLeafs, coveredFrom, exposedTo):
+        # Shared with other battle zones on the same level, see BSPLevelCacheAI.
+        self.hintLeafs = hintLeafs
+        self.coveredFrom = coveredFrom
+        self.exposedTo = exposedTo
+
+    def getNumHints(self):
+        return len(self.hintLeafs)
+
+    def findLeaf(self, pos):
+        return int(self.battleZone.bspLoader.findLeaf(pos + self.LeafOffset))
+
+    def classify(self, hintIdx, threatLeaf):
+        """Returns one of the COVER_ constants for the hint as seen from `threatLeaf`."""
+
+        hintLeaf = self.hintLeafs[hintIdx]
+        if not self.battleZone.getPerception().isClusterVisible(threatLeaf, hintLeaf):
+            return COVER_HIDDEN
+        elif threatLeaf in self.coveredFrom[hintIdx]:
+            return COVER_PROBABLE
+        elif threatLeaf in self.exposedTo[hintIdx]:
+            return COVER_EXPOSED
+        return COVER_UNKNOWN
+
+    def load(self, lfile):
+        """Reads the table for the level from disk, or builds it and writes it out."""
+
+        levelKey = self.getLevelKey(lfile)
+        cacheFile = self.getCacheFilename(lfile)
+
+        if levelKey and self.read(cacheFile, levelKey):
+            return
+
+        self.build()
+
+        if levelKey:
+            self.write(cacheFile, levelKey)
+
+    def getCacheFilename(self, lfile):
+        # Levels are read out of the read-only phase multifiles, so the tables
+        # go in a directory of their own, named after the level's path.
+        cacheDir = config.GetString('ai-cover-cache-dir', 'astron/databases/cover-cache')
+        name = Filename(lfile).getFullpath().strip('/').replace('/', '_')
+        return os.path.join(cacheDir, name + self.Extension)
+
+    def getLevelKey(self, lfile):
+        # Tells a changed level apart without reading the whole .bsp.
+        vfile = vfs.getFile(Filename(lfile))
+        if not vfile:
+            return None
+        return "{0}-{1}".format(vfile.getFileSize(), vfile.getTimestamp())
+
+    def read(self, cacheFile, levelKey):
+        if not os.path.isfile(cacheFile):
+            return False
+
+        try:
+            with open(cacheFile, 'r') as f:
+                table = json.load(f)
+        except (IOError, ValueError):
+            self.notify.warning("Couldn't read cover table {0}, rebuilding.".format(cacheFile))
+            return False
+
+        hints = table.get("hints", [])
+        if (table.get("version") != self.Version or table.get("key") != levelKey or
+            len(hints) != len(self.battleZone.getCoverHints())):
+            # Stale, the level or the table format changed.
+            return False
+
+        self.hintLeafs = [hint[0] for hint in hints]
+        self.coveredFrom = [set(hint[1]) for hint in hints]
+        self.exposedTo = [set(hint[2]) for hint in hints]
+
+        self.notify.debug("Loaded cover table {0}".format(cacheFile))
+        return True
+
+    def write(self, cacheFile, levelKey):
+        table = {
+            "version"   : self.Version,
+            "key"       : levelKey,
+            "hints"     : [[self.hintLeafs[i], sorted(self.coveredFrom[i]), sorted(self.exposedTo[i])]
+                           for i in xrange(len(self.hintLeafs))]
+        }
+
+        try:
+            cacheDir = os.path.dirname(cacheFile)
+            if cacheDir and not os.path.isdir(cacheDir):
+                os.makedirs(cacheDir)
+            # Write next to the real file first so a crash can't leave half a table behind.
+            tempFile = cacheFile + '.tmp'
+            with open(tempFile, 'w') as f:
+                json.dump(table, f)
+            if os.path.isfile(cacheFile):
+                os.remove(cacheFile)
+            os.rename(tempFile, cacheFile)
+        except (IOError, OSError):
+            # Not being able to cache the table just means we build it again next time.
+            self.notify.warning("Couldn't write cover table {0}".format(cacheFile))
+
+    def getFloorPositions(self):
+        # The middle of every floor triangle of the level, where a threat could stand.
+        positions = []
+        root = self.battleZone.bspLoader.getResult()
+        for geomNp in root.findAllMatches("**/+GeomNode"):
+            node = geomNp.node()
+            mat = geomNp.getMat(root)
+            for i in xrange(node.getNumGeoms()):
+                state = node.getGeomState(i)
+                if not state.hasAttrib(BSPFaceAttrib.getClassSlot()):
+                    continue
+                if state.getAttrib(BSPFaceAttrib.getClassSlot()).getFaceType() != BSPFaceAttrib.FACETYPE_FLOOR:
+                    continue
+
+                geom = node.getGeom(i).decompose()
+                reader = GeomVertexReader(geom.getVertexData(), 'vertex')
+                for j in xrange(geom.getNumPrimitives()):
+                    prim = geom.getPrimitive(j)
+                    for k in xrange(prim.getNumPrimitives()):
+                        start = prim.getPrimitiveStart(k)
+                        end = prim.getPrimitiveEnd(k)
+                        center = Vec3(0)
+                        for vtx in xrange(start, end):
+                            reader.setRow(prim.getVertex(vtx))
+                            center += reader.getData3f()
+                        positions.append(Vec3(mat.xformPoint(center / float(end - start))))
+        return positions
+
+    def getProbes(self):
+        """
+        Returns the (position, leaf) of every probe, at most MaxProbesPerLeaf in a leaf.
+        The entity probes come first, so they're never the ones left out.
+        """
+
+        positions = []
+        for classname in self.ProbeClassnames:
+            for ent in self.battleZone.bspLoader.findAllEntities(classname):
+                positions.append(Vec3(ent.getCEntity().getOrigin()))
+        positions += self.getFloorPositions()
+
+        probes = []
+        # leaf -> number of probes in it
+        leafProbes = {}
+        for pos in positions:
+            leaf = self.findLeaf(pos)
+            if leafProbes.get(leaf, 0) >= self.MaxProbesPerLeaf:
+                continue
+            leafProbes[leaf] = leafProbes.get(leaf, 0) + 1
+            probes.append((pos, leaf))
+        return probes
+
+    def build(self):
+        bz = self.battleZone
+        bspLoader = bz.bspLoader
+
+        hintPositions = [Vec3(hint.getCEntity().getOrigin()) for hint in bz.getCoverHints()]
+        self.hintLeafs = [self.findLeaf(pos) for pos in hintPositions]
+        self.coveredFrom = []
+        self.exposedTo = []
+
+        probes = self.getProbes()
+
+        for i in xrange(len(hintPositions)):
+            hintEye = hintPositions[i] + self.HintEyeOffset
+            hintLeaf = self.hintLeafs[i]
+
+            blocked = set()
+            # leaf -> how many of its probes saw the hint
+            seen = {}
+            for probePos, probeLeaf in probes:
+                if not bspLoader.isClusterVisible(probeLeaf, hintLeaf):
+                    # The PVS already handles this leaf at runtime.
+                    continue
+                if bz.traceLine(probePos + self.ProbeEyeOffset, hintEye):
+                    seen[probeLeaf] = seen.get(probeLeaf, 0) + 1
+                else:
+                    blocked.add(probeLeaf)
+
+            # Leafs where the probes disagree, or too few probes saw it, stay unknown.
+            self.coveredFrom.append(blocked - set(seen.keys()))
+            self.exposedTo.append(set(leaf for leaf, numSeen in seen.items()
+                                      if numSeen >= self.MinExposedProbes and not leaf in blocked))
+
+        self.notify.info("Built cover table: {0} hints, {1} probes".format(len(hintPositions), len(probes)))
@@ -14,6 +14,8 @@ from direct.directnotify.DirectNotifyGlobal import directNotify
 
 from src.coginvasion.battle.RPToonData import RPToonData
 from src.coginvasion.battle.GameRules import GameRules
+from src.coginvasion.battle.ProjectileManager import ProjectileManager
+from src.coginvasion.battle.SnapshotReceiver import SnapshotReceiver
 from src.coginvasion.gui.RewardPanel import RewardPanel
 from src.coginvasion.globals import CIGlobals
 import BattleGlobals
@@ -41,6 +43,12 @@ class DistributedBattleZone(DistributedObject):
         self.rewardSeq = Sequence()
 
         self.gameRules = self.makeGameRules()
+
+        # Plays out the projectiles thrown in this zone.
+        self.projectileMgr = ProjectileManager(self)
+
+        # Moves the NPCs of this zone from the snapshots the AI sends.
+        self.snapshotReceiver = SnapshotReceiver(self)
         
         self.lastCameraIndex = 0
 
@@ -53,6 +61,15 @@ class DistributedBattleZone(DistributedObject):
         
     def emitSound(self, soundPath, worldPos, volume):
         CIGlobals.emitSound(soundPath, worldPos, volume)
+
+    def projectileSpawned(self, projId, projType, data, duration, start, end, gravity, timestamp):
+        self.projectileMgr.spawnProjectile(projId, projType, data, duration, start, end, gravity, timestamp)
+
+    def projectileImpacted(self, projId, pos, lastPos):
+        self.projectileMgr.impactProjectile(projId, pos, lastPos)
+
+    def npcSnapshot(self, timestamp, data):
+        self.snapshotReceiver.handleSnapshot(timestamp, data)
         
     def setEntZone(self, zone):
         self.entZone = zone
@@ -194,6 +211,10 @@ class DistributedBattleZone(DistributedObject):
         self.lastCameraIndex = None
         self.gameRules.cleanup()
         self.gameRules = None
+        self.projectileMgr.cleanup()
+        self.projectileMgr = None
+        self.snapshotReceiver.cleanup()
+        self.snapshotReceiver = None
         self.leaveEntZone()
         self.firstMapLoad = None
         self.entZone = None
@@ -22,15 +22,16 @@ from src.coginvasion.battle.GameRulesAI import GameRulesAI
 from src.coginvasion.gags import GagGlobals
 from src.coginvasion.quest.Objectives import DefeatCog, DefeatCogBuilding, RecoverItem
 from src.coginvasion.phys.PhysicsUtils import detachAndRemoveBulletNodes
+from src.coginvasion.cog.ai.PerceptionAI import PerceptionAI
+from PathPlannerAI import PathPlannerAI
+from CoverTableAI import CoverTableAI
+from MotorSystemAI import MotorSystemAI
+from ProjectileManagerAI import ProjectileManagerAI
+from SnapshotBroadcasterAI import SnapshotBroadcasterAI
 
 import BattleGlobals
 import itertools
 
-try:
-    from scipy.spatial.ckdtree import cKDTree
-except:
-    raise ImportError("You need to pull in the scipy package")
-
 class DistributedBattleZoneAI(DistributedObjectAI, AvatarWatcher):
     notify = directNotify.newCategory('DistributedBattleZoneAI')
 
@@ -54,14 +55,31 @@ class DistributedBattleZoneAI(DistributedObjectAI, AvatarWatcher):
         self.avReadyToContinue = []
         
         self.bspLoader = None
+        # The parts of the level shared with other battle zones, see BSPLevelCacheAI.
+        self.levelData = None
         self.navMeshNp = None
+        self.pathPlanner = PathPlannerAI(self)
 
         # List of info_hint_cover entites, which indicate cover locations for AIs.
         self.coverKDTree = None
         self.coverHints = []
+        # Precomputed visibility of the cover hints, see CoverTableAI.
+        self.coverTable = None
         
         self.physicsWorld = None
 
+        # Shared sight checks for all of the NPCs in this zone.
+        self.perception = PerceptionAI(self)
+
+        # Moves all of the NPCs in this zone in one step, see MotorSystemAI.
+        self.motorSystem = MotorSystemAI(self)
+
+        # Simulates the projectiles thrown in this zone, see ProjectileManagerAI.
+        self.projectileMgr = ProjectileManagerAI(self)
+
+        # Sends the positions of the NPCs in this zone, see SnapshotBroadcasterAI.
+        self.snapshotBroadcaster = SnapshotBroadcasterAI(self)
+
         self.gameRules = self.makeGameRules()
         
         self.readyAvatars = []
@@ -124,9 +142,15 @@ class DistributedBattleZoneAI(DistributedObjectAI, AvatarWatcher):
     def getGameRules(self):
         return self.gameRules
 
+    def getPerception(self):
+        return self.perception
+
     def getCoverHints(self):
         return self.coverHints
 
+    def getCoverTable(self):
+        return self.coverTable
+
     def traceLine(self, start, end):
         if not self.bspLoader.hasActiveLevel():
             return True
@@ -173,7 +197,7 @@ class DistributedBattleZoneAI(DistributedObjectAI, AvatarWatcher):
     def announceGenerate(self):
         DistributedObjectAI.announceGenerate(self)
 
-        taskMgr.add(self.__updateTask, self.uniqueName('battleZoneUpdate'))
+        taskMgr.add(base.taskStats.wrap('battleZoneUpdate', self.__updateTask), self.uniqueName('battleZoneUpdate'))
 
     def __updateTask(self, task):
         dt = globalClock.getDt()
@@ -182,6 +206,10 @@ class DistributedBattleZoneAI(DistributedObjectAI, AvatarWatcher):
             self.physicsWorld.doPhysics(dt, 0)
         except:
             pass
+        self.pathPlanner.update()
+        self.motorSystem.update(dt)
+        self.projectileMgr.update()
+        self.snapshotBroadcaster.update()
         self.update()
         return task.cont
         
@@ -193,16 +221,21 @@ class DistributedBattleZoneAI(DistributedObjectAI, AvatarWatcher):
 
     def loadBSPLevel(self, lfile):
         self.bspLoader.read(lfile)
-        self.setupNavMesh(self.bspLoader.getResult())
-
-        coverPositions = []
-        self.coverHints = []
-        for hint in self.bspLoader.findAllEntities("info_hint_cover"):
-            pos = hint.getCEntity().getOrigin()
-            coverPositions.append([pos[0], pos[1], pos[2]])
-            self.coverHints.append(hint)
-        if len(coverPositions) > 0:
-            self.coverKDTree = cKDTree(coverPositions)
+        self.perception.resetLevel()
+
+        self.coverHints = list(self.bspLoader.findAllEntities("info_hint_cover"))
+
+        if self.levelData:
+            self.air.bspLevelCache.release(self.levelData)
+        self.levelData = self.air.bspLevelCache.acquire(lfile, self)
+        self.pathPlanner.invalidate()
+        self.navMeshNp = self.levelData.navMeshNp
+        self.coverKDTree = self.levelData.coverKDTree
+        self.coverTable = None
+        if self.levelData.hasCoverTable():
+            self.coverTable = CoverTableAI(self)
+            self.coverTable.setTable(self.levelData.hintLeafs, self.levelData.coveredFrom,
+                                     self.levelData.exposedTo)
 
     def findClosestCoverPoint(self, currPos, n = 1):
         if not self.coverKDTree:
@@ -212,41 +245,40 @@ class DistributedBattleZoneAI(DistributedObjectAI, AvatarWatcher):
 
     def unloadBSPLevel(self):
         self.cleanupNavMesh()
+        self.perception.resetLevel()
+        if self.levelData:
+            self.air.bspLevelCache.release(self.levelData)
+            self.levelData = None
         self.coverKDTree = None
         self.coverHints = []
+        if self.coverTable:
+            self.coverTable.cleanup()
+            self.coverTable = None
         if self.bspLoader:
             detachAndRemoveBulletNodes(self.bspLoader.getResult(), world = self.physicsWorld)
             self.bspLoader.cleanup()
         
     def cleanupNavMesh(self):
-        if self.navMeshNp:
-            self.navMeshNp.removeNode()
-            self.navMeshNp = None
-        
-    def setupNavMesh(self, node):
-        self.cleanupNavMesh()
+        # Cached paths belong to the old nav mesh.
+        self.pathPlanner.invalidate()
+        # The nav mesh itself belongs to the shared level data.
+        self.navMeshNp = None
         
-        nmMgr = base.nmMgr
-        self.navMeshNp = nmMgr.create_nav_mesh()
-        self.navMeshNp.node().set_owner_node_path(node)
-        self.navMeshNp.node().setup()
+    def getPathPlanner(self):
+        return self.pathPlanner
         
     def planPath(self, startPos, endPos):
         """Uses recast/detour to find a path from the generated nav mesh from the BSP file."""
 
-        if not self.navMeshNp:
-            return [startPos, endPos]
-        result = []
-        valueList = self.navMeshNp.node().path_find_follow(startPos, endPos)
-        currDir = Vec3(0)
-        for i in xrange(valueList.get_num_values()):
-            if i > 0 and i < valueList.get_num_values() - 1:
-                dir = (valueList.get_value(i - 1) - valueList.get_value(i)).normalized()
-                if dir.almostEqual(currDir, 0.05):
-                    continue
-                currDir = dir
-            result.append(valueList.get_value(i))
-        return result
+        return self.pathPlanner.planPath(startPos, endPos)
+
+    def requestPath(self, startPos, endPos, mover = None):
+        """
+        Like planPath(), but the path may be planned on a later frame.
+        Returns a PathRequest to poll.
+        """
+
+        return self.pathPlanner.requestPath(startPos, endPos, mover)
         
     def createServerEntity(self, cls, entnum):
         """
@@ -327,6 +359,21 @@ class DistributedBattleZoneAI(DistributedObjectAI, AvatarWatcher):
 
         self.unloadBSPLevel()
         self.bspLoader = None
+
+        self.pathPlanner.cleanup()
+        self.pathPlanner = None
+
+        self.motorSystem.cleanup()
+        self.motorSystem = None
+
+        self.projectileMgr.cleanup()
+        self.projectileMgr = None
+
+        self.snapshotBroadcaster.cleanup()
+        self.snapshotBroadcaster = None
+
+        self.perception.cleanup()
+        self.perception = None
             
         self.resetPhysics()
         self.physicsWorld = None
@@ -350,6 +397,8 @@ class DistributedBattleZoneAI(DistributedObjectAI, AvatarWatcher):
     def addAvatar(self, avId, andUpdateAvatars=0):
         self.setupAvatarData(avId)
         self.startTrackingAvatarId(avId)
+        # Let the new toon know where every NPC is.
+        self.snapshotBroadcaster.requestKeyframe()
         
         if andUpdateAvatars:
             self.b_setAvatars(self.watchingAvatarIds)
@@ -361,6 +410,9 @@ class DistributedBattleZoneAI(DistributedObjectAI, AvatarWatcher):
     def handleAvatarLeave(self, avatar, reason):
         self.removeAvatar(avatar.doId)
         if reason in [DIED, ZONE_CHANGE]:
+            if self.gameRules.useBackpack():
+                # The backpack is restored from the last snapshot, make sure it's current.
+                avatar.backpack.flushSnapshot()
             self.gameRules.restorePlayerBackpack(avatar)
         
     def handleAvatarChangeHealth(self, avatar, newHealth, prevHealth):
@@ -465,7 +517,6 @@ class DistributedBattleZoneAI(DistributedObjectAI, AvatarWatcher):
             deadCogData = data[1]
             favGagId = 0 # Make it whole cream pie by default
             favGagUses = 0
-            gagUnlocked = False
             
             if avatar:
                 rpData = RPToonData(avatar)
@@ -506,19 +557,17 @@ class DistributedBattleZoneAI(DistributedObjectAI, AvatarWatcher):
                         newGagName = GagGlobals.TrackGagNamesByTrackName.get(track)[maxExpIndex]
                         gagId = self.air.attackMgr.getAttackIDByName(newGagName)
                         avatar.backpack.addGag(gagId, 1)
-                        gagUnlocked = True
                 avatar.b_setTrackExperience(GagGlobals.trackExperienceToNetString(avatar.trackExperience))
                 
-                if gagUnlocked:
-                    netString = avatar.getBackpackAmmo()
-                    avatar.d_setBackpackAmmo(netString)
+                # Save the ammo used this battle (and any new gag) in one snapshot.
+                avatar.backpack.flushSnapshot()
                 
                 # Let's update quest stuff for this avatar.
                 questManager = avatar.questManager
                 
                 objectiveProgresses = []
                 
-                for quest in questManager.quests.values():
+                for quest in questManager.getQuestsInOrder():
                     objectiveProgress = []
                     for i, objective in enumerate(quest.accessibleObjectives):
                         objectiveProgress.append(objective.progress)
@@ -67,12 +67,11 @@ class DistributedPieTurretAI(DistributedAvatarAI, DistributedSmoothNodeAI):
         # Let's search for some targets.
         suitId2range = {}
         self.targets = []
-        for obj in base.air.doId2do.values():
+        for obj in base.air.getAvatarsInZone(self.zoneId):
             className = obj.__class__.__name__
-            if obj.zoneId == self.zoneId:
-                if className == 'DistributedSuitAI':
-                    if not obj.isDead():
-                        suitId2range[obj.doId] = obj.getDistance(self)
+            if className == 'DistributedSuitAI':
+                if not obj.isDead():
+                    suitId2range[obj.doId] = obj.getDistance(self)
                         
         # Let's organize the suits by distance.
         ranges = []
@@ -56,12 +56,11 @@ class DistributedPieTurretManagerAI(DistributedObjectAI):
     def getTurretCount(self):
         turrets = 0
             
-        for obj in base.air.doId2do.values():
+        for obj in base.air.getAvatarsInZone(self.zoneId):
             className = obj.__class__.__name__
-            if obj.zoneId == self.zoneId:
-                if className in CIGlobals.ToonClasses:
-                    if obj.getPUInventory()[0] > 0:
-                        turrets += 1
-                elif className == 'DistributedPieTurretAI':
+            if className in CIGlobals.ToonClasses:
+                if obj.getPUInventory()[0] > 0:
                     turrets += 1
+            elif className == 'DistributedPieTurretAI':
+                turrets += 1
         return turrets
@@ -0,0 +1,85 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file MotorSystemAI.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+
+class MotorSystemAI:
+    """
+    Moves every NPC of a battle zone along its waypoints from the battle zone's
+    update, instead of each Motor running a task of its own.
+
+    Only the motors that have a goal are stepped, each with Motor.step(), so an
+    NPC that was moved by something else (knockback, teleports, physics...) walks
+    on from wherever it is now. The NPCs that moved are announced with a single
+    event, getMovedEvent(), sent with the list of them.
+
+    Motors stay the interface for the NPCs, a Motor hands itself to the system of its
+    battle zone when it starts, see Motor.startMotor().
+    """
+
+    notify = directNotify.newCategory("MotorSystemAI")
+
+    def __init__(self, battleZone):
+        self.battleZone = battleZone
+
+        self.motors = set()
+        # Motors that have a goal to walk to.
+        self.moving = set()
+
+    def getMovedEvent(self):
+        return self.battleZone.uniqueName('motorSystemMoved')
+
+    def getNumMotors(self):
+        return len(self.motors)
+
+    def addMotor(self, motor):
+        self.motors.add(motor)
+        self.syncMotor(motor)
+
+    def removeMotor(self, motor):
+        self.motors.discard(motor)
+        self.moving.discard(motor)
+
+    def syncMotor(self, motor):
+        # Picks up whether the motor has somewhere to go, after it was given
+        # new waypoints or a new speed.
+        if not motor in self.motors:
+            return
+
+        if motor.getGoal() is not None:
+            self.moving.add(motor)
+        else:
+            self.moving.discard(motor)
+
+    def update(self, dt):
+        if not self.moving:
+            return
+
+        moved = []
+        for motor in list(self.moving):
+            if not motor in self.moving:
+                # Stopped by another NPC's move this tick.
+                continue
+
+            motor.step(dt)
+            if motor.getGoal() is None:
+                self.moving.discard(motor)
+
+            motor.handleMoved()
+            moved.append(motor.node)
+
+        messenger.send(self.getMovedEvent(), [moved])
+
+    def cleanup(self):
+        for motor in self.motors:
+            motor.handleSystemGone()
+        self.motors = None
+        self.moving = None
+        self.battleZone = None
@@ -0,0 +1,249 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file PathPlannerAI.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from panda3d.core import Vec3, Point3
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+
+from collections import OrderedDict, deque
+
+class PathRequest:
+    """
+    A path that has been asked for, but may not have been planned yet.
+    Poll isDone(), then take the result with getPath().
+
+    If the request has a mover, the path starts wherever the mover is
+    when the path gets planned, not where it was when it asked.
+    """
+
+    def __init__(self, startPos, endPos, mover = None):
+        self.startPos = Point3(startPos)
+        self.endPos = Point3(endPos)
+        self.mover = mover
+        self.path = None
+        self.cancelled = False
+
+    def updateStartPos(self):
+        if self.mover and not self.mover.isEmpty():
+            self.startPos = Point3(self.mover.getPos())
+
+    def isDone(self):
+        return self.path is not None
+
+    def getPath(self):
+        return self.path
+
+    def cancel(self):
+        self.cancelled = True
+        self.mover = None
+
+class PathPlannerAI:
+    """
+    Plans paths on a battle zone's nav mesh.
+
+    Planned paths are cached by their start and goal, quantized to cells
+    of `ai-path-cache-cell` feet, so suits chasing the same toon from about
+    the same spot share one detour query. A cached path is only handed out
+    if its first and last legs are clear from the caller's own start and goal,
+    otherwise the path is planned again. The cache is thrown away whenever
+    the nav mesh is rebuilt.
+
+    Paths can also be requested without blocking the caller. Requests are
+    planned during the battle zone update, at most `ai-path-requests-per-frame`
+    each frame, and identical requests in the same frame are only planned once.
+    """
+
+    notify = directNotify.newCategory("PathPlannerAI")
+
+    def __init__(self, battleZone):
+        self.battleZone = battleZone
+
+        self.cellSize = config.GetFloat('ai-path-cache-cell', 2.0)
+        self.maxCached = config.GetInt('ai-path-cache-size', 256)
+        self.requestsPerFrame = config.GetInt('ai-path-requests-per-frame', 4)
+
+        # (start cell, goal cell) -> simplified path
+        self.cache = OrderedDict()
+        self.requests = deque()
+
+        self.resetStats()
+
+    def cleanup(self):
+        self.invalidate()
+        self.battleZone = None
+        self.cache = None
+        self.requests = None
+
+    def resetStats(self):
+        self.stats = {
+            'hits'       : 0,
+            'misses'     : 0,
+            'unfit'      : 0,
+            'planned'    : 0,
+            'requests'   : 0,
+            'coalesced'  : 0,
+            'cancelled'  : 0
+        }
+
+    def getStats(self):
+        stats = dict(self.stats)
+        stats['cached'] = len(self.cache)
+        stats['pending'] = len(self.requests)
+        return stats
+
+    def invalidate(self):
+        """Throws out every cached path and pending request. Call when the nav mesh changes."""
+        self.cache.clear()
+        for request in self.requests:
+            request.cancel()
+        self.requests.clear()
+
+    def quantize(self, pos):
+        cell = self.cellSize
+        return (int(round(pos[0] / cell)), int(round(pos[1] / cell)), int(round(pos[2] / cell)))
+
+    def makeKey(self, startPos, endPos):
+        return (self.quantize(startPos), self.quantize(endPos))
+
+    # Legs are traced a little above the ground, so the floor doesn't block them.
+    LegTraceOffset = Vec3(0, 0, 1)
+
+    def isLegClear(self, fromPos, toPos):
+        return bool(self.battleZone.traceLine(Point3(fromPos) + self.LegTraceOffset,
+                                              Point3(toPos) + self.LegTraceOffset))
+
+    def __fitPath(self, path, startPos, endPos):
+        # Give the caller its own copy of a cached path that starts and ends
+        # exactly where it asked, not where the first caller did.
+        # Returns None if the caller can't get on or off the path from there.
+        if len(path) < 2:
+            return []
+
+        startPos = Point3(startPos)
+        endPos = Point3(endPos)
+        interior = [Point3(p) for p in path[1:-1]]
+        if not interior:
+            if not self.isLegClear(startPos, endPos):
+                return None
+        else:
+            if not startPos.almostEqual(path[0], 0.01) and not self.isLegClear(startPos, interior[0]):
+                return None
+            if not endPos.almostEqual(path[-1], 0.01) and not self.isLegClear(interior[-1], endPos):
+                return None
+
+        return [startPos] + interior + [endPos]
+
+    def __planCached(self, key, startPos, endPos):
+        # Uses the cached path of `key` if it fits, or plans (and caches) a new one.
+        path = self.__lookup(key)
+        if path is not None:
+            fitted = self.__fitPath(path, startPos, endPos)
+            if fitted is not None:
+                self.stats['hits'] += 1
+                return fitted
+            # Somewhere else in the cell, a wall is in the way of the cached path.
+            self.stats['unfit'] += 1
+
+        self.stats['misses'] += 1
+        path = self.findPath(startPos, endPos)
+        self.__store(key, path)
+        return [Point3(p) for p in path]
+
+    def __lookup(self, key):
+        path = self.cache.get(key, None)
+        if path is not None:
+            # Keep recently used paths at the back of the line.
+            del self.cache[key]
+            self.cache[key] = path
+        return path
+
+    def __store(self, key, path):
+        self.cache[key] = path
+        while len(self.cache) > self.maxCached:
+            self.cache.popitem(last = False)
+
+    def findPath(self, startPos, endPos):
+        """Runs detour and simplifies the result. Does not use the cache."""
+
+        navMeshNp = self.battleZone.navMeshNp
+        if not navMeshNp:
+            return [startPos, endPos]
+
+        self.stats['planned'] += 1
+
+        result = []
+        valueList = navMeshNp.node().path_find_follow(startPos, endPos)
+        numValues = valueList.get_num_values()
+        currDir = Vec3(0)
+        for i in xrange(numValues):
+            value = valueList.get_value(i)
+            if i > 0 and i < numValues - 1:
+                dir = (valueList.get_value(i - 1) - value).normalized()
+                if dir.almostEqual(currDir, 0.05):
+                    continue
+                currDir = dir
+            result.append(value)
+        return result
+
+    def planPath(self, startPos, endPos):
+        """Plans a path right now, using the cache if we can."""
+
+        if not self.battleZone.navMeshNp:
+            return [startPos, endPos]
+
+        return self.__planCached(self.makeKey(startPos, endPos), startPos, endPos)
+
+    def requestPath(self, startPos, endPos, mover = None):
+        """
+        Asks for a path that will be planned on a later frame.
+        If the path is already cached, the request is done immediately.
+        Pass the node that will follow the path as `mover` so that the path
+        starts from where it is when the path is planned.
+        """
+
+        self.stats['requests'] += 1
+
+        request = PathRequest(startPos, endPos, mover)
+
+        if not self.battleZone.navMeshNp:
+            request.path = [request.startPos, request.endPos]
+            return request
+
+        path = self.__lookup(self.makeKey(startPos, endPos))
+        if path is not None:
+            path = self.__fitPath(path, startPos, endPos)
+            if path is not None:
+                self.stats['hits'] += 1
+                request.path = path
+                return request
+
+        self.requests.append(request)
+        return request
+
+    def update(self):
+        """Plans some of the pending path requests. Called each battle zone update."""
+
+        planned = 0
+        while self.requests and planned < self.requestsPerFrame:
+            request = self.requests.popleft()
+            if request.cancelled:
+                self.stats['cancelled'] += 1
+                continue
+
+            request.updateStartPos()
+            key = self.makeKey(request.startPos, request.endPos)
+            if key in self.cache:
+                # Someone had the same path planned since this was asked for.
+                self.stats['coalesced'] += 1
+            numPlanned = self.stats['planned']
+            request.path = self.__planCached(key, request.startPos, request.endPos)
+            request.mover = None
+            if self.stats['planned'] != numPlanned:
+                planned += 1
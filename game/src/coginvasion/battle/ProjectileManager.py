@@ -0,0 +1,74 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file ProjectileManager.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+
+from src.coginvasion.attack.Attacks import (PROJECTILE_WHOLECREAMPIE, PROJECTILE_GUMBALL,
+                                            PROJECTILE_FIRED, PROJECTILE_GENERIC_THROWABLE)
+from src.coginvasion.gagsnew.WholeCreamPieProjectile import WholeCreamPieProjectile
+from src.coginvasion.gagsnew.GumballProjectile import GumballProjectile
+from src.coginvasion.cog.attacks.Fired import FiredProjectile
+from src.coginvasion.cog.attacks.GenericThrowableLinearProjectile import GenericThrowableLinearProjectile
+
+ProjectileClasses = {
+    PROJECTILE_WHOLECREAMPIE        : WholeCreamPieProjectile,
+    PROJECTILE_GUMBALL              : GumballProjectile,
+    PROJECTILE_FIRED                : FiredProjectile,
+    PROJECTILE_GENERIC_THROWABLE    : GenericThrowableLinearProjectile
+}
+
+class ProjectileManager:
+    """
+    Plays out the projectiles the ProjectileManagerAI of our battle zone tells us about.
+    """
+
+    notify = directNotify.newCategory("ProjectileManager")
+
+    def __init__(self, battleZone):
+        self.battleZone = battleZone
+        # projectileId -> BaseProjectile
+        self.projectiles = {}
+
+    def spawnProjectile(self, projId, projType, data, duration, start, end, gravity, timestamp):
+        projCls = ProjectileClasses.get(projType)
+        if not projCls:
+            self.notify.warning("Unknown projectile type {0}".format(projType))
+            return
+
+        # The server is reusing the id, get rid of the old one.
+        self.removeProjectile(projId)
+
+        proj = projCls(base.cr)
+        proj.projectileId = projId
+        proj.manager = self
+        proj.setData(data)
+        proj.setSpawnParams(duration, start, end, gravity, timestamp)
+        self.projectiles[projId] = proj
+        proj.announceGenerate()
+
+    def impactProjectile(self, projId, pos, lastPos):
+        proj = self.projectiles.get(projId)
+        if not proj:
+            # Already finished its trajectory here.
+            return
+        proj.impact(pos, lastPos)
+        self.removeProjectile(projId)
+
+    def removeProjectile(self, projId):
+        proj = self.projectiles.pop(projId, None)
+        if proj:
+            proj.disable()
+            proj.removeNode()
+
+    def cleanup(self):
+        for projId in self.projectiles.keys():
+            self.removeProjectile(projId)
+        self.projectiles = None
+        self.battleZone = None
@@ -0,0 +1,133 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file ProjectileManagerAI.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from panda3d.core import TransformState, NodePath
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+from direct.distributed.ClockDelta import globalClockDelta
+
+class ProjectileManagerAI:
+    """
+    Simulates the thrown and fired projectiles of a battle zone.
+
+    Projectiles follow their trajectory analytically from the spawn parameters, and
+    every projectile of the zone is swept against the physics world in one pass per tick.
+    The clients get one projectileSpawned message when a projectile is thrown, and one
+    projectileImpacted message when it hits something, and play it out on their own.
+    See the ProjectileManager of the client.
+    """
+
+    notify = directNotify.newCategory("ProjectileManagerAI")
+
+    MaxProjectileId = (1 << 32) - 1
+
+    def __init__(self, battleZone):
+        self.battleZone = battleZone
+        # projectileId -> BaseProjectileAI
+        self.projectiles = {}
+        self.nextProjectileId = 1
+
+    def getNumProjectiles(self):
+        return len(self.projectiles)
+
+    def __allocateProjectileId(self):
+        projId = self.nextProjectileId
+        while projId in self.projectiles:
+            projId = projId % self.MaxProjectileId + 1
+        self.nextProjectileId = projId % self.MaxProjectileId + 1
+        return projId
+
+    def spawn(self, proj):
+        proj.projectileId = self.__allocateProjectileId()
+        proj.manager = self
+        proj.spawnTime = globalClock.getFrameTime()
+        proj.onSpawn()
+        proj.initialPos = proj.getPosAt(0.0)
+        proj.lastPos = proj.initialPos
+        proj.setPos(proj.initialPos)
+        self.projectiles[proj.projectileId] = proj
+
+        duration, start, end, gravity, timestamp = proj.getSpawnParams()
+        self.battleZone.sendUpdate('projectileSpawned', [proj.projectileId, proj.ProjectileType, proj.getData(),
+                                                         duration, [start[0], start[1], start[2]],
+                                                         [end[0], end[1], end[2]], gravity, timestamp])
+
+    def d_impact(self, proj, pos):
+        lastPos = proj.lastPos
+        self.battleZone.sendUpdate('projectileImpacted', [proj.projectileId, [pos[0], pos[1], pos[2]],
+                                                          [lastPos[0], lastPos[1], lastPos[2]]])
+
+    def removeProjectile(self, proj):
+        if self.projectiles.get(proj.projectileId) is not proj:
+            return
+        del self.projectiles[proj.projectileId]
+        proj.manager = None
+        proj.delete()
+
+    def getProjectilesAlongLine(self, start, end):
+        """
+        Returns the projectiles whose sphere touches the line segment from `start` to `end`.
+        Projectiles aren't in the physics world, this is how traces find them.
+        """
+
+        line = end - start
+        lenSqr = line.lengthSquared()
+        projs = []
+        for proj in self.projectiles.values():
+            toProj = proj.pos - start
+            if lenSqr > 0.0:
+                frac = min(max(toProj.dot(line) / lenSqr, 0.0), 1.0)
+                toProj -= line * frac
+            if toProj.lengthSquared() <= proj.Radius * proj.Radius:
+                projs.append(proj)
+        return projs
+
+    def update(self):
+        if not self.projectiles:
+            return
+
+        world = self.battleZone.getPhysicsWorld()
+        now = globalClock.getFrameTime()
+
+        for proj in self.projectiles.values():
+            if proj.manager is not self:
+                # Removed by the hit callbacks of another projectile.
+                continue
+
+            elapsed = now - proj.spawnTime
+            currPos = proj.getPosAt(elapsed)
+            proj.setPos(currPos)
+
+            if world and currPos != proj.lastPos:
+                result = world.sweepTestClosest(proj.getShape(), TransformState.makePos(proj.lastPos),
+                                                TransformState.makePos(currPos), proj.Mask)
+                if result.hasHit():
+                    intoNode = result.getNode()
+                    if (not proj.isExcluded(intoNode) and
+                        not (intoNode.getIntoCollideMask() & proj.Mask).isZero()):
+
+                        intoNP = NodePath(intoNode)
+                        for cbk in list(proj.hitCallbacks):
+                            cbk(result, proj, intoNP)
+                        # The projectile stops at the first thing it hits.
+                        self.removeProjectile(proj)
+                        continue
+
+            proj.lastPos = currPos
+
+            if elapsed >= proj.getDuration():
+                proj.ivalFinished()
+
+    def cleanup(self):
+        for proj in self.projectiles.values():
+            proj.manager = None
+            proj.delete()
+        self.projectiles = None
+        self.battleZone = None
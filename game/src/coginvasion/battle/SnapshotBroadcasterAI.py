@@ -0,0 +1,322 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file SnapshotBroadcasterAI.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from panda3d.core import Datagram
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+from direct.distributed.ClockDelta import globalClockDelta
+from direct.distributed.DistributedSmoothNodeAI import DistributedSmoothNodeAI
+
+import SnapshotGlobals
+
+# Relevance tiers of an NPC for one client.
+TIER_NEAR   = 0 # In the client's PVS and close by, sent every snapshot.
+TIER_FAR    = 1 # In the client's PVS but far away, sent every few snapshots.
+TIER_HIDDEN = 2 # Outside of the client's PVS, culled until it's relevant again.
+
+class ClientSnapshotState:
+    """
+    What one client has been sent: its own delta state, since it isn't sent every NPC.
+    """
+
+    def __init__(self, avId):
+        self.avId = avId
+        # id(node) -> last quantized components we sent this client
+        self.lastSent = {}
+        self.wantKeyframe = True
+
+class SnapshotBroadcasterAI:
+    """
+    Sends the position and rotation of every NPC in a battle zone in one npcSnapshot
+    message, instead of each NPC broadcasting its own setSmPosHpr.
+
+    Components are quantized like the smooth node fields, and only the ones that changed
+    since the last snapshot are sent. Every ai-snapshot-keyframe-interval seconds, and when
+    a toon enters the zone, everything is sent so that new clients catch up.
+    See the SnapshotReceiver of the client.
+
+    When the zone has a BSP level, each toon gets its own snapshot, and each NPC is put in
+    a relevance tier for that toon from its distance and the PVS (see TIER_*). Far NPCs
+    are sent less often and NPCs outside the toon's PVS are left out until they matter.
+    """
+
+    notify = directNotify.newCategory("SnapshotBroadcasterAI")
+
+    # How long the bandwidth counter averages over.
+    BandwidthWindow = 5.0
+
+    def __init__(self, battleZone):
+        self.battleZone = battleZone
+        self.period = config.GetFloat('ai-snapshot-period', 0.1)
+        self.keyframeInterval = config.GetFloat('ai-snapshot-keyframe-interval', 1.0)
+
+        self.wantRelevance = config.GetBool('ai-snapshot-relevance', True)
+        self.nearDistance = config.GetFloat('ai-snapshot-near-distance', 60.0)
+        # A far NPC is sent every this many snapshots.
+        self.farInterval = max(1, config.GetInt('ai-snapshot-far-interval', 4))
+        # NPCs outside of the PVS are sent every this many snapshots, 0 culls them.
+        self.hiddenInterval = max(0, config.GetInt('ai-snapshot-hidden-interval', 0))
+
+        # id(node) -> node. NPCs are NodePaths, which compare by node, so they're
+        # kept by identity for a node that was already removed to still be found.
+        self.nodes = {}
+        # id(node) -> last quantized components we sent for it, None until the first keyframe
+        self.lastSent = {}
+        # avId -> ClientSnapshotState, when snapshots are sent per client
+        self.clients = {}
+
+        self.snapshotNum = 0
+        self.lastSnapshotTime = 0.0
+        self.lastKeyframeTime = 0.0
+        self.wantKeyframe = True
+
+        self.resetStats()
+
+    def resetStats(self):
+        self.bytesSent = 0
+        self.numSnapshots = 0
+        self.windowStart = globalClock.getFrameTime()
+        self.windowBytes = 0
+        self.bandwidth = 0.0
+        # Tier -> how many (client, NPC) pairs were in it in the last snapshot.
+        self.tierCounts = [0, 0, 0]
+
+    def getBytesSent(self):
+        return self.bytesSent
+
+    def getNumSnapshots(self):
+        return self.numSnapshots
+
+    def getBandwidth(self):
+        """
+        Returns the bytes per second this zone's snapshots took over the last window.
+        """
+
+        return self.bandwidth
+
+    def getTierCounts(self):
+        return list(self.tierCounts)
+
+    def addNode(self, node):
+        if not id(node) in self.nodes:
+            self.nodes[id(node)] = node
+            self.lastSent[id(node)] = None
+
+    def removeNode(self, node):
+        if id(node) in self.nodes:
+            del self.nodes[id(node)]
+            del self.lastSent[id(node)]
+            for client in self.clients.values():
+                client.lastSent.pop(id(node), None)
+
+    def hasNode(self, node):
+        return id(node) in self.nodes
+
+    def requestKeyframe(self):
+        self.wantKeyframe = True
+
+    def sendNodeNow(self, node):
+        # The node teleported, don't wait for the keyframe to send all of it.
+        if id(node) in self.nodes:
+            self.lastSent[id(node)] = None
+            for client in self.clients.values():
+                client.lastSent.pop(id(node), None)
+
+    def usePerClientSnapshots(self):
+        bspLoader = self.battleZone.bspLoader
+        return self.wantRelevance and bspLoader is not None and bspLoader.hasActiveLevel()
+
+    def getTier(self, toon, node):
+        perception = self.battleZone.getPerception()
+        if not perception.isClusterVisible(perception.getLeaf(toon), perception.getLeaf(node)):
+            return TIER_HIDDEN
+        if (perception.getPos(toon) - perception.getPos(node)).lengthSquared() > self.nearDistance * self.nearDistance:
+            return TIER_FAR
+        return TIER_NEAR
+
+    def isTierDue(self, tier, node):
+        if tier == TIER_NEAR:
+            return True
+        interval = self.farInterval if tier == TIER_FAR else self.hiddenInterval
+        if interval == 0:
+            return False
+        # Spread the NPCs of a tier over the snapshots instead of sending all of them at once.
+        return (self.snapshotNum + node.doId) % interval == 0
+
+    def writeEntry(self, dg, node, values, last, keyframe):
+        mask = 0
+        for i in xrange(SnapshotGlobals.NumComponents):
+            if keyframe or last is None or values[i] != last[i]:
+                mask |= 1 << i
+        if not mask:
+            return False
+
+        dg.addUint32(node.doId)
+        dg.addUint8(mask)
+        for i in xrange(SnapshotGlobals.NumComponents):
+            if mask & (1 << i):
+                dg.addInt16(values[i])
+        return True
+
+    def update(self):
+        if not self.nodes:
+            return
+
+        now = globalClock.getFrameTime()
+        if now - self.lastSnapshotTime < self.period:
+            return
+        self.lastSnapshotTime = now
+        self.snapshotNum += 1
+
+        keyframe = self.wantKeyframe or now - self.lastKeyframeTime >= self.keyframeInterval
+        if keyframe:
+            self.wantKeyframe = False
+            self.lastKeyframeTime = now
+
+        # Quantize everyone once, whoever they're sent to.
+        values = {}
+        for node in self.nodes.values():
+            if node.isDeleted() or node.isEmpty():
+                self.removeNode(node)
+                continue
+            values[id(node)] = SnapshotGlobals.quantize(node.getPos(), node.getHpr())
+
+        timestamp = globalClockDelta.getFrameNetworkTime()
+        if self.usePerClientSnapshots():
+            numBytes = self.sendClientSnapshots(values, keyframe, timestamp)
+        else:
+            if self.clients:
+                # The clients were each sent something different, start them over.
+                keyframe = True
+            numBytes = self.sendSnapshot(values, keyframe, timestamp)
+
+        if not numBytes:
+            return
+
+        self.numSnapshots += 1
+        self.bytesSent += numBytes
+        self.windowBytes += numBytes
+        elapsed = now - self.windowStart
+        if elapsed >= self.BandwidthWindow:
+            self.bandwidth = self.windowBytes / elapsed
+            self.windowBytes = 0
+            self.windowStart = now
+            self.notify.debug("Zone {0}: {1} NPCs, {2:.0f} bytes/sec, tiers {3}".format(
+                self.battleZone.zoneId, len(self.nodes), self.bandwidth, self.tierCounts))
+
+    def sendSnapshot(self, values, keyframe, timestamp):
+        # Everyone in the zone gets the same snapshot.
+        self.clients = {}
+
+        dg = Datagram()
+        numEntries = 0
+        for key, node in self.nodes.items():
+            if self.writeEntry(dg, node, values[key], self.lastSent[key], keyframe):
+                self.lastSent[key] = values[key]
+                numEntries += 1
+
+        if not numEntries:
+            return 0
+
+        data = dg.getMessage()
+        self.battleZone.sendUpdate('npcSnapshot', [timestamp, data])
+        return len(data)
+
+    def sendClientSnapshots(self, values, keyframe, timestamp):
+        self.tierCounts = [0, 0, 0]
+
+        toons = []
+        for avId in self.battleZone.watchingAvatarIds:
+            toon = self.battleZone.air.doId2do.get(avId)
+            if toon and not toon.isEmpty():
+                toons.append(toon)
+        avIds = [toon.doId for toon in toons]
+        for avId in self.clients.keys():
+            if not avId in avIds:
+                del self.clients[avId]
+
+        numBytes = 0
+        for toon in toons:
+            client = self.clients.get(toon.doId)
+            if not client:
+                client = ClientSnapshotState(toon.doId)
+                self.clients[toon.doId] = client
+            clientKeyframe = keyframe or client.wantKeyframe
+            client.wantKeyframe = False
+
+            dg = Datagram()
+            numEntries = 0
+            for key, node in self.nodes.items():
+                tier = self.getTier(toon, node)
+                self.tierCounts[tier] += 1
+                last = client.lastSent.get(key)
+                # Whatever the tier, a client that has never been sent this NPC gets it once.
+                if last is not None and not self.isTierDue(tier, node):
+                    continue
+                if self.writeEntry(dg, node, values[key], last, clientKeyframe):
+                    client.lastSent[key] = values[key]
+                    numEntries += 1
+
+            if numEntries:
+                data = dg.getMessage()
+                self.battleZone.sendUpdateToAvatarId(toon.doId, 'npcSnapshot', [timestamp, data])
+                numBytes += len(data)
+
+        return numBytes
+
+    def cleanup(self):
+        for node in self.nodes.values():
+            node.snapshotBroadcaster = None
+        self.nodes = {}
+        self.lastSent = {}
+        self.clients = {}
+        self.battleZone = None
+
+class SnapshotNodeAI:
+    """
+    Mixin for DistributedSmoothNodeAIs that are moved by the AI. When the node is in a
+    battle zone, startPosHprBroadcast() hands it to the zone's SnapshotBroadcasterAI.
+    Anywhere else it broadcasts by itself like before.
+    """
+
+    snapshotBroadcaster = None
+
+    def findSnapshotBroadcaster(self):
+        bz = None
+        if hasattr(self, 'getBattleZone'):
+            bz = self.getBattleZone()
+        if not bz:
+            bz = self.air.getBattleZone(self.zoneId)
+        if not bz and hasattr(self, 'dispatch'):
+            # Entities are in the entity zone of the battle zone that spawned them.
+            bz = self.dispatch
+        return getattr(bz, 'snapshotBroadcaster', None)
+
+    def startPosHprBroadcast(self, period = .2, stagger = 0, type = None):
+        self.stopPosHprBroadcast()
+
+        broadcaster = self.findSnapshotBroadcaster()
+        if not broadcaster:
+            DistributedSmoothNodeAI.startPosHprBroadcast(self, period, stagger, type)
+            return
+
+        self.snapshotBroadcaster = broadcaster
+        broadcaster.addNode(self)
+        self.d_broadcastPosHpr = self.__sendSnapshotNow
+
+    def stopPosHprBroadcast(self):
+        if self.snapshotBroadcaster:
+            self.snapshotBroadcaster.removeNode(self)
+            self.snapshotBroadcaster = None
+        DistributedSmoothNodeAI.stopPosHprBroadcast(self)
+
+    def __sendSnapshotNow(self):
+        if self.snapshotBroadcaster:
+            self.snapshotBroadcaster.sendNodeNow(self)
@@ -0,0 +1,37 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file SnapshotGlobals.py
+@author agent
+@date October 18, 2026
+
+"""
+
+# The components of an npcSnapshot entry, in the order of the bits of its mask.
+COMP_X = 0
+COMP_Y = 1
+COMP_Z = 2
+COMP_H = 3
+COMP_P = 4
+COMP_R = 5
+NumComponents = 6
+
+# Same precision as the smooth node fields: a tenth of a unit, and a tenth of a degree.
+PosScale = 10.0
+HprScale = 10.0
+
+Int16Min = -(1 << 15)
+Int16Max = (1 << 15) - 1
+
+def quantizeValue(value, scale):
+    return int(min(max(round(value * scale), Int16Min), Int16Max))
+
+def quantize(pos, hpr):
+    return (quantizeValue(pos[0], PosScale), quantizeValue(pos[1], PosScale), quantizeValue(pos[2], PosScale),
+            quantizeValue(hpr[0] % 360.0, HprScale), quantizeValue(hpr[1] % 360.0, HprScale),
+            quantizeValue(hpr[2] % 360.0, HprScale))
+
+def dequantize(values):
+    return ([values[COMP_X] / PosScale, values[COMP_Y] / PosScale, values[COMP_Z] / PosScale],
+            [values[COMP_H] / HprScale, values[COMP_P] / HprScale, values[COMP_R] / HprScale])
@@ -0,0 +1,62 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file SnapshotReceiver.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from panda3d.core import Datagram, DatagramIterator
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+
+import SnapshotGlobals
+
+class SnapshotReceiver:
+    """
+    Feeds the npcSnapshots of our battle zone to the smoothers of the NPCs in it.
+    See the SnapshotBroadcasterAI of the AI.
+    """
+
+    notify = directNotify.newCategory("SnapshotReceiver")
+
+    def __init__(self, battleZone):
+        self.battleZone = battleZone
+        # doId -> last quantized components we got for it
+        self.lastValues = {}
+
+    def handleSnapshot(self, timestamp, data):
+        dgi = DatagramIterator(Datagram(data))
+        while dgi.getRemainingSize() > 0:
+            doId = dgi.getUint32()
+            mask = dgi.getUint8()
+            values = self.lastValues.get(doId)
+            if values is None:
+                values = self.getCurrentValues(doId)
+            else:
+                values = list(values)
+            for i in xrange(SnapshotGlobals.NumComponents):
+                if mask & (1 << i):
+                    values[i] = dgi.getInt16()
+
+            obj = self.battleZone.cr.doId2do.get(doId)
+            if not obj:
+                # Not generated yet, or already gone. The next keyframe has all of it.
+                self.lastValues.pop(doId, None)
+                continue
+            self.lastValues[doId] = values
+            pos, hpr = SnapshotGlobals.dequantize(values)
+            obj.setSmPosHpr(pos[0], pos[1], pos[2], hpr[0], hpr[1], hpr[2], timestamp)
+
+    def getCurrentValues(self, doId):
+        # Our first update of this NPC doesn't have everything, start from where it is now.
+        obj = self.battleZone.cr.doId2do.get(doId)
+        if not obj or obj.isEmpty():
+            return [0] * SnapshotGlobals.NumComponents
+        return list(SnapshotGlobals.quantize(obj.getPos(), obj.getHpr()))
+
+    def cleanup(self):
+        self.lastValues = None
+        self.battleZone = None
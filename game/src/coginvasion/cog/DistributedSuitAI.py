@@ -15,6 +15,7 @@ from direct.directnotify.DirectNotifyGlobal import directNotify
 from direct.interval.IntervalGlobal import Sequence, Wait, Func
 
 from src.coginvasion.avatar.DistributedAvatarAI import DistributedAvatarAI
+from src.coginvasion.ai.AIZoneData import AIZoneData
 from src.coginvasion.avatar.Activities import ACT_WAKE_ANGRY, ACT_SMALL_FLINCH, ACT_DIE, ACT_VICTORY_DANCE, ACT_COG_FLY_DOWN
 from src.coginvasion.avatar.AvatarTypes import *
 from src.coginvasion.cog.ai.AIGlobal import *
@@ -72,13 +73,16 @@ class DistributedSuitAI(DistributedAvatarAI, BaseNPCAI):
         self.deathAnim = None
         self.deathTimeLeft = 0
         self.deathTaskName = None
+        # Whether handleDeath() is called once our health runs out, see watchHealth().
+        self.watchingHealth = False
 
         # This is for handling combos.
         # Combo data stores an avId and gag type pair.
         # Avatar Ids are cheaper to store, so we use those.
-        # comboDataTaskName is the name of the task that clears the data.
+        # comboDataTaskName is the name of our timer on the zone's timing wheel that clears the data.
         self.comboData = {}
         self.comboDataTaskName = None
+        self.zoneData = None
         self.clearComboDataTime = 3
         self.showComboDamageTime = 0.75
         
@@ -254,11 +258,19 @@ class DistributedSuitAI(DistributedAvatarAI, BaseNPCAI):
         if not self.isDead() or self.isDead() and self.deathTimeLeft > 0:
             self.d_announceHealth(0, prevHealth - self.health)
 
-    def monitorHealth(self, task):
+        if self.watchingHealth and prevHealth > 0 and self.health <= 0:
+            self.watchingHealth = False
+            self.handleDeath()
+
+    def watchHealth(self):
+        # Calls handleDeath() when our health runs out, or right away if it already has.
+        self.watchingHealth = True
         if self.health <= 0:
-            self.killSuit()
-            return task.done
-        return task.cont
+            self.watchingHealth = False
+            self.handleDeath()
+
+    def handleDeath(self):
+        self.killSuit()
 
         """
         
@@ -278,14 +290,8 @@ class DistributedSuitAI(DistributedAvatarAI, BaseNPCAI):
                 taskMgr.doMethodLater(1, self.__handleDeath, name = self.deathTaskName)
         """
 
-    def clearComboData(self, task):
+    def clearComboData(self):
         self.comboData = {}
-
-        if not hasattr(self, 'clearComboDataTime'):
-            return task.done
-
-        task.delayTime = self.clearComboDataTime
-        return task.again
             
     def __handleTacticalAttacks(self, avId, gagName, gagData, damageInfo, isPlayer):
         # Gets the damage and the damage offset.
@@ -333,6 +339,10 @@ class DistributedSuitAI(DistributedAvatarAI, BaseNPCAI):
         return baseDmg, dmgOffset
 
     def __handleCombos(self, avId, effectiveGagDmg, gagTrack):
+        if not self.comboData and self.zoneData:
+            # The combo window starts with the first hit.
+            self.zoneData.getTimingWheel().schedule(self.comboDataTaskName, self.clearComboDataTime, self.clearComboData)
+
         self.comboData.update({avId : {gagTrack : effectiveGagDmg}})
 
         data = self.comboData.values()
@@ -369,7 +379,8 @@ class DistributedSuitAI(DistributedAvatarAI, BaseNPCAI):
             comboDamage = int((float(totalDamage) / float(totalGags)) * comboPerct)
             self.b_setHealth(self.getHealth() - comboDamage)
             self.comboData.clear()
-            taskMgr.remove(self.comboDataTaskName)
+            if self.zoneData:
+                self.zoneData.getTimingWheel().cancel(self.comboDataTaskName)
             
         return isCombo, comboDamage
 
@@ -516,7 +527,7 @@ class DistributedSuitAI(DistributedAvatarAI, BaseNPCAI):
         
     def spawnGeneric(self):
         #self.b_setParent(CIGlobals.SPRender)
-        taskMgr.add(self.monitorHealth, self.uniqueName('monitorHealth'))
+        self.watchHealth()
 
     def announceGenerate(self):
         DistributedAvatarAI.announceGenerate(self)
@@ -524,9 +535,9 @@ class DistributedSuitAI(DistributedAvatarAI, BaseNPCAI):
         
         self.startAI()
 
-        # Let's set the combo data task name and start the task.
+        # Combo data is cleared by the timing wheel shared by everything in our zone.
         self.comboDataTaskName = self.uniqueName('clearComboData')
-        taskMgr.add(self.clearComboData, self.comboDataTaskName)
+        self.zoneData = AIZoneData(self.air, self.parentId, self.zoneId)
 
         #dur = 8
 
@@ -552,8 +563,10 @@ class DistributedSuitAI(DistributedAvatarAI, BaseNPCAI):
         self.stopStun()
         taskMgr.remove(self.uniqueName('__handleDeath'))
         taskMgr.remove(self.uniqueName('Resume Thinking'))
-        taskMgr.remove(self.uniqueName('monitorHealth'))
-        taskMgr.remove(self.comboDataTaskName)
+        if self.zoneData:
+            self.zoneData.getTimingWheel().cancel(self.comboDataTaskName)
+            self.zoneData.destroy()
+            self.zoneData = None
         if self.tacticalSeq:
             self.tacticalSeq.pause()
             self.tacticalSeq = None
@@ -565,6 +578,7 @@ class DistributedSuitAI(DistributedAvatarAI, BaseNPCAI):
         self.deathTimeLeft = None
         self.comboData = None
         self.firstTimeDead = None
+        self.watchingHealth = None
         self.clearComboDataTime = None
         self.showComboDamageTime = None
         self.showWeaknessBonusDamageTime = None
@@ -581,6 +595,8 @@ class DistributedSuitAI(DistributedAvatarAI, BaseNPCAI):
         del self.deathTimeLeft
         del self.comboData
         del self.comboDataTaskName
+        del self.zoneData
+        del self.watchingHealth
         del self.clearComboDataTime
         del self.showComboDamageTime
         del self.showWeaknessBonusDamageTime
@@ -8,6 +8,7 @@ from src.coginvasion.cog.ai.tasks.BaseTaskAI import BaseTaskAI
 from src.coginvasion.cog.ai.tasks.TasksAI import *
 from src.coginvasion.avatar.Activities import ACT_WAKE_ANGRY, ACT_NONE, ACT_SMALL_FLINCH, ACT_DIE
 from src.coginvasion.avatar.Motor import Motor
+from src.coginvasion.battle.CoverTableAI import COVER_HIDDEN, COVER_PROBABLE, COVER_UNKNOWN
 from ScheduleAI import Schedule
 from ConditionsAI import *
 from RelationshipsAI import *
@@ -264,7 +265,11 @@ class BaseNPCAI(BaseCombatCharacterAI):
         
         self.oldTargets = deque(maxlen = self.MAX_OLD_ENEMIES)
         
-        self.runAITask = None
+        self.thinking = False
+        # Frame time of our last think, and the seconds between it and the one before.
+        # We don't think every frame, so anything done per think scales by this.
+        self.lastThinkTime = None
+        self.thinkDt = 0.0
 
     def remember(self, bits):
         self.memory |= bits
@@ -308,32 +313,71 @@ class BaseNPCAI(BaseCombatCharacterAI):
         myPos = self.getPos()
         lookersOffset = threatPos + viewOffset
 
-        world = self.getBattleZone().getPhysicsWorld()
+        bz = self.getBattleZone()
+        world = bz.getPhysicsWorld()
+        coverTable = bz.getCoverTable()
 
         #print "findCover"
 
         # Find cover hint nodes in radius of me
-        kdTree = self.getBattleZone().coverKDTree
+        kdTree = bz.coverKDTree
         if kdTree:
             nearby = kdTree.query_ball_point([myPos[0], myPos[1], myPos[2]], maxDist)
         else:
             nearby = []
-        for nodeIdx in nearby:
-            nodePos = self.getBattleZone().coverHints[nodeIdx].getCEntity().getOrigin()
-            result = world.rayTestClosest(nodePos + viewOffset, lookersOffset, CIGlobals.WorldGroup)
-            #print "findCover result:", result, result.hasHit(), result.getNode()
+
+        if coverTable:
+            # Use the precomputed table: hints the threat's leaf can't see are taken
+            # without a trace, then the single best of the rest is confirmed with one trace.
+            # Hints the threat's leaf has seen come last, the threat may be standing
+            # somewhere else in its leaf.
+            threatLeaf = coverTable.findLeaf(threatPos)
+            hidden = []
+            probable = []
+            unknown = []
+            exposed = []
+            for nodeIdx in nearby:
+                cover = coverTable.classify(nodeIdx, threatLeaf)
+                if cover == COVER_HIDDEN:
+                    hidden.append((nodeIdx, False))
+                elif cover == COVER_PROBABLE:
+                    probable.append((nodeIdx, True))
+                elif cover == COVER_UNKNOWN:
+                    unknown.append((nodeIdx, True))
+                else:
+                    exposed.append((nodeIdx, True))
+            candidates = hidden + probable + unknown + exposed
+            maxTraces = 1
+        else:
+            candidates = [(nodeIdx, True) for nodeIdx in nearby]
+            maxTraces = len(candidates)
+
+        traces = 0
+        for nodeIdx, needsTrace in candidates:
+            nodePos = bz.coverHints[nodeIdx].getCEntity().getOrigin()
+
+            # The cover point has to be closer to me than the threat
+            distToThreat = (threatPos - nodePos).lengthSquared()
+            distToMe = (myPos - nodePos).lengthSquared()
+            if distToMe > distToThreat or not self.validateCover(nodePos):
+                continue
+
+            if needsTrace:
+                if traces >= maxTraces:
+                    break
+                traces += 1
+                result = world.rayTestClosest(nodePos + viewOffset, lookersOffset, CIGlobals.WorldGroup)
+                #print "findCover result:", result, result.hasHit(), result.getNode()
+                hasCover = result.hasHit()
+            else:
+                # The threat can't possibly see this node, no need to trace.
+                hasCover = True
+
             # if this cover point will block the threat's line of sight to me
-            if result.hasHit():
-                distToThreat = (threatPos - nodePos).lengthSquared()
-                distToMe = (myPos - nodePos).lengthSquared()
-                # ...and is also closer to me than the threat
-                if distToMe <= distToThreat:
-                    if self.validateCover(nodePos):
-                        self.planPath(nodePos)
-                        #print "Found cover node", nodePos
-                        return True
-                #else:
-                    #print "Found cover, but the node is further away than the threat"
+            if hasCover:
+                self.planPath(nodePos)
+                #print "Found cover node", nodePos
+                return True
         return False
 
     def findLateralCover(self, threatPos, viewOffset):
@@ -349,7 +393,17 @@ class BaseNPCAI(BaseCombatCharacterAI):
         stepRight[2] = 0
         testLeft = testRight = self.getPos()
 
-        world = self.getBattleZone().getPhysicsWorld()
+        bz = self.getBattleZone()
+        world = bz.getPhysicsWorld()
+        coverTable = bz.getCoverTable()
+        threatLeaf = coverTable.findLeaf(threatPos) if coverTable else None
+
+        def isHidden(testPos):
+            # The PVS answers for spots the threat's leaf can't see, anything else is traced.
+            if coverTable and not bz.getPerception().isClusterVisible(threatLeaf, coverTable.findLeaf(testPos)):
+                return True
+            result = world.rayTestClosest(threatPos + viewOffset, testPos + self.getEyePosition(), CIGlobals.WorldGroup)
+            return result.hasHit()
 
         #print "findLateralCover"
 
@@ -357,17 +411,13 @@ class BaseNPCAI(BaseCombatCharacterAI):
             testLeft -= stepRight
             testRight += stepRight
             
-            result = world.rayTestClosest(threatPos + viewOffset, testLeft + self.getEyePosition(), CIGlobals.WorldGroup)
-            #print "findLateralCover left result:", result, result.hasHit(), result.getNode()
-            if result.hasHit():
+            if isHidden(testLeft):
                 if self.validateCover(testLeft):
                     self.planPath(testLeft)
                     #print "Found left cover", testLeft
                     return True
 
-            #print "findLateralCover right result:", result, result.hasHit(), result.getNode()
-            result = world.rayTestClosest(threatPos + viewOffset, testRight + self.getEyePosition(), CIGlobals.WorldGroup)
-            if result.hasHit():
+            if isHidden(testRight):
                 if self.validateCover(testRight):
                     self.planPath(testRight)
                     #print "Found right cover", testRight
@@ -386,7 +436,7 @@ class BaseNPCAI(BaseCombatCharacterAI):
         ideal = self.idealYaw
         #print current, ideal
         if current != ideal:
-            speed = yawSpeed * globalClock.getDt() * 10
+            speed = yawSpeed * self.getThinkDt() * 10
             move = ideal - current
             if ideal > current:
                 if move >= 180:
@@ -489,21 +539,14 @@ class BaseNPCAI(BaseCombatCharacterAI):
     def isPlayerAlive(self, plyr):
         return not plyr.isDead()
 
-    def isSameLeafAsPlayer(self, plyr):
-        if not CIGlobals.isNodePathOk(plyr) or not CIGlobals.isNodePathOk(self):
-            return False
+    def getPerception(self):
+        return self.battleZone.getPerception()
 
-        plLeaf = self.battleZone.bspLoader.findLeaf(plyr.getPos() + (0, 0, 0.05))
-        myLeaf = self.battleZone.bspLoader.findLeaf(self.getPos() + (0, 0, 0.05))
-        return plLeaf == myLeaf
+    def isSameLeafAsPlayer(self, plyr):
+        return self.getPerception().isSameLeaf(self, plyr)
 
     def isPlayerInPVS(self, plyr):
-        if not CIGlobals.isNodePathOk(plyr) or not CIGlobals.isNodePathOk(self):
-            return False
-        
-        plLeaf = self.battleZone.bspLoader.findLeaf(plyr.getPos() + (0, 0, 0.05))
-        myLeaf = self.battleZone.bspLoader.findLeaf(self.getPos() + (0, 0, 0.05))
-        return self.battleZone.bspLoader.isClusterVisible(myLeaf, plLeaf)
+        return self.getPerception().isInPVS(self, plyr)
         
     def getDistanceSquared(self, other):
         return (self.getPos(render) - other.getPos(render)).lengthSquared()
@@ -513,7 +556,7 @@ class BaseNPCAI(BaseCombatCharacterAI):
         
     def doesLineTraceToPlayer(self, plyr):
         # Is the player occluded by any BSP faces?
-        return self.battleZone.traceLine(self.getPos(render) + (0, 0, 3.5 / 2), plyr.getPos(render) + (0, 0, 2.0))
+        return self.getPerception().traceLine(self, plyr)
         
     def isPlayerInVisionCone(self, plyr):
         # Is the player in my angle of vision?
@@ -542,17 +585,7 @@ class BaseNPCAI(BaseCombatCharacterAI):
         return self.getDistanceSquared(plyr) <= self.MAX_VISION_DISTANCE_SQR
 
     def isPlayerVisible(self, plyr, checkVisionAngle = True, checkVisionDistance = True):
-        # Check if player is potentially visible from my leaf.
-        if not self.isPlayerInPVS(plyr):
-            return False
-
-        if checkVisionAngle and not self.isPlayerInVisionCone(plyr):
-            return False
-                
-        if checkVisionDistance and not self.isPlayerInVisionRange(plyr):
-            return False
-
-        return self.doesLineTraceToPlayer(plyr)
+        return self.getPerception().isVisible(self, plyr, checkVisionAngle, checkVisionDistance)
         
     def getBestVisibleTarget(self):
         target = None
@@ -643,10 +676,11 @@ class BaseNPCAI(BaseCombatCharacterAI):
             else:
                 self.clearConditions(COND_TARGET_FACING_ME)
                 
-            if self.target.entity.movementDelta != Vec3.zero():
+            movementDelta = self.target.entity.getMovementDelta()
+            if movementDelta != Vec3.zero():
                 # trail the enemy a bit
                 self.target.lastKnownPosition = (
-                    self.target.lastKnownPosition - self.target.entity.movementDelta * random.uniform(-0.05, 0)
+                    self.target.lastKnownPosition - movementDelta * random.uniform(-0.05, 0)
                 )
         elif not self.hasConditions(COND_TARGET_OCCLUDED|COND_SEE_TARGET) and distToTarget <= 256:
             # if the target is not occluded, and unseen, that means it is behind or beside us
@@ -853,50 +887,11 @@ class BaseNPCAI(BaseCombatCharacterAI):
         self.clearConditions(COND_SEE_HATE | COND_SEE_FEAR | COND_SEE_DISLIKE |
                              COND_SEE_TARGET | COND_SEE_FRIEND | COND_FRIEND_IN_WAY)
         
-        bits = 0
-        
         del self.avatarsInSight[:]
         
-        # Go through all known avatars in my zone.
-        for i in xrange(len(base.air.avatars[self.battleZone.zoneId])):
-            av = base.air.avatars[self.battleZone.zoneId][i]
-            # Ignore myself
-            if av == self:
-                continue
-                
-            #if av.__class__.__name__ == 'DistributedPlayerToonAI':
-            #    continue
-                
-            if av.getHealth() <= 0:
-                #print "\tdead"
-                continue
-                
-            relationship = av.getRelationshipTo(self)
-            if relationship == RELATIONSHIP_NONE:
-                continue
-
-            if not self.isPlayerVisible(av):
-                continue
-                
-            self.avatarsInSight.append(av)
-                
-            if self.target and av == self.target.entity:
-                # the visible avatar happens to be our target
-                bits |= COND_SEE_TARGET
-                
-            if relationship == RELATIONSHIP_HATE:
-                bits |= COND_SEE_HATE
-            elif relationship == RELATIONSHIP_FEAR:
-                bits |= COND_SEE_FEAR
-            elif relationship == RELATIONSHIP_FRIEND:
-                if (bits & COND_FRIEND_IN_WAY) == 0 and self.shouldYield(av):
-                    # We need to move out of the way of our friend
-                    bits |= COND_FRIEND_IN_WAY
-                bits |= COND_SEE_FRIEND
-            elif relationship == RELATIONSHIP_DISLIKE:
-                bits |= COND_SEE_DISLIKE
-                
-        self.setConditions(bits)
+        # The battle zone's perception pass shares leaf lookups and traces
+        # between all of the NPCs in the zone.
+        self.setConditions(self.getPerception().look(self, self.avatarsInSight))
 
     def isScheduleValid(self):
         if not self.schedule:
@@ -909,6 +904,9 @@ class BaseNPCAI(BaseCombatCharacterAI):
 
     def setDamageConditions(self, dmgAmt):
         #print "damaged for", dmgAmt
+        if self.thinking:
+            # React to the hit right away, even if we're thinking at the idle rate.
+            base.air.aiScheduler.wake(self)
         if dmgAmt >= self.getLightDamage():
             #print "Setting light damage"
             self.setConditions(COND_LIGHT_DAMAGE)
@@ -988,21 +986,30 @@ class BaseNPCAI(BaseCombatCharacterAI):
     def startAI(self):
         self.stopAI()
         
-        self.runAITask = taskMgr.add(self.__runAITask, "BaseNPCAI.runAITask-" + str(id(self)))
-        
-    def __runAITask(self, task):
-        self.runAI()
-        return task.cont
+        # Our think steps are run by the AI repository's scheduler.
+        base.air.aiScheduler.addNPC(self)
+        self.thinking = True
+        self.lastThinkTime = None
         
     def stopAI(self):
-        if self.runAITask:
-            self.runAITask.remove()
-            self.runAITask = None
+        if self.thinking:
+            base.air.aiScheduler.removeNPC(self)
+            self.thinking = False
         
+    def getThinkDt(self):
+        return self.thinkDt
+
     def runAI(self):
         """
         Runs an AI step.
         """
+
+        now = globalClock.getFrameTime()
+        if self.lastThinkTime is None:
+            self.thinkDt = globalClock.getDt()
+        else:
+            self.thinkDt = now - self.lastThinkTime
+        self.lastThinkTime = now
         
         if not self.battleZone:
             self.notify.warning("Cannot run AI without a battle zone!")
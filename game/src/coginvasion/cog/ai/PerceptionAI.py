@@ -0,0 +1,231 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file PerceptionAI.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from panda3d.core import Vec3
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+
+from src.coginvasion.globals import CIGlobals
+from ConditionsAI import *
+from RelationshipsAI import *
+
+class PerceptionAI:
+    """
+    Shared sight service for every NPC inside of a single battle zone.
+
+    Instead of each NPC looking up BSP leafs and tracing lines on its own,
+    the battle zone owns one of these. Each avatar's leaf is found once per
+    frame, and visibility between two avatars is resolved cheapest test first:
+    PVS (cached for the lifetime of the level), vision cone, vision range, and
+    finally a line trace, which is only done once per observer/target pair
+    per frame.
+    """
+
+    notify = directNotify.newCategory("PerceptionAI")
+
+    LeafOffset = Vec3(0, 0, 0.05)
+    ObserverEyeOffset = Vec3(0, 0, 3.5 / 2)
+    TargetEyeOffset = Vec3(0, 0, 2.0)
+
+    def __init__(self, battleZone):
+        self.battleZone = battleZone
+
+        self.frame = -1
+
+        # id(avatar) -> BSP leaf, valid for the current frame.
+        self.leafs = {}
+        # id(avatar) -> position relative to render, valid for the current frame.
+        self.positions = {}
+        # (observer leaf, target leaf) -> is cluster visible.
+        # The PVS is static, so this is valid until the level changes.
+        self.clusterVis = {}
+        # (id(observer), id(target)) -> did the line trace pass, valid for the current frame.
+        self.traces = {}
+
+        self.resetStats()
+
+    def cleanup(self):
+        self.battleZone = None
+        self.leafs = None
+        self.positions = None
+        self.clusterVis = None
+        self.traces = None
+        self.stats = None
+
+    def resetStats(self):
+        self.stats = {
+            'looks'          : 0,
+            'pairsTested'    : 0,
+            'pvsRejected'    : 0,
+            'coneRejected'   : 0,
+            'rangeRejected'  : 0,
+            'tracesRun'      : 0,
+            'tracesCached'   : 0,
+            'tracesSkipped'  : 0
+        }
+
+    def getStats(self):
+        return dict(self.stats)
+
+    def resetLevel(self):
+        """
+        Called by the battle zone when its BSP level is loaded or unloaded.
+        Throws away everything that depends on the level.
+        """
+        self.clusterVis.clear()
+        self.__clearFrame()
+        self.frame = -1
+
+    def __clearFrame(self):
+        self.leafs.clear()
+        self.positions.clear()
+        self.traces.clear()
+
+    def __checkFrame(self):
+        frame = globalClock.getFrameCount()
+        if frame == self.frame:
+            return
+
+        self.frame = frame
+        self.__clearFrame()
+
+        # Find the leaf of everyone in the zone up front, once.
+        for av in self.getAvatars():
+            if CIGlobals.isNodePathOk(av):
+                self.__cacheAvatar(av)
+
+    def __cacheAvatar(self, av):
+        key = id(av)
+        self.positions[key] = av.getPos(render)
+        self.leafs[key] = self.battleZone.bspLoader.findLeaf(av.getPos() + self.LeafOffset)
+
+    def getAvatars(self):
+        return base.air.getAvatarsInZone(self.battleZone.zoneId)
+
+    def getLeaf(self, av):
+        self.__checkFrame()
+        key = id(av)
+        if key not in self.leafs:
+            self.__cacheAvatar(av)
+        return self.leafs[key]
+
+    def getPos(self, av):
+        self.__checkFrame()
+        key = id(av)
+        if key not in self.positions:
+            self.__cacheAvatar(av)
+        return self.positions[key]
+
+    def isClusterVisible(self, fromLeaf, toLeaf):
+        key = (fromLeaf, toLeaf)
+        vis = self.clusterVis.get(key, None)
+        if vis is None:
+            vis = bool(self.battleZone.bspLoader.isClusterVisible(fromLeaf, toLeaf))
+            self.clusterVis[key] = vis
+        return vis
+
+    def isSameLeaf(self, observer, target):
+        if not CIGlobals.isNodePathOk(target) or not CIGlobals.isNodePathOk(observer):
+            return False
+
+        return self.getLeaf(observer) == self.getLeaf(target)
+
+    def isInPVS(self, observer, target):
+        if not CIGlobals.isNodePathOk(target) or not CIGlobals.isNodePathOk(observer):
+            return False
+
+        return self.isClusterVisible(self.getLeaf(observer), self.getLeaf(target))
+
+    def traceLine(self, observer, target):
+        """
+        Returns True if the line from the observer's eyes to the target
+        is not blocked by any BSP faces. Only traced once per pair per frame.
+        """
+        self.__checkFrame()
+
+        key = (id(observer), id(target))
+        result = self.traces.get(key, None)
+        if result is not None:
+            self.stats['tracesCached'] += 1
+            return result
+
+        self.stats['tracesRun'] += 1
+        result = bool(self.battleZone.traceLine(self.getPos(observer) + self.ObserverEyeOffset,
+                                                self.getPos(target) + self.TargetEyeOffset))
+        self.traces[key] = result
+        return result
+
+    def isVisible(self, observer, target, checkVisionAngle = True, checkVisionDistance = True):
+        self.stats['pairsTested'] += 1
+
+        # Check if target is potentially visible from the observer's leaf.
+        if not self.isInPVS(observer, target):
+            self.stats['pvsRejected'] += 1
+            self.stats['tracesSkipped'] += 1
+            return False
+
+        if checkVisionAngle and not observer.isPlayerInVisionCone(target):
+            self.stats['coneRejected'] += 1
+            self.stats['tracesSkipped'] += 1
+            return False
+
+        if checkVisionDistance and not observer.isPlayerInVisionRange(target):
+            self.stats['rangeRejected'] += 1
+            self.stats['tracesSkipped'] += 1
+            return False
+
+        return self.traceLine(observer, target)
+
+    def look(self, npc, avatarsInSight):
+        """
+        Fills `avatarsInSight` with every avatar the NPC can currently see,
+        and returns the condition bits the NPC should set from what it saw.
+        """
+
+        self.stats['looks'] += 1
+
+        bits = 0
+        target = npc.target.entity if npc.target else None
+
+        # Go through all known avatars in the zone.
+        for av in self.getAvatars():
+            # Ignore the observer
+            if av == npc:
+                continue
+
+            if av.getHealth() <= 0:
+                continue
+
+            relationship = av.getRelationshipTo(npc)
+            if relationship == RELATIONSHIP_NONE:
+                continue
+
+            if not self.isVisible(npc, av):
+                continue
+
+            avatarsInSight.append(av)
+
+            if av == target:
+                # the visible avatar happens to be our target
+                bits |= COND_SEE_TARGET
+
+            if relationship == RELATIONSHIP_HATE:
+                bits |= COND_SEE_HATE
+            elif relationship == RELATIONSHIP_FEAR:
+                bits |= COND_SEE_FEAR
+            elif relationship == RELATIONSHIP_FRIEND:
+                if (bits & COND_FRIEND_IN_WAY) == 0 and npc.shouldYield(av):
+                    # We need to move out of the way of our friend
+                    bits |= COND_FRIEND_IN_WAY
+                bits |= COND_SEE_FRIEND
+            elif relationship == RELATIONSHIP_DISLIKE:
+                bits |= COND_SEE_DISLIKE
+
+        return bits
@@ -150,19 +150,64 @@ class Task_FaceIdeal(BaseTaskAI):
 
         return SCHED_CONTINUE
 
-class Task_GetPathToTarget(BaseTaskAI):
+class BaseTask_GetPath(BaseTaskAI):
+    """
+    Asks the battle zone for a path to getGoal() and waits for it to be planned,
+    so that the AI tick isn't blocked on detour.
+    """
+
+    def __init__(self, npc):
+        BaseTaskAI.__init__(self, npc)
+        self.request = None
+
+    def getGoal(self):
+        return None
+
+    def startTask(self):
+        BaseTaskAI.startTask(self)
+        # Drop any request left over from an interrupted run.
+        self.cancelRequest()
+
+    def cancelRequest(self):
+        if self.request:
+            self.request.cancel()
+            self.request = None
 
     def runTask(self):
-        if not self.npc.target:
-            return SCHED_FAILED
+        if not self.request:
+            goal = self.getGoal()
+            if goal is None:
+                return SCHED_FAILED
+            self.request = self.npc.getBattleZone().requestPath(self.npc.getPos(), goal, self.npc)
 
-        path = self.npc.getBattleZone().planPath(self.npc.getPos(), self.npc.target.lastKnownPosition)
+        if not self.request.isDone():
+            return SCHED_CONTINUE
+
+        path = self.request.getPath()
+        self.request = None
         if len(path) < 2:
             return SCHED_FAILED
 
         self.npc.getMotor().setWaypoints(path)
         return SCHED_COMPLETE
 
+    def stopTask(self):
+        self.cancelRequest()
+        BaseTaskAI.stopTask(self)
+
+    def cleanup(self):
+        self.cancelRequest()
+        del self.request
+        BaseTaskAI.cleanup(self)
+
+class Task_GetPathToTarget(BaseTask_GetPath):
+
+    def getGoal(self):
+        if not self.npc.target:
+            return None
+
+        return self.npc.target.lastKnownPosition
+
 class Task_RunPath(BaseTaskAI):
 
     def runTask(self):
@@ -312,18 +357,10 @@ class Task_ForgetPosition(BaseTaskAI):
         self.npc.memoryPosition = None
         return SCHED_COMPLETE
         
-class Task_GetPathToMemoryPosition(BaseTaskAI):
+class Task_GetPathToMemoryPosition(BaseTask_GetPath):
     
-    def runTask(self):
-        if not self.npc.memoryPosition:
-            return SCHED_FAILED
-            
-        path = self.npc.getBattleZone().planPath(self.npc.getPos(), self.npc.memoryPosition)
-        if len(path) < 2:
-            return SCHED_FAILED
-
-        self.npc.getMotor().setWaypoints(path)
-        return SCHED_COMPLETE
+    def getGoal(self):
+        return self.npc.memoryPosition
 
 class Task_SetPostAttackSchedule(BaseTaskAI):
 
@@ -41,7 +41,7 @@ class BombProjectileAI(DistributedPhysicsEntityAI):
     def __explodeTask(self, task):
         self.sendUpdate('explode')
 
-        for obj in self.air.avatars[self.zoneId]:
+        for obj in self.air.getAvatarsInZone(self.zoneId):
             if CIGlobals.isAvatar(obj) and self.attack.canDamage(obj):
                 dist = obj.getDistance(self)
                 if dist <= 10.0:
@@ -9,20 +9,15 @@ Copyright (c) CIO Team. All rights reserved.
 """
 
 from src.coginvasion.attack.BaseAttackAI import BaseAttackAI
-from src.coginvasion.attack.Attacks import ATTACK_FIRED
+from src.coginvasion.attack.Attacks import ATTACK_FIRED, PROJECTILE_FIRED
 from src.coginvasion.attack.LobProjectileAI import LobProjectileAI
 from src.coginvasion.globals import CIGlobals
-from src.coginvasion.phys.WorldColliderAI import WorldColliderAI
 from Fired_Shared import Fired_Shared
 
 class FiredProjectileAI(LobProjectileAI):
 
-    def doInitCollider(self):
-
-        WorldColliderAI.__init__(self, "FiredProjectileCollider", 0.75, needSelfInArgs = True,
-                          useSweep = True, resultInArgs = True, startNow = False,
-                          mask = CIGlobals.WorldGroup | CIGlobals.CharacterGroup)
-        self.world = self.air.getPhysicsWorld(self.zoneId)
+    ProjectileType = PROJECTILE_FIRED
+    Radius = 0.75
 
     def diffuseFlame(self):
         self.d_impact(self.getPos())
@@ -110,9 +105,9 @@ class FiredAI(BaseAttackAI, Fired_Shared):
                 flame = FiredProjectileAI(base.air)
                 flame.setProjectile(duration, startPos, endPos, 0.9,
                                     globalClockDelta.getFrameNetworkTime())
-                flame.generateWithRequired(self.avatar.getBattleZone().zoneId)
                 flame.addHitCallback(self.onProjectileHit)
                 flame.addExclusion(self.avatar)
+                self.avatar.getBattleZone().projectileMgr.spawn(flame)
 
                 self.lastFireTime = now
             
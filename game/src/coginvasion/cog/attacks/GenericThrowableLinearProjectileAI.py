@@ -12,21 +12,17 @@ This will make our lives easier and our workspace cleaner.
 """
 
 from src.coginvasion.attack.LinearProjectileAI import LinearProjectileAI
-from src.coginvasion.globals import CIGlobals
-from src.coginvasion.phys.WorldColliderAI import WorldColliderAI
+from src.coginvasion.attack.Attacks import PROJECTILE_GENERIC_THROWABLE
 
 class GenericThrowableLinearProjectileAI(LinearProjectileAI):
 
+    ProjectileType = PROJECTILE_GENERIC_THROWABLE
+    Radius = 1.0
+
     def __init__(self, air):
         LinearProjectileAI.__init__(self, air)
         self.attackID = -1
     
-    def doInitCollider(self):
-        WorldColliderAI.__init__(self, "throwableCollider", 1.0, needSelfInArgs = True,
-                          useSweep = True, resultInArgs = True, startNow = False,
-                          mask = CIGlobals.WorldGroup | CIGlobals.CharacterGroup)
-        self.world = self.air.getPhysicsWorld(self.zoneId)
-    
     def setData(self, attackID):
         self.attackID = attackID
         
@@ -68,6 +68,14 @@ class BuildingSuitPlannerAI:
                 bldgs.append(bldg)
         return bldgs
 
+    def cleanup(self):
+        base.taskMgr.remove(self.streetName + "-spawnNewBuilding")
+        for suit in list(self.suitsTakingOver):
+            if not suit.isDeleted():
+                suit.requestDelete()
+        self.suitsTakingOver = []
+        self.hoodClass = None
+
     def deadSuit(self, doId):
         for suit in self.suitsTakingOver:
             if suit.doId == doId:
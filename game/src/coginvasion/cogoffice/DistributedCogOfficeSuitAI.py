@@ -68,13 +68,12 @@ class DistributedCogOfficeSuitAI(DistributedSuitAI):
     def getHangoutPoint(self):
         return self.hangoutPoint
 
-    def monitorHealth(self, task):
+    def handleDeath(self):
         if not hasattr(self, 'battle') or hasattr(self, 'battle') and self.battle is None:
-            return task.done
+            return
 
-        if self.isDead():
-            self.battle.suitHPAtZero(self.doId)
-        return DistributedSuitAI.monitorHealth(self, task)
+        self.battle.suitHPAtZero(self.doId)
+        DistributedSuitAI.handleDeath(self)
 
     def isActivated(self):
         return (self.fsm.getCurrentState().getName() == 'think')
@@ -141,7 +140,7 @@ class DistributedCogOfficeSuitAI(DistributedSuitAI):
         self.stopAI()
         self.b_setParent(CIGlobals.SPRender)
         self.startPosHprBroadcast()
-        taskMgr.add(self.monitorHealth, self.uniqueName('monitorHealth'))
+        self.watchHealth()
         self.setState('guard')
 
     def delete(self):
@@ -14,6 +14,7 @@ from direct.interval.IntervalGlobal import Sequence, Wait, Func
 from direct.fsm import ClassicFSM, State
 
 from src.coginvasion.avatar.DistributedAvatarAI import DistributedAvatarAI
+from src.coginvasion.ai.AIZoneData import AIZoneData
 from src.coginvasion.cog.DistributedSuitAI import DistributedSuitAI
 from src.coginvasion.cog import SuitBank
 from src.coginvasion.globals import CIGlobals
@@ -52,16 +53,15 @@ class DistributedTakeOverSuitAI(DistributedSuitAI):
     def getDoorDoId(self):
         return self.doorDoId
 
-    def monitorHealth(self, task):
-        if self.isDead():
-            # No! I'm dead! I lost my building!
-            self.bldg.takenBySuit = False
+    def handleDeath(self):
+        # No! I'm dead! I lost my building!
+        self.bldg.takenBySuit = False
 
-            self.sendUpdate('interruptTakeOver')
-            if self.takeOverTrack:
-                self.takeOverTrack.pause()
-                self.takeOverTrack = None
-        return DistributedSuitAI.monitorHealth(self, task)
+        self.sendUpdate('interruptTakeOver')
+        if self.takeOverTrack:
+            self.takeOverTrack.pause()
+            self.takeOverTrack = None
+        DistributedSuitAI.handleDeath(self)
 
     def delete(self):
         if self.takeOverTrack:
@@ -73,10 +73,10 @@ class DistributedTakeOverSuitAI(DistributedSuitAI):
         DistributedAvatarAI.announceGenerate(self)
         self.clearTrack()
 
-        # Let's set the combo data task name and start the task.
+        # Combo data is cleared by the timing wheel shared by everything in our zone.
         self.comboDataTaskName = self.uniqueName('clearComboData')
-        taskMgr.add(self.clearComboData, self.comboDataTaskName)
-        taskMgr.add(self.monitorHealth, self.uniqueName('monitorHealth'))
+        self.zoneData = AIZoneData(self.air, self.parentId, self.zoneId)
+        self.watchHealth()
         
         self.stopPosHprBroadcast()
         self.stopAI()
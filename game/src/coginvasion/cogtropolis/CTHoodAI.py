@@ -25,7 +25,6 @@ class CTHoodAI(HoodAI.HoodAI):
         self.startup()
 
     def startup(self):
-        self.dnaFiles = []
         for i in range(self.MaxCarts):
             cart = DistributedCityCartAI.DistributedCityCartAI(self.air, i)
             cart.generateWithRequired(self.zoneId)
@@ -39,6 +39,10 @@ class CogInvasionInternalRepository(AstronInternalRepository):
     def handleConnected(self):
         self.netMessenger.register(0, 'avatarOnline')
         self.netMessenger.register(1, 'avatarOffline')
+        # An AI changed a toon's name, DNA, health, location... (see PresenceServiceUD)
+        self.netMessenger.register(2, 'avatarProfileChanged')
+        # An AI banned an account (see AvatarListServiceUD)
+        self.netMessenger.register(3, 'accountBanned')
 	
     def getAccountIdFromSender(self):
         return (self.getMsgSender() >> 32) & 0xFFFFFFFF
@@ -0,0 +1,190 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file DNACacheAI.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from panda3d.core import Datagram, DatagramIterator, Filename, VirtualFileSystem, getModelPath
+from direct.directnotify.DirectNotifyGlobal import directNotify
+
+from DNALoader import DNAStorage, loadDNAFileAI
+
+import hashlib
+import os
+
+CacheMagic = 'CIDNA'
+CacheVersion = 1
+
+class DNAZoneDataAI:
+    """
+    What the AI needs from a DNA file: the buildings, which zone each one is in,
+    and what kind of building it is.
+    """
+
+    def __init__(self, dnaFile, fileHash, blocks):
+        self.dnaFile = dnaFile
+        self.fileHash = fileHash
+        # block number -> (exterior zoneId, building type)
+        self.blocks = blocks
+
+    @staticmethod
+    def fromDNAStore(dnaFile, fileHash, dnaStore):
+        blocks = {}
+        for i in xrange(dnaStore.get_num_block_numbers()):
+            block = dnaStore.get_block_number_at(i)
+            blocks[block] = (dnaStore.get_zone_from_block_number(block),
+                             dnaStore.get_block_building_type(block))
+        return DNAZoneDataAI(dnaFile, fileHash, blocks)
+
+    def getBlocks(self):
+        """
+        Returns a list of (block number, exterior zoneId, building type).
+        """
+
+        return [(block, zoneId, buildingType) for block, (zoneId, buildingType) in self.blocks.items()]
+
+    def getZoneFromBlockNumber(self, block):
+        return self.blocks[block][0]
+
+    def getBlockBuildingType(self, block):
+        return self.blocks[block][1]
+
+class DNACacheAI:
+    """
+    Keeps the parsed DNAZoneDataAI of every DNA file the hoods load in one small binary
+    file, so that a district doesn't have to parse all of the DNA every time it starts.
+
+    Entries are keyed by the hash of their DNA file. A DNA file that changed, or isn't in
+    the cache yet, is parsed like before and the cache is written again by save().
+    The cache can be built ahead of time with AIStart --build-dna-cache.
+    """
+
+    notify = directNotify.newCategory("DNACacheAI")
+
+    def __init__(self, filename = None, enabled = True):
+        if filename is None:
+            filename = config.GetString('ai-dna-cache-file', 'astron/databases/dna-cache.bin')
+        self.filename = filename
+        self.enabled = enabled
+
+        # dnaFile -> DNAZoneDataAI
+        self.entries = {}
+        self.loaded = False
+        self.dirty = False
+
+    def isDirty(self):
+        return self.dirty
+
+    def hashDNAFile(self, dnaFile):
+        vfs = VirtualFileSystem.getGlobalPtr()
+        filename = Filename(dnaFile)
+        vfs.resolveFilename(filename, getModelPath().getValue())
+        data = vfs.readFile(filename, True)
+        if not data:
+            return None
+        return hashlib.sha1(data).hexdigest()
+
+    def load(self):
+        self.loaded = True
+        if not self.enabled or not os.path.isfile(self.filename):
+            return
+
+        with open(self.filename, 'rb') as f:
+            data = f.read()
+
+        try:
+            dgi = DatagramIterator(Datagram(data))
+            if dgi.getString() != CacheMagic or dgi.getUint16() != CacheVersion:
+                self.notify.info("{0} is from another version, ignoring it.".format(self.filename))
+                return
+
+            entries = {}
+            for i in xrange(dgi.getUint16()):
+                dnaFile = dgi.getString()
+                fileHash = dgi.getString()
+                blocks = {}
+                for j in xrange(dgi.getUint16()):
+                    block = dgi.getUint16()
+                    blocks[block] = (dgi.getUint32(), dgi.getString())
+                entries[dnaFile] = DNAZoneDataAI(dnaFile, fileHash, blocks)
+        except AssertionError:
+            # Ran off the end of the datagram.
+            self.notify.warning("{0} is corrupt, ignoring it.".format(self.filename))
+            return
+
+        self.entries = entries
+        self.notify.info("Loaded {0} DNA files from {1}".format(len(entries), self.filename))
+
+    def save(self):
+        if not self.enabled or not self.dirty:
+            return
+
+        dg = Datagram()
+        dg.addString(CacheMagic)
+        dg.addUint16(CacheVersion)
+        dg.addUint16(len(self.entries))
+        for dnaFile, entry in self.entries.items():
+            dg.addString(dnaFile)
+            dg.addString(entry.fileHash)
+            dg.addUint16(len(entry.blocks))
+            for block, (zoneId, buildingType) in entry.blocks.items():
+                dg.addUint16(block)
+                dg.addUint32(zoneId)
+                dg.addString(buildingType)
+
+        directory = os.path.dirname(self.filename)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        # Write next to the real file first so a crash can't leave half a cache behind.
+        tempFilename = self.filename + '.tmp'
+        with open(tempFilename, 'wb') as f:
+            f.write(dg.getMessage())
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+        os.rename(tempFilename, self.filename)
+
+        self.dirty = False
+        self.notify.info("Saved {0} DNA files to {1}".format(len(self.entries), self.filename))
+
+    def getDNAData(self, dnaFile):
+        if not self.loaded:
+            self.load()
+
+        fileHash = self.hashDNAFile(dnaFile)
+        entry = self.entries.get(dnaFile)
+        if entry and fileHash and entry.fileHash == fileHash:
+            return entry
+
+        self.notify.info("Parsing {0}".format(dnaFile))
+        dnaStore = DNAStorage()
+        loadDNAFileAI(dnaStore, dnaFile)
+        entry = DNAZoneDataAI.fromDNAStore(dnaFile, fileHash or '', dnaStore)
+        if self.enabled and fileHash:
+            self.entries[dnaFile] = entry
+            self.dirty = True
+        return entry
+
+def buildDNACache():
+    """
+    Parses the DNA files of every hood the AI makes and writes the cache.
+    """
+
+    from src.coginvasion.hood.TTHoodAI import TTHoodAI
+    from src.coginvasion.hood.BRHoodAI import BRHoodAI
+    from src.coginvasion.hood.DLHoodAI import DLHoodAI
+    from src.coginvasion.hood.MLHoodAI import MLHoodAI
+    from src.coginvasion.hood.DGHoodAI import DGHoodAI
+    from src.coginvasion.hood.DDHoodAI import DDHoodAI
+
+    cache = DNACacheAI()
+    cache.load()
+    for hood in [TTHoodAI, BRHoodAI, DLHoodAI, MLHoodAI, DGHoodAI, DDHoodAI]:
+        for dnaFile in hood.DNAFiles:
+            cache.getDNAData(dnaFile)
+    cache.save()
+    return cache
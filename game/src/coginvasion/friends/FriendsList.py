@@ -76,9 +76,11 @@ class FriendsList(DirectFrame):
             'off', 'off')
         self.fsm.enterInitialState()
         self.accept('gotFriendsList', self.handleFriendsList)
+        self.accept('gotFriendsListPart', self.handleFriendsListPart)
 
     def destroy(self):
         self.ignore('gotFriendsList')
+        self.ignore('gotFriendsListPart')
         self.fsm.requestFinalState()
         del self.fsm
         self.headingText.destroy()
@@ -134,6 +136,9 @@ class FriendsList(DirectFrame):
     def handleFriendsList(self, friendIdArray, nameArray, flags, accessLevels):
         self.friends = {}
         self.onlineFriends = {}
+        self.handleFriendsListPart(friendIdArray, nameArray, flags, accessLevels)
+
+    def handleFriendsListPart(self, friendIdArray, nameArray, flags, accessLevels):
         for i in xrange(len(friendIdArray)):
             avatarId = friendIdArray[i]
             name = nameArray[i]
@@ -142,6 +147,19 @@ class FriendsList(DirectFrame):
             if flags[i] == 1:
                 # This friend is online
                 self.onlineFriends[avatarId] = [name, accessLevel]
+            else:
+                self.onlineFriends.pop(avatarId, None)
+        self.refreshList()
+
+    def refreshList(self):
+        # Show the friends we just got if the list is up.
+        state = self.fsm.getCurrentState().getName()
+        if state == 'allFriendsList':
+            self.exitAllFriendsList()
+            self.enterAllFriendsList()
+        elif state == 'onlineFriendsList':
+            self.exitOnlineFriendsList()
+            self.enterOnlineFriendsList()
 
     def enterOff(self):
         self.hide()
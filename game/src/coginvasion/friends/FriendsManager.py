@@ -42,6 +42,10 @@ class FriendsManager(DistributedObjectGlobal):
     def friendsList(self, idArray, nameArray, flags, accessLevels):
         messenger.send('gotFriendsList', [idArray, nameArray, flags, accessLevels])
 
+    def friendsListPart(self, idArray, nameArray, flags, accessLevels):
+        # Some of our friends, while the rest are looked up. The whole list comes after.
+        messenger.send('gotFriendsListPart', [idArray, nameArray, flags, accessLevels])
+
     def teleportNotify(self, name):
         whisper = WhisperPopup(self.TeleportNotify % name, CIGlobals.getToonFont(), ChatGlobals.WTSystem)
         whisper.manage(base.marginManager)
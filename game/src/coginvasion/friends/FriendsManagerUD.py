@@ -10,112 +10,172 @@ Copyright (c) CIO Team. All rights reserved.
 
 from direct.directnotify.DirectNotifyGlobal import directNotify
 from direct.distributed.DistributedObjectGlobalUD import DistributedObjectGlobalUD
+from direct.distributed.PyDatagram import PyDatagram
 
 from src.coginvasion.hood import ZoneUtil
 
+from PresenceServiceUD import PresenceServiceUD
+
 class RequestFriendsListProcess:
+    """
+    Builds the friends list of a toon. The profiles of all the friends are asked for at
+    once, most come out of the profile cache and the rest are queried from the db together.
+    While the db answers, the friends we have so far are sent to the client in
+    friendsListPart messages, and the whole list is sent as friendsList when we're done.
+    """
+
     notify = directNotify.newCategory('RequestFriendsListProcess')
 
     def __init__(self, csm, air, sender):
         self.csm = csm
         self.air = air
         self.sender = sender
-        self.realFriendsList = [[], [], [], []]
+        self.partSize = max(1, config.GetInt('friends-list-part-size', 10))
         self.avatarFriendsList = []
-        self.friendIndex = 0
-        self.senderDclass = None
-
-        self.air.dbInterface.queryObject(
-            self.air.dbId,
-            sender,
-            self.senderRetrieved
-        )
-
-    def __updatedFriendsListDeletedToonDone(self, foo = None):
-        self.csm.requestFriendsList(self.sender)
-        self.cleanup()
-
-    def friendRetrieved(self, dclass, fields):
-        if dclass != self.air.dclassesByName['DistributedPlayerToonUD']:
-            self.notify.warning("Toon on friends list was deleted.")
-            self.avatarFriendsList.remove(self.avatarFriendsList[self.friendIndex])
-            dg = self.senderDclass.aiFormatUpdate('setFriendsList', self.sender, self.sender, self.air.ourChannel, [self.avatarFriendsList])
-            self.air.send(dg)
-            self.air.dbInterface.updateObject(self.air.dbId, self.sender, self.senderDclass, {'setFriendsList': [self.avatarFriendsList]}, callback = self.__updatedFriendsListDeletedToonDone)
-            return
-
-        name = fields['setName'][0]
-        accessLevel = fields['setAccessLevel'][0]
-        avatarId = self.avatarFriendsList[self.friendIndex]
-        self.realFriendsList[0].append(avatarId)
-        self.realFriendsList[1].append(name)
-        isOnline = int(avatarId in self.csm.toonsOnline)
-        self.realFriendsList[2].append(isOnline)
-        self.realFriendsList[3].append(accessLevel)
-        if self.friendIndex >= len(self.avatarFriendsList) - 1:
-            # Done, send it out
-            self.csm.sendUpdateToAvatarId(self.sender, 'friendsList', self.realFriendsList)
+        # avId -> [name, isOnline, accessLevel] of the friends we have so far
+        self.friendEntries = {}
+        self.deletedFriends = []
+        self.numWaiting = 0
+        # Friends we have that the client hasn't been sent yet.
+        self.partIds = []
+        # We only stream the list once we're waiting on the db.
+        self.streaming = False
+
+        self.csm.presence.getProfile(self.sender, self.senderRetrieved)
+
+    def senderRetrieved(self, profile):
+        if not profile:
+            self.notify.warning("Queried a non toon object?!")
             self.cleanup()
             return
-        self.friendIndex += 1
 
-        self.air.dbInterface.queryObject(
-            self.air.dbId,
-            self.avatarFriendsList[self.friendIndex],
-            self.friendRetrieved
-        )
+        self.avatarFriendsList = list(profile['setFriendsList'][0])
 
-    def senderRetrieved(self, dclass, fields):
-        if dclass != self.air.dclassesByName['DistributedPlayerToonUD']:
-            self.notify.warning("Queried a non toon object?!")
+        if len(self.avatarFriendsList) == 0:
+            self.csm.sendUpdateToAvatarId(self.sender, 'friendsList', [[], [], [], []])
+            self.cleanup()
             return
 
-        self.senderDclass = dclass
+        self.numWaiting = len(self.avatarFriendsList)
+        for friendId in self.avatarFriendsList:
+            self.csm.presence.getProfile(friendId, lambda profile, friendId = friendId: self.friendRetrieved(friendId, profile))
+            if not self.csm:
+                # Every friend was in the cache, and we're done.
+                return
 
-        self.avatarFriendsList = fields['setFriendsList'][0]
+        # Send out the friends that were in the cache, and the rest as the db gives them to us.
+        self.streaming = True
+        self.sendPart()
 
-        if len(self.avatarFriendsList) == 0:
-            self.csm.sendUpdateToAvatarId(self.sender, 'friendsList', [[], [], [], []])
+    def friendRetrieved(self, friendId, profile):
+        if not self.csm:
             return
 
-        self.air.dbInterface.queryObject(
-            self.air.dbId,
-            self.avatarFriendsList[self.friendIndex],
-            self.friendRetrieved
-        )
+        self.numWaiting -= 1
+        if not profile:
+            self.notify.warning("Toon on friends list was deleted.")
+            self.deletedFriends.append(friendId)
+        else:
+            isOnline = int(self.csm.presence.isOnline(friendId))
+            self.friendEntries[friendId] = [profile['setName'][0], isOnline, profile['setAccessLevel'][0]]
+            self.partIds.append(friendId)
+            if self.streaming and len(self.partIds) >= self.partSize:
+                self.sendPart()
+
+        if self.numWaiting <= 0:
+            self.done()
+
+    def makeFriendsList(self, avIds):
+        friendsList = [[], [], [], []]
+        for avId in avIds:
+            name, isOnline, accessLevel = self.friendEntries[avId]
+            friendsList[0].append(avId)
+            friendsList[1].append(name)
+            friendsList[2].append(isOnline)
+            friendsList[3].append(accessLevel)
+        return friendsList
+
+    def sendPart(self):
+        if self.partIds:
+            self.csm.sendUpdateToAvatarId(self.sender, 'friendsListPart', self.makeFriendsList(self.partIds))
+            self.partIds = []
+
+    def done(self):
+        if self.deletedFriends:
+            self.removeDeletedFriends()
+
+        avIds = [avId for avId in self.avatarFriendsList if avId in self.friendEntries]
+        self.csm.sendUpdateToAvatarId(self.sender, 'friendsList', self.makeFriendsList(avIds))
+        self.cleanup()
+
+    def removeDeletedFriends(self):
+        newList = [avId for avId in self.avatarFriendsList if not avId in self.deletedFriends]
+        dclass = self.air.dclassesByName['DistributedPlayerToonUD']
+        dg = dclass.aiFormatUpdate('setFriendsList', self.sender, self.sender, self.air.ourChannel, [newList])
+        self.air.send(dg)
+        self.air.dbInterface.updateObject(self.air.dbId, self.sender, dclass, {'setFriendsList': [newList]})
+        self.csm.presence.updateProfile(self.sender, {'setFriendsList': [newList]})
+        self.avatarFriendsList = newList
 
     def cleanup(self):
-        del self.air
-        del self.csm
-        del self.sender
-        del self.realFriendsList
-        del self.avatarFriendsList
-        del self.friendIndex
-        del self.senderDclass
+        self.air = None
+        self.csm = None
+        self.sender = None
+        self.avatarFriendsList = None
+        self.friendEntries = None
+        self.deletedFriends = None
+        self.partIds = None
 
 class FriendsManagerUD(DistributedObjectGlobalUD):
     notify = directNotify.newCategory("FriendsManagerUD")
 
+    # Astron reads the recipient count of a message as a uint8.
+    MaxRecipients = 255
+
     def __init__(self, air):
         DistributedObjectGlobalUD.__init__(self, air)
-        self.toonsOnline = []
+        self.presence = PresenceServiceUD(air)
         self.air.netMessenger.accept('avatarOnline', self, self.toonOnline)
         self.air.netMessenger.accept('avatarOffline', self, self.toonOffline)
 
+    def delete(self):
+        self.air.netMessenger.ignore('avatarOnline', self)
+        self.air.netMessenger.ignore('avatarOffline', self)
+        self.presence.cleanup()
+        self.presence = None
+        DistributedObjectGlobalUD.delete(self)
+
+    def sendUpdateToAvatarIds(self, avIds, fieldName, args):
+        """
+        Sends `fieldName` to every avatar in `avIds` as one message with many recipients,
+        instead of one message per avatar.
+        """
+
+        if not avIds:
+            return
+
+        field = self.dclass.getFieldByName(fieldName)
+        # Everything after the recipient channel is the same for each avatar.
+        body = field.aiFormatUpdate(self.doId, 0, self.air.ourChannel, args).getMessage()[9:]
+        for i in xrange(0, len(avIds), self.MaxRecipients):
+            recipients = avIds[i:i + self.MaxRecipients]
+            dg = PyDatagram()
+            dg.addUint8(len(recipients))
+            for avId in recipients:
+                dg.addChannel(self.GetPuppetConnectionChannel(avId))
+            dg.appendData(body)
+            self.air.send(dg)
+
     def sendWhisper(self, target, message):
         sender = self.air.getAvatarIdFromSender()
 
-        def senderAvatarResponse(dclass, fields):
-            if dclass != self.air.dclassesByName['DistributedPlayerToonUD']:
+        def senderProfile(profile):
+            if not profile:
                 return
-            name = fields['setName'][0]
+            name = profile['setName'][0]
             self.sendUpdateToAvatarId(target, 'whisper', [sender, message, name])
 
-        self.air.dbInterface.queryObject(
-            self.air.dbId,
-            sender,
-            senderAvatarResponse
-        )
+        self.presence.getProfile(sender, senderProfile)
 
     def requestFriendsList(self, sender = None):
         if sender is None:
@@ -123,101 +183,82 @@ class FriendsManagerUD(DistributedObjectGlobalUD):
         RequestFriendsListProcess(self, self.air, sender)
         
     def toonOnline(self, avatarId):
+        login = self.presence.startLogin(avatarId)
 
-        def avatarResponse(dclass, fields):
-            if dclass != self.air.dclassesByName['DistributedPlayerToonUD']:
-                self.notify.warning('toonOnline: avatarResponse: Attempted to get name of a newly online Toon and retrieved non-toon.')
+        def avatarProfile(profile):
+            if not profile:
+                self.notify.warning('toonOnline: avatarProfile: Attempted to get name of a newly online Toon and retrieved non-toon.')
                 return
 
-            name = fields['setName'][0]
-            friendsList = fields['setFriendsList'][0]
+            if not self.presence.setOnline(avatarId, profile, login):
+                # They went offline while we were getting their profile.
+                return
+            name = profile['setName'][0]
+            friendsList = profile['setFriendsList'][0]
             self.d_toonOnline(avatarId, friendsList, name)
-        
-        self.air.dbInterface.queryObject(
-            self.air.dbId,
-            avatarId,
-            avatarResponse
-        )
-        
+
+        self.presence.getProfile(avatarId, avatarProfile)
+
     def toonOffline(self, avatarId):
-        
-        def avatarResponse(dclass, fields):
-            if dclass != self.air.dclassesByName['DistributedPlayerToonUD']:
-                self.notify.warning('toonOffline: avatarResponse: Attempted to get name of an offline Toon and retrieved non-toon.')
+        # They're offline as of now, even if we have to wait for their profile.
+        self.presence.setOffline(avatarId)
+
+        def avatarProfile(profile):
+            if not profile:
+                self.notify.warning('toonOffline: avatarProfile: Attempted to get name of an offline Toon and retrieved non-toon.')
                 return
 
-            name = fields['setName'][0]
-            friendsList = fields['setFriendsList'][0]
+            name = profile['setName'][0]
+            friendsList = profile['setFriendsList'][0]
             self.d_toonOffline(avatarId, friendsList, name)
-        
-        self.air.dbInterface.queryObject(
-            self.air.dbId,
-            avatarId,
-            avatarResponse
-        )
 
-    def d_toonOnline(self, avatarId, friendsList, name):
-        if not avatarId in self.toonsOnline:
-            self.toonsOnline.append(avatarId)
+        self.presence.getProfile(avatarId, avatarProfile)
 
-        for friendId in friendsList:
-            if friendId in self.toonsOnline:
-                self.sendUpdateToAvatarId(friendId, 'toonOnline', [avatarId, name])
+    def d_toonOnline(self, avatarId, friendsList, name):
+        self.sendUpdateToAvatarIds(self.presence.getOnlineAvatars(friendsList), 'toonOnline', [avatarId, name])
 
     def d_toonOffline(self, avatarId, friendsList, name):
-        if avatarId in self.toonsOnline:
-            self.toonsOnline.remove(avatarId)
-
-        for friendId in friendsList:
-            if friendId in self.toonsOnline:
-                self.sendUpdateToAvatarId(friendId, 'toonOffline', [avatarId, name])
+        self.sendUpdateToAvatarIds(self.presence.getOnlineAvatars(friendsList), 'toonOffline', [avatarId, name])
 
     def requestAvatarInfo(self, avId):
         sender = self.air.getAvatarIdFromSender()
 
-        def avatarResponse(dclass, fields):
-            if dclass != self.air.dclassesByName["DistributedPlayerToonUD"]:
-                self.notify.warning("requestAvatarInfo: avatarResponse: It's not a toon.")
+        def avatarProfile(profile):
+            if not profile:
+                self.notify.warning("requestAvatarInfo: avatarProfile: It's not a toon.")
                 return
 
-            name = fields['setName'][0]
-            dna = fields['setDNAStrand'][0]
-            maxHP = fields['setMaxHealth'][0]
-            hp = fields['setHealth'][0]
-            zoneId = fields['setLastHood'][0]
-            try:
-                shardId = fields['setDefaultShard'][0]
-            except:
-                shardId = 0
-            accessLevel = fields['setAccessLevel'][0]
-            isOnline = int(avId in self.toonsOnline)
+            name = profile['setName'][0]
+            dna = profile['setDNAStrand'][0]
+            maxHP = profile['setMaxHealth'][0]
+            hp = profile['setHealth'][0]
+            location = self.presence.getLocation(avId)
+            if location:
+                shardId, zoneId = location
+            else:
+                zoneId = profile['setLastHood'][0]
+                shardId = profile.get('setDefaultShard', (0,))[0]
+            accessLevel = profile['setAccessLevel'][0]
+            isOnline = int(location is not None)
 
             self.sendUpdateToAvatarId(sender, 'avatarInfo', [name, dna, maxHP, hp, zoneId, shardId, isOnline, accessLevel])
 
-        self.air.dbInterface.queryObject(
-            self.air.dbId,
-            avId,
-            avatarResponse
-        )
+        self.presence.getProfile(avId, avatarProfile)
 
     def askAvatarToBeFriends(self, avId):
         sender = self.air.getAvatarIdFromSender()
 
-        def avatarResponse(dclass, fields):
-            if dclass != self.air.dclassesByName["DistributedPlayerToonUD"]:
-                self.notify.warning("requestAvatarInfo: avatarResponse: It's not a toon.")
+        def avatarProfile(profile):
+            if not profile:
+                self.notify.warning("askAvatarToBeFriends: avatarProfile: It's not a toon.")
                 return
 
-            name = fields['setName'][0]
-            dna = fields['setDNAStrand'][0]
+            name = profile['setName'][0]
+            dna = profile['setDNAStrand'][0]
 
             self.sendUpdateToAvatarId(avId, 'friendRequest', [sender, name, dna])
 
-        self.air.dbInterface.queryObject(
-            self.air.dbId,
-            sender,
-            avatarResponse
-        )
+        self.presence.getProfile(sender, avatarProfile)
 
     def iRemovedFriend(self, friendId):
         sender = self.air.getAvatarIdFromSender()
@@ -232,6 +273,7 @@ class FriendsManagerUD(DistributedObjectGlobalUD):
             dg = dclass.aiFormatUpdate('setFriendsList', sender, sender, self.air.ourChannel, [newList])
             self.air.send(dg)
             self.air.dbInterface.updateObject(self.air.dbId, sender, dclass, {'setFriendsList': [newList]})
+            self.presence.updateProfile(sender, {'setFriendsList': [newList]})
 
         def removeeAvatarResponse(dclass, fields):
             if dclass != self.air.dclassesByName["DistributedPlayerToonUD"]:
@@ -243,6 +285,7 @@ class FriendsManagerUD(DistributedObjectGlobalUD):
             dg = dclass.aiFormatUpdate('setFriendsList', friendId, friendId, self.air.ourChannel, [newList])
             self.air.send(dg)
             self.air.dbInterface.updateObject(self.air.dbId, friendId, dclass, {'setFriendsList': [newList]})
+            self.presence.updateProfile(friendId, {'setFriendsList': [newList]})
 
         self.air.dbInterface.queryObject(
             self.air.dbId,
@@ -270,6 +313,7 @@ class FriendsManagerUD(DistributedObjectGlobalUD):
             dg = dclass.aiFormatUpdate('setFriendsList', sender, sender, self.air.ourChannel, [newList])
             self.air.send(dg)
             self.air.dbInterface.updateObject(self.air.dbId, sender, dclass, {'setFriendsList': [newList]})
+            self.presence.updateProfile(sender, {'setFriendsList': [newList]})
 
         def requesterAvatarResponse(dclass, fields):
             if dclass != self.air.dclassesByName["DistributedPlayerToonUD"]:
@@ -281,6 +325,7 @@ class FriendsManagerUD(DistributedObjectGlobalUD):
             dg = dclass.aiFormatUpdate('setFriendsList', avatarId, avatarId, self.air.ourChannel, [newList])
             self.air.send(dg)
             self.air.dbInterface.updateObject(self.air.dbId, avatarId, dclass, {'setFriendsList': [newList]})
+            self.presence.updateProfile(avatarId, {'setFriendsList': [newList]})
 
         self.air.dbInterface.queryObject(
             self.air.dbId,
@@ -316,17 +361,14 @@ class FriendsManagerUD(DistributedObjectGlobalUD):
 
     def myAvatarLocation(self, avatarId, shardId, zoneId):
         sender = self.air.getAvatarIdFromSender()
+        self.presence.setLocation(sender, shardId, zoneId)
 
-        def teleportingAvatarResponse(dclass, fields):
-            if dclass != self.air.dclassesByName['DistributedPlayerToonUD']:
+        def teleportingAvatarProfile(profile):
+            if not profile:
                 return
 
-            name = fields['setName'][0]
+            name = profile['setName'][0]
             self.sendUpdateToAvatarId(sender, 'teleportNotify', [name])
 
-        self.air.dbInterface.queryObject(
-            self.air.dbId,
-            avatarId,
-            teleportingAvatarResponse
-        )
+        self.presence.getProfile(avatarId, teleportingAvatarProfile)
         self.sendUpdateToAvatarId(avatarId, 'avatarLocation', [sender, shardId, zoneId])
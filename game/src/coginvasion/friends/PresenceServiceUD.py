@@ -0,0 +1,231 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file PresenceServiceUD.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+
+from collections import OrderedDict
+
+# The fields of a toon the friends manager hands out. Everything else is left in the db.
+ProfileFields = ('setName', 'setDNAStrand', 'setMaxHealth', 'setHealth', 'setLastHood',
+                 'setDefaultShard', 'setAccessLevel', 'setFriendsList')
+
+class AvatarProfileCacheUD:
+    """
+    Least recently used cache of the ProfileFields of toons, so that a whisper or an
+    avatar info request doesn't have to query the db each time.
+
+    The AI sends an avatarProfileChanged message when it changes one of these fields,
+    and the friends manager updates the friends lists itself, so cached profiles are
+    updated rather than thrown out. Toons that are asked for again while their query
+    is still out share the one query.
+    """
+
+    notify = directNotify.newCategory("AvatarProfileCacheUD")
+
+    def __init__(self, air):
+        self.air = air
+        self.maxSize = max(1, config.GetInt('friends-profile-cache-size', 5000))
+        # avId -> {fieldName: args}, least recently used first
+        self.profiles = OrderedDict()
+        # avId -> [callback], for the toons we are querying
+        self.pending = {}
+        # avId -> {fieldName: args}, changes that came in while the toon was being queried
+        self.pendingChanges = {}
+
+        self.numHits = 0
+        self.numMisses = 0
+
+    def getNumHits(self):
+        return self.numHits
+
+    def getNumMisses(self):
+        return self.numMisses
+
+    def getProfile(self, avId, callback):
+        """
+        Calls `callback` with the profile of `avId`, or None if it isn't a toon.
+        The profile is a dict of the ProfileFields to their args, like a db query.
+        """
+
+        profile = self.profiles.get(avId)
+        if profile is not None:
+            self.numHits += 1
+            # Move it to the back, it was just used.
+            del self.profiles[avId]
+            self.profiles[avId] = profile
+            callback(profile)
+            return
+
+        self.numMisses += 1
+        if avId in self.pending:
+            self.pending[avId].append(callback)
+            return
+
+        self.pending[avId] = [callback]
+        self.air.dbInterface.queryObject(
+            self.air.dbId,
+            avId,
+            lambda dclass, fields: self.__profileRetrieved(avId, dclass, fields)
+        )
+
+    def __profileRetrieved(self, avId, dclass, fields):
+        callbacks = self.pending.pop(avId, [])
+        changes = self.pendingChanges.pop(avId, {})
+
+        profile = None
+        if dclass == self.air.dclassesByName['DistributedPlayerToonUD']:
+            profile = {}
+            for fieldName in ProfileFields:
+                if fieldName in fields:
+                    profile[fieldName] = fields[fieldName]
+            # The db might not have these yet.
+            profile.update(changes)
+            self.__store(avId, profile)
+        else:
+            self.notify.warning("Queried the profile of {0}, which is not a toon.".format(avId))
+
+        for callback in callbacks:
+            callback(profile)
+
+    def __store(self, avId, profile):
+        if avId in self.profiles:
+            del self.profiles[avId]
+        self.profiles[avId] = profile
+        while len(self.profiles) > self.maxSize:
+            self.profiles.popitem(last = False)
+
+    def updateProfile(self, avId, changes):
+        """
+        Applies the field changes in `changes` ({fieldName: args}) to the profile of `avId`.
+        """
+
+        changes = dict((fieldName, tuple(args)) for fieldName, args in changes.items()
+                       if fieldName in ProfileFields)
+        if avId in self.pending:
+            self.pendingChanges.setdefault(avId, {}).update(changes)
+        profile = self.profiles.get(avId)
+        if profile is not None:
+            profile.update(changes)
+
+    def invalidate(self, avId):
+        self.profiles.pop(avId, None)
+
+    def cleanup(self):
+        self.profiles = None
+        self.pending = None
+        self.pendingChanges = None
+        self.air = None
+
+class PresenceServiceUD:
+    """
+    Knows which toons are online and where they are, and caches their profiles.
+
+    A toon's location starts out as its default shard and last hood, and follows the
+    AI's changes to them. It is made exact whenever the toon answers a teleport request.
+    """
+
+    notify = directNotify.newCategory("PresenceServiceUD")
+
+    def __init__(self, air):
+        self.air = air
+        # avId -> [shardId, zoneId] of the online toons
+        self.locations = {}
+        # avId -> login number, for the toons that came online and whose profile we're waiting on
+        self.loggingIn = {}
+        self.numLogins = 0
+        self.profileCache = AvatarProfileCacheUD(air)
+        self.air.netMessenger.accept('avatarProfileChanged', self, self.__handleProfileChanged)
+
+    def getProfile(self, avId, callback):
+        self.profileCache.getProfile(avId, callback)
+
+    def updateProfile(self, avId, changes):
+        self.profileCache.updateProfile(avId, changes)
+
+    def startLogin(self, avId):
+        """
+        Call when `avId` comes online, before going off to get its profile.
+        Returns the login number to hand to setOnline once the profile is in.
+        """
+
+        self.numLogins += 1
+        self.loggingIn[avId] = self.numLogins
+        return self.numLogins
+
+    def setOnline(self, avId, profile = None, login = None):
+        """
+        Puts `avId` online. Returns False and leaves it offline if it went offline
+        (or came online again) after the `login` from startLogin.
+        """
+
+        if login is not None:
+            if self.loggingIn.get(avId) != login:
+                return False
+            del self.loggingIn[avId]
+
+        location = [0, 0]
+        if profile:
+            location = [profile.get('setDefaultShard', (0,))[0], profile.get('setLastHood', (0,))[0]]
+        self.locations[avId] = location
+        return True
+
+    def setOffline(self, avId):
+        self.loggingIn.pop(avId, None)
+        self.locations.pop(avId, None)
+
+    def isOnline(self, avId):
+        return avId in self.locations
+
+    def getNumOnline(self):
+        return len(self.locations)
+
+    def getOnlineAvIds(self):
+        return self.locations.keys()
+
+    def getOnlineAvatars(self, avIds):
+        """
+        Returns the toons of `avIds` that are online.
+        """
+
+        return [avId for avId in avIds if avId in self.locations]
+
+    def setLocation(self, avId, shardId, zoneId):
+        location = self.locations.get(avId)
+        if location is not None:
+            location[0] = shardId
+            location[1] = zoneId
+
+    def getLocation(self, avId):
+        """
+        Returns the (shardId, zoneId) of an online toon, or None if it's offline.
+        """
+
+        location = self.locations.get(avId)
+        if location is None:
+            return None
+        return tuple(location)
+
+    def __handleProfileChanged(self, avId, changes):
+        self.profileCache.updateProfile(avId, changes)
+
+        location = self.locations.get(avId)
+        if location is not None:
+            if 'setDefaultShard' in changes:
+                location[0] = changes['setDefaultShard'][0]
+            if 'setLastHood' in changes:
+                location[1] = changes['setLastHood'][0]
+
+    def cleanup(self):
+        self.air.netMessenger.ignore('avatarProfileChanged', self)
+        self.profileCache.cleanup()
+        self.profileCache = None
+        self.locations = None
+        self.loggingIn = None
+        self.air = None
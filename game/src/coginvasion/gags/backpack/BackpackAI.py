@@ -13,20 +13,70 @@ Copyright (c) CIO Team. All rights reserved.
 from src.coginvasion.gags.backpack.BackpackBase import BackpackBase
 
 class BackpackAI(BackpackBase):
+    """
+    Supply changes are sent to the owner right away as deltas through `updateAttackAmmo`.
+    The full backpack blob (`setBackpackAmmo`, which is broadcast and written to the database)
+    is only sent `backpack-snapshot-interval` seconds after the first change, or when
+    `flushSnapshot()` is called at the end of a battle, and only if it actually changed.
+    """
+
+    def __init__(self, avatar):
+        BackpackBase.__init__(self, avatar)
+        self.snapshotInterval = config.GetFloat('backpack-snapshot-interval', 15.0)
+        self.snapshotTask = None
 
     # Sets the supply on each gag in this backpack to the default max.
     def refillSupply(self):
         for gagId in self.avatar.attacks.keys():
-            self.setSupply(gagId, self.getMaxSupply(gagId))
+            self.setSupply(gagId, self.getMaxSupply(gagId), updateEnabled=False)
+            self.avatar.attacks[gagId].d_updateAttackAmmo()
+        self.flushSnapshot()
     
     # Sets the supply of a gag in the backpack.
     # Returns true or false if the supply was set.
     def setSupply(self, gagId, supply, updateEnabled=True):
         updatedSupply = BackpackBase.setSupply(self, gagId, supply)
         if updatedSupply and updateEnabled:
-            self.updateNetAmmo()
+            self.sendSupplyDelta(gagId)
         return updatedSupply
+
+    # Sends the new supply of just this gag to the owner, the
+    # full backpack goes out with the next snapshot.
+    def sendSupplyDelta(self, gagId):
+        if isinstance(gagId, str):
+            gagId = self.avatar.getAttackMgr().getAttackIDByName(gagId)
+        self.avatar.attacks[gagId].d_updateAttackAmmo()
+        self.scheduleSnapshot()
+
+    def scheduleSnapshot(self):
+        if self.snapshotTask:
+            # One is already on the way, it'll pick this change up.
+            return
+        self.snapshotTask = taskMgr.doMethodLater(self.snapshotInterval, self.__snapshotTask,
+                                                  'backpackSnapshot-' + str(id(self)))
+
+    def __snapshotTask(self, task):
+        self.snapshotTask = None
+        self.flushSnapshot()
+        return task.done
+
+    # Sends the full backpack if it changed since the last snapshot.
+    def flushSnapshot(self):
+        if self.snapshotTask:
+            self.snapshotTask.remove()
+            self.snapshotTask = None
+
+        netString = self.toNetString()
+        if netString != self.netString:
+            self.netString = netString
+            self.avatar.d_setBackpackAmmo(netString)
     
     # Update the network ammo.
     def updateNetAmmo(self):
         self.avatar.b_setBackpackAmmo(self.toNetString())
+
+    def cleanup(self):
+        if self.snapshotTask:
+            self.snapshotTask.remove()
+            self.snapshotTask = None
+        BackpackBase.cleanup(self)
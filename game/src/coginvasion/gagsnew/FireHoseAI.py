@@ -70,15 +70,14 @@ class FireHoseAI(BaseHitscanAI, FireHoseShared):
             now = globalClock.getFrameTime()
             if now - self.lastSprayTraceTime >= self.SprayTraceIval:
                 #self.takeAmmo(-1)
-                hitNode = self.doTraceAndDamage()
-
-                if hitNode:
-                    if hitNode.hasPythonTag("projectile"):
-                        proj = hitNode.getPythonTag("projectile")
-
-                        # Fire hose can put out a flame from the Fired Cog attack.
-                        if isinstance(proj, FiredProjectileAI):
-                            proj.diffuseFlame()
+                self.doTraceAndDamage()
+
+                # Fire hose can put out a flame from the Fired Cog attack.
+                traceEnd = self.traceOrigin + (self.traceVector * self.AttackRange)
+                projMgr = self.avatar.getBattleZone().projectileMgr
+                for proj in projMgr.getProjectilesAlongLine(self.traceOrigin, traceEnd):
+                    if isinstance(proj, FiredProjectileAI):
+                        proj.diffuseFlame()
 
                 self.lastSprayTraceTime = now
 
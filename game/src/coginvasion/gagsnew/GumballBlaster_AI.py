@@ -131,9 +131,9 @@ class GumballBlaster_AI(BaseHitscanAI):
     def fireProjectile(self, endPos):
         proj = GumballProjectileAI(base.air)
         proj.setProjectile(2.5, self.fireOrigin, endPos, 1.07, globalClockDelta.getFrameNetworkTime())
-        proj.generateWithRequired(self.avatar.getBattleZone().zoneId)
         proj.addHitCallback(self.onProjectileHit)
         proj.addExclusion(self.avatar)
+        self.avatar.getBattleZone().projectileMgr.spawn(proj)
             
     def checkCapable(self, dot, squaredDistance):
         return 10*10 <= squaredDistance <= 30*30
@@ -0,0 +1,60 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file ChatFilter.py
+@author agent
+@date October 18, 2026
+
+"""
+
+import re
+import string
+import zlib
+
+# Everything that separates words. An apostrophe only counts as part of a word
+# when it's between two letters, like in "don't".
+WordChars = "[^\\s%s]" % re.escape(string.punctuation)
+WordPattern = re.compile("{0}+(?:'{0}+)*".format(WordChars))
+
+class ChatFilter:
+    """
+    Replaces every word of a chat message that isn't on the whitelist with garble.
+
+    The whitelist is compiled once into a frozenset of lowercase words, and a message
+    is gone through once: the compiled WordPattern picks out the words, everything
+    between them (spaces, punctuation, the * of a correction) is kept as it was,
+    and the message is put back together in one join.
+    """
+
+    def __init__(self, words):
+        self.whiteList = frozenset(word.lower() for word in words)
+
+    def isWordAllowed(self, word):
+        word = word.lower()
+        if word in self.whiteList:
+            return True
+        # Let "dont" on the whitelist allow "don't".
+        return "'" in word and word.replace("'", "") in self.whiteList
+
+    def filterChat(self, chat, garble):
+        """
+        Returns `chat` with each word that isn't allowed replaced by a word of `garble`.
+        The same word always gets the same garble, so the client can filter what
+        its toon says the same way the AI does.
+        """
+
+        pieces = []
+        last = 0
+        for match in WordPattern.finditer(chat):
+            if self.isWordAllowed(match.group()):
+                continue
+            pieces.append(chat[last:match.start()])
+            pieces.append(garble[(zlib.crc32(match.group().lower()) & 0xffffffff) % len(garble)])
+            last = match.end()
+
+        if not pieces:
+            return chat
+
+        pieces.append(chat[last:])
+        return ''.join(pieces)
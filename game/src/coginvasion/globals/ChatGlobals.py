@@ -10,6 +10,8 @@ Copyright (c) CIO Team. All rights reserved.
 
 from panda3d.core import VirtualFileSystem
 
+from ChatFilter import ChatFilter
+
 import random
 
 CFSpeech       = 1 << 0
@@ -80,9 +82,11 @@ WhisperColors = {
 }
 
 WhiteListData = None
+WhiteListFilter = None
 
 def loadWhiteListData():
     global WhiteListData
+    global WhiteListFilter
     if WhiteListData is None:
         vfs = VirtualFileSystem.getGlobalPtr()
         whitelistFile = vfs.readFile('phase_3/etc/ciwhitelist.dat', False)
@@ -90,9 +94,14 @@ def loadWhiteListData():
         for word in whitelistFile.split():
             WhiteListData.add(word)
         del whitelistFile
+        WhiteListFilter = ChatFilter(WhiteListData)
 
 def getWhiteListData():
     return WhiteListData
+
+def getWhiteListFilter():
+    loadWhiteListData()
+    return WhiteListFilter
     
 garbleData = None
 
@@ -117,28 +126,9 @@ def getGarble(animal):
     return ['blah']
 
 def filterChat(chat, animal):
-    if 0:
-        whiteList = getWhiteListData()
-        words = chat.split(' ')
-        if not len(words):
-            words = list(chat)
-        for word in words:
-            if len(word) == 0:
-                continue
-            checkWord = word
-            
-            # Let's handle end of the word punctuation.
-            if word and len(word) > 1 and word[len(word) - 1] in Punctuation:
-                checkWord = word.replace(word[len(word) - 1], '')
-            
-            # Let's handle thoughts and corrections.
-            if word and len(word) > 1 and word[0] in ['*', '.']:
-                checkWord = word.replace(word[0], '')    
-            
-            if not (checkWord.lower() in whiteList):
-                garble = getGarble(animal)
-                chat = chat.replace(checkWord, random.choice(garble))
-    return chat
+    if not config.GetBool('want-chat-filter', True):
+        return chat
+    return getWhiteListFilter().filterChat(chat, getGarble(animal))
 
 def mentionAvatar(context, avatarName):
     if avatarName[len(avatarName) - 1] in Punctuation:
@@ -17,6 +17,9 @@ from playground import DistributedBRPondAI
 class BRHoodAI(ToonHoodAI.ToonHoodAI):
 	notify = directNotify.newCategory("BRHoodAI")
 
+	DNAFiles = ['phase_8/dna/the_burrrgh_3100.pdna', 'phase_8/dna/the_burrrgh_3200.pdna',
+		'phase_8/dna/the_burrrgh_3300.pdna', 'phase_8/dna/the_burrrgh_sz.pdna']
+
 	def __init__(self, air):
 		ToonHoodAI.ToonHoodAI.__init__(self, air, ZoneUtil.TheBrrrghId,
 					ZoneUtil.TheBrrrgh)
@@ -25,8 +28,6 @@ class BRHoodAI(ToonHoodAI.ToonHoodAI):
 
 	def startup(self):
 		self.notify.info("Creating hood {0}...".format(ZoneUtil.TheBrrrgh))
-		self.dnaFiles = ['phase_8/dna/the_burrrgh_3100.pdna', 'phase_8/dna/the_burrrgh_3200.pdna',
-            'phase_8/dna/the_burrrgh_3300.pdna', 'phase_8/dna/the_burrrgh_sz.pdna']
 		ToonHoodAI.ToonHoodAI.startup(self)
 		# The pond is broken right now without having a proper collisions system. No thanks.
 		#self.pond = DistributedBRPondAI.DistributedBRPondAI(self.air)
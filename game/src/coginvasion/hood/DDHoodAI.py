@@ -17,14 +17,15 @@ import ZoneUtil
 class DDHoodAI(ToonHoodAI):
     notify = directNotify.newCategory('DDHoodAI')
 
+    DNAFiles = ['phase_6/dna/donalds_dock_1100.pdna', 'phase_6/dna/donalds_dock_1200.pdna',
+        'phase_6/dna/donalds_dock_1300.pdna', 'phase_6/dna/donalds_dock_sz.pdna']
+
     def __init__(self, air):
         ToonHoodAI.__init__(self, air, ZoneUtil.DonaldsDockId, ZoneUtil.DonaldsDock)
         self.boat = None
         self.startup()
 
     def startup(self):
-        self.dnaFiles = ['phase_6/dna/donalds_dock_1100.pdna', 'phase_6/dna/donalds_dock_1200.pdna',
-            'phase_6/dna/donalds_dock_1300.pdna', 'phase_6/dna/donalds_dock_sz.pdna']
         ToonHoodAI.startup(self)
         self.notify.info("Making Donald's Dock boat...")
         self.boat = DistributedBoatAI.DistributedBoatAI(self.air)
@@ -16,11 +16,12 @@ import ZoneUtil
 class DGHoodAI(ToonHoodAI):
     notify = directNotify.newCategory('DGHoodAI')
 
+    DNAFiles = ['phase_8/dna/daisys_garden_5100.pdna', 'phase_8/dna/daisys_garden_5200.pdna',
+        'phase_8/dna/daisys_garden_5300.pdna', 'phase_8/dna/daisys_garden_sz.pdna']
+
     def __init__(self, air):
         ToonHoodAI.__init__(self, air, ZoneUtil.DaisyGardensId, ZoneUtil.DaisyGardens)
         self.startup()
 
     def startup(self):
-        self.dnaFiles = ['phase_8/dna/daisys_garden_5100.pdna', 'phase_8/dna/daisys_garden_5200.pdna',
-            'phase_8/dna/daisys_garden_5300.pdna', 'phase_8/dna/daisys_garden_sz.pdna']
         ToonHoodAI.startup(self)
@@ -16,11 +16,12 @@ import ZoneUtil
 class DLHoodAI(ToonHoodAI):
     notify = directNotify.newCategory('DLHoodAI')
 
+    DNAFiles = ['phase_8/dna/donalds_dreamland_9100.pdna', 'phase_8/dna/donalds_dreamland_9200.pdna',
+        'phase_8/dna/donalds_dreamland_sz.pdna']
+
     def __init__(self, air):
         ToonHoodAI.__init__(self, air, ZoneUtil.DonaldsDreamlandId, ZoneUtil.DonaldsDreamland)
         self.startup()
 
     def startup(self):
-        self.dnaFiles = ['phase_8/dna/donalds_dreamland_9100.pdna', 'phase_8/dna/donalds_dreamland_9200.pdna',
-            'phase_8/dna/donalds_dreamland_sz.pdna']
         ToonHoodAI.startup(self)
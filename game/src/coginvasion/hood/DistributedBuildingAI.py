@@ -62,6 +62,10 @@ class DistributedBuildingAI(DistributedObjectAI):
         if hasattr(self, 'elevator'):
             self.elevator.requestDelete()
             del self.elevator
+        if hasattr(self, 'battle'):
+            if not self.battle.isDeleted():
+                self.battle.requestDelete()
+            del self.battle
         self.requestDelete()
 
     def delete(self):
@@ -101,8 +105,8 @@ class DistributedBuildingAI(DistributedObjectAI):
         return Task.done
 
     def getExteriorAndInteriorZoneId(self):
-        dnaStore = self.air.dnaStoreMap[self.canonicalZoneId]
-        zoneId = dnaStore.getZoneFromBlockNumber(self.block)
+        dnaData = self.air.dnaDataMap[self.canonicalZoneId]
+        zoneId = dnaData.getZoneFromBlockNumber(self.block)
         zoneId = ZoneUtil.getTrueZoneId(zoneId, self.zoneId)
         interiorZoneId = (zoneId - (zoneId % 100)) + 500 + self.block
         return (zoneId, interiorZoneId)
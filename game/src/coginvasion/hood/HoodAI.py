@@ -36,6 +36,9 @@ class HoodAI:
     notify = directNotify.newCategory("HoodAI")
     notify.setInfo(True)
 
+    # The street and playground DNA files of this hood.
+    DNAFiles = []
+
     def __init__(self, air, zoneId, hood):
         self.air = air
         self.zoneId = zoneId
@@ -48,17 +51,19 @@ class HoodAI:
         self.buildings = {}
         self.buildingPlanners = {}
         self.butterflies = []
+        # Playground or street zoneId -> its DNA file, None for a playground without any.
+        self.areaDNAFiles = {}
+        # Playground or street zoneId -> objects generated in it, for the active ones.
+        self.areaObjects = {}
 
     def startup(self):
-        self.createTreasurePlanner()
-
         self.notify.info("Creating objects in hood %s.." % self.hood)
-        interiorZoneAllocator = UniqueIdAllocator(self.zoneId + 400, self.zoneId + 999)
-        for dnaFile in self.dnaFiles:
+
+        # The playground is an area even if it has no DNA of its own, it has the treasures and butterflies.
+        self.areaDNAFiles[self.zoneId] = None
+        for dnaFile in self.DNAFiles:
             zoneId = 0
-            isSZ = False
             if 'sz' in dnaFile:
-                isSZ = True
                 zoneId = self.zoneId
             else:
                 for segment in dnaFile.split('_'):
@@ -67,17 +72,41 @@ class HoodAI:
                         if segment.isdigit():
                             zoneId = int(segment)
                             break
-            dnaStore = DNAStorage()
-            dnaData = loadDNAFileAI(dnaStore, dnaFile)
-            self.air.dnaStoreMap[zoneId] = dnaStore
-            self.air.dnaDataMap[zoneId] = dnaData
-            self.buildings[zoneId] = []
-            blockZoneByNumber = {}
-            for i in range(dnaStore.get_num_block_numbers()):
-                blockNumber = dnaStore.get_block_number_at(i)
-                blockZoneByNumber[blockNumber] = dnaStore.get_zone_from_block_number(blockNumber)
-            for block, exteriorZone in blockZoneByNumber.items():
-                buildingType = dnaStore.get_block_building_type(block)
+            self.air.dnaDataMap[zoneId] = self.air.dnaCache.getDNAData(dnaFile)
+            self.areaDNAFiles[zoneId] = dnaFile
+
+        zoneActivationMgr = self.air.zoneActivationMgr
+        for zoneId in self.areaDNAFiles.keys():
+            if zoneActivationMgr.isEnabled():
+                # Made when the first toon shows up there, see ZoneActivationManagerAI.
+                zoneActivationMgr.addArea(zoneId, self)
+            else:
+                self.activateArea(zoneId)
+
+    def isAreaActive(self, zoneId):
+        return zoneId in self.areaObjects
+
+    def activateArea(self, zoneId):
+        """
+        Generates the objects of the playground or street `zoneId`: its interiors, doors,
+        buildings and knock knock doors, and the treasures and butterflies of a playground.
+        """
+
+        if self.isAreaActive(zoneId):
+            return
+
+        isSZ = zoneId == self.zoneId
+        # Objects that are deleted when the area goes idle.
+        objects = []
+        self.areaObjects[zoneId] = objects
+        self.buildings[zoneId] = []
+
+        if isSZ:
+            self.createTreasurePlanner()
+
+        dnaData = self.air.dnaDataMap.get(zoneId)
+        if dnaData:
+            for block, exteriorZone, buildingType in dnaData.getBlocks():
                 interiorZone = (ZoneUtil.getBranchZone(zoneId) - (ZoneUtil.getBranchZone(zoneId) % 100)) + 500 + block
                 if isSZ or (not isSZ and buildingType in ['hq']):
                     if not buildingType:
@@ -87,6 +116,7 @@ class HoodAI:
                         door.generateWithRequired(exteriorZone)
                         self.exteriorDoors.append(door)
                         self.interiors.append(interior)
+                        objects += [interior, door]
                     elif buildingType == 'cinema':
                         cinemaIndex = CinemaGlobals.Zone2Block2CinemaIndex[zoneId][block]
                         interior = DistributedCinemaInteriorAI.DistributedCinemaInteriorAI(
@@ -96,6 +126,7 @@ class HoodAI:
                         door.generateWithRequired(exteriorZone)
                         self.exteriorDoors.append(door)
                         self.interiors.append(interior)
+                        objects += [interior, door]
                     elif buildingType == 'hq':
                         interior = DistributedToonHQInteriorAI.DistributedToonHQInteriorAI(
                             self.air, block, exteriorZone)
@@ -107,6 +138,7 @@ class HoodAI:
                         self.exteriorDoors.append(door0)
                         self.exteriorDoors.append(door1)
                         self.interiors.append(interior)
+                        objects += [interior, door0, door1]
                     elif buildingType == 'clotheshop':
                         interior = DistributedTailorInteriorAI.DistributedTailorInteriorAI(self.air, block, exteriorZone)
                         interior.generateWithRequired(interiorZone)
@@ -114,6 +146,7 @@ class HoodAI:
                         door.generateWithRequired(exteriorZone)
                         self.exteriorDoors.append(door)
                         self.interiors.append(interior)
+                        objects += [interior, door]
                     elif buildingType == 'gagshop':
                         interior = DistributedGagShopInteriorAI.DistributedGagShopInteriorAI(self.air, block, exteriorZone)
                         interior.generateWithRequired(interiorZone)
@@ -121,6 +154,7 @@ class HoodAI:
                         door.generateWithRequired(exteriorZone)
                         self.exteriorDoors.append(door)
                         self.interiors.append(interior)
+                        objects += [interior, door]
                 else:
                     if not buildingType in ["animbldg", "hq"]:
                         building = DistributedBuildingAI.DistributedBuildingAI(self.air, block, exteriorZone, zoneId, self.hood)
@@ -133,11 +167,12 @@ class HoodAI:
                             if block in blocks.keys():
                                 kkDoor = DistributedKnockKnockDoorAI.DistributedKnockKnockDoorAI(self.air, exteriorZone, block, zoneId)
                                 kkDoor.generateWithRequired(exteriorZone)
+                                objects.append(kkDoor)
             if not isSZ:
                 self.buildingPlanners[zoneId] = BuildingSuitPlannerAI(zoneId, ZoneUtil.BranchZone2StreetName[zoneId], self)
                 self.notify.info('Loading Street {0} which has DNA Zone ID: {1}'.format(ZoneUtil.BranchZone2StreetName[zoneId], zoneId))
 
-        butterflies = ButterflyGlobals.Spots.get(self.zoneId) is not None
+        butterflies = isSZ and ButterflyGlobals.Spots.get(self.zoneId) is not None
         if butterflies:
             numFlies = 5
             for i in xrange(numFlies):
@@ -146,7 +181,40 @@ class HoodAI:
                 bf.generateWithRequired(self.zoneId)
                 self.butterflies.append(bf)
 
-        del self.dnaFiles
+    def deactivateArea(self, zoneId):
+        """
+        Deletes everything activateArea() made in `zoneId`.
+        """
+
+        objects = self.areaObjects.pop(zoneId, None)
+        if objects is None:
+            return
+
+        self.notify.info("Deactivating idle area {0} of hood {1}".format(zoneId, self.hood))
+
+        planner = self.buildingPlanners.pop(zoneId, None)
+        if planner:
+            planner.cleanup()
+
+        for building in self.buildings.pop(zoneId, []):
+            building.cleanup()
+
+        for obj in objects:
+            if obj in self.interiors:
+                self.interiors.remove(obj)
+            if obj in self.exteriorDoors:
+                self.exteriorDoors.remove(obj)
+            if not obj.isDeleted():
+                obj.requestDelete()
+
+        if zoneId == self.zoneId:
+            if self.treasurePlanner:
+                self.treasurePlanner.stop()
+                self.treasurePlanner.deleteAllTreasuresNow()
+                self.treasurePlanner = None
+            for bf in self.butterflies:
+                bf.requestDelete()
+            self.butterflies = []
 
     def createTreasurePlanner(self):
         spawnInfo = TreasureGlobals.treasureSpawns.get(self.zoneId)
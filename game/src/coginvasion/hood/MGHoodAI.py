@@ -36,7 +36,6 @@ class MGHoodAI(HoodAI.HoodAI):
         self.startup()
 
     def startup(self):
-        self.dnaFiles = []
         HoodAI.HoodAI.startup(self)
         
         # Trolley index 1 indicates minigame area trolley
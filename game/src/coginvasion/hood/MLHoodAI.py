@@ -16,11 +16,12 @@ import ZoneUtil
 class MLHoodAI(ToonHoodAI):
     notify = directNotify.newCategory('MLHoodAI')
 
+    DNAFiles = ['phase_6/dna/minnies_melody_land_4100.pdna', 'phase_6/dna/minnies_melody_land_4200.pdna',
+        'phase_6/dna/minnies_melody_land_4300.pdna', 'phase_6/dna/minnies_melody_land_sz.pdna']
+
     def __init__(self, air):
         ToonHoodAI.__init__(self, air, ZoneUtil.MinniesMelodylandId, ZoneUtil.MinniesMelodyland)
         self.startup()
 
     def startup(self):
-        self.dnaFiles = ['phase_6/dna/minnies_melody_land_4100.pdna', 'phase_6/dna/minnies_melody_land_4200.pdna',
-            'phase_6/dna/minnies_melody_land_4300.pdna', 'phase_6/dna/minnies_melody_land_sz.pdna']
         ToonHoodAI.startup(self)
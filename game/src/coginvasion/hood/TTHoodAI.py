@@ -17,6 +17,9 @@ class TTHoodAI(ToonHoodAI.ToonHoodAI):
     notify = directNotify.newCategory("TTHoodAI")
     notify.setInfo(True)
 
+    DNAFiles = ['phase_5/dna/toontown_central_2100.pdna', 'phase_5/dna/toontown_central_2200.pdna',
+        'phase_5/dna/toontown_central_2300.pdna', 'phase_4/dna/new_ttc_sz.pdna']
+
     def __init__(self, air):
         ToonHoodAI.ToonHoodAI.__init__(self, air, ZoneUtil.ToontownCentralId,
                     ZoneUtil.ToontownCentral)
@@ -24,8 +27,6 @@ class TTHoodAI(ToonHoodAI.ToonHoodAI):
 
     def startup(self):
         self.notify.info("Creating hood %s" % ZoneUtil.ToontownCentral)
-        self.dnaFiles = ['phase_5/dna/toontown_central_2100.pdna', 'phase_5/dna/toontown_central_2200.pdna',
-            'phase_5/dna/toontown_central_2300.pdna', 'phase_4/dna/new_ttc_sz.pdna']
         ToonHoodAI.ToonHoodAI.startup(self)
         self.notify.info("Finished creating hood %s" % ZoneUtil.ToontownCentral)
 
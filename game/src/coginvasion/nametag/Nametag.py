@@ -52,12 +52,11 @@ class Nametag:
 
         # Add the tick task:
         self.tickTaskName = self.getUniqueName() + '-tick'
-        self.tickTask = taskMgr.add(self.tick, self.tickTaskName, sort=45)
+        self.tickTask = None
+        self.startTick()
 
     def destroy(self):
-        if self.tickTask is not None:
-            taskMgr.remove(self.tickTask)
-            self.tickTask = None
+        self.stopTick()
 
         self.chatTextNode = None
         self.textNode = None
@@ -96,6 +95,16 @@ class Nametag:
     def tick(self, task):
         return Task.done  # Inheritors should override this method.
 
+    def startTick(self):
+        if self.tickTask is None:
+            self.tickTask = taskMgr.add(self.tick, self.tickTaskName, sort=45)
+
+    def stopTick(self):
+        # Nametags in a NametagGroup are ticked by the NametagManager instead.
+        if self.tickTask is not None:
+            taskMgr.remove(self.tickTask)
+            self.tickTask = None
+
     def updateClickRegion(self):
         pass  # Inheritors should override this method.
 
@@ -5,6 +5,7 @@ from src.coginvasion.margins.MarginVisible import MarginVisible
 import NametagGlobals
 from Nametag2d import Nametag2d
 from Nametag3d import Nametag3d
+from NametagManager import getNametagManager
 
 
 class NametagGroup:
@@ -27,6 +28,9 @@ class NametagGroup:
 
         self.marginManager = None
         self.visible3d = True
+        # Result of the last frustum test, and where the avatar was for it.
+        self.inView = None
+        self.lastNetTransform = None
 
         self.chatType = NametagGlobals.CHAT
         self.chatBalloonType = NametagGlobals.CHAT_BALLOON
@@ -59,17 +63,14 @@ class NametagGroup:
         
         self.add(self.nametag3d)
 
-        # Add the tick task:
-        self.tickTaskName = self.getUniqueName() + '-tick'
-        self.tickTask = taskMgr.add(self.tick, self.tickTaskName, sort=45)
+        # We're updated along with every other group, see NametagManager.
+        getNametagManager().addGroup(self)
 
     def destroy(self):
         if self.marginManager is not None:
             self.unmanage(self.marginManager)
 
-        if self.tickTask is not None:
-            taskMgr.remove(self.tickTask)
-            self.tickTask = None
+        getNametagManager().removeGroup(self)
 
         self.clearChatText()
 
@@ -93,20 +94,37 @@ class NametagGroup:
     def getUniqueName(self):
         return 'NametagGroup-' + str(id(self))
 
-    def tick(self, task):
+    def isAvatarInView(self, camNode, camMoved):
+        """
+        Returns whether the avatar is in the camera's view, and whether the frustum test
+        had to be done again for it.
+        """
+
+        netTransform = self.avatar.getNetTransform()
+        if camMoved or self.inView is None or netTransform != self.lastNetTransform:
+            self.lastNetTransform = netTransform
+            self.inView = camNode.isInView(self.avatar.getPos(base.cam))
+            return self.inView, True
+        return self.inView, False
+
+    def updateVisibility(self, camNode, camMoved):
+        """
+        Decides whether we show the 3d or the 2d nametag.
+        Returns whether we did a frustum test, and whether we switched nametags.
+        """
+
         if (self.avatar is None) or (self.avatar.isEmpty()):
-            return Task.cont
+            return False, False
 
+        tested = False
         chatText = self.getChatText()
         if (NametagGlobals.forceOnscreenChat and
             chatText and
             self.chatBalloonType == NametagGlobals.CHAT_BALLOON):
             visible3d = False
         elif self.avatar == NametagGlobals.me:
-            if (chatText and
-                self.chatBalloonType == NametagGlobals.CHAT_BALLOON and
-                not base.cam.node().isInView(self.avatar.getPos(base.cam))):
-                visible3d = False
+            if chatText and self.chatBalloonType == NametagGlobals.CHAT_BALLOON:
+                visible3d, tested = self.isAvatarInView(camNode, camMoved)
             else:
                 visible3d = True
         elif NametagGlobals.force2dNametags:
@@ -117,17 +135,24 @@ class NametagGroup:
         elif self.avatar.isHidden():
             visible3d = False
         else:
-            visible3d = base.cam.node().isInView(self.avatar.getPos(base.cam))
+            visible3d, tested = self.isAvatarInView(camNode, camMoved)
 
         if visible3d != self.visible3d:
             self.visible3d = visible3d
             if self.nametag2d is not None:
                 self.nametag2d.setVisible(not visible3d)
+            return tested, True
+
+        return tested, False
 
-        return Task.cont
+    def tickNametags(self):
+        for nametag in self.nametags:
+            nametag.tick(None)
 
     def setAvatar(self, avatar):
         self.avatar = avatar
+        self.inView = None
+        self.lastNetTransform = None
         for nametag in self.nametags:
             nametag.setAvatar(self.avatar)
 
@@ -389,6 +414,7 @@ class NametagGroup:
         nametag.setChatText(self.getChatText())
         nametag.setIcon(self.icon)
         nametag.update()
+        nametag.stopTick()
         # Add this nametag to the global nametag pool.
         NametagGlobals.appendNametag(nametag)
 
@@ -0,0 +1,95 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file NametagManager.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+from direct.task.Task import Task
+
+class NametagManager:
+    """
+    Updates every NametagGroup from one task, instead of one task per group and nametag.
+
+    Each update decides whether the groups show their 3d or 2d nametag. The frustum test
+    of a group is only redone when the camera or its avatar moved since the last one.
+    With nametag-update-interval above 1, the visibility update only runs every that many
+    frames. The nametags themselves are still ticked every frame.
+    """
+
+    notify = directNotify.newCategory("NametagManager")
+
+    TaskName = 'NametagManager-update'
+    TaskSort = 45
+
+    def __init__(self):
+        self.interval = max(1, config.GetInt('nametag-update-interval', 1))
+        self.groups = []
+        self.frame = 0
+        self.lastCamTransform = None
+        self.task = None
+
+        # How many groups had to redo their frustum test, and how many switched between
+        # their 3d and 2d nametag, in the last update.
+        self.numTested = 0
+        self.numChanged = 0
+
+    def addGroup(self, group):
+        self.groups.append(group)
+        if self.task is None:
+            self.task = taskMgr.add(self.update, self.TaskName, sort = self.TaskSort)
+
+    def removeGroup(self, group):
+        if group in self.groups:
+            self.groups.remove(group)
+        if not self.groups and self.task is not None:
+            taskMgr.remove(self.task)
+            self.task = None
+            self.lastCamTransform = None
+
+    def getNumGroups(self):
+        return len(self.groups)
+
+    def getNumTested(self):
+        return self.numTested
+
+    def getNumChanged(self):
+        return self.numChanged
+
+    def update(self, task):
+        self.frame += 1
+        if self.frame % self.interval == 0:
+            self.updateVisibility()
+
+        for group in list(self.groups):
+            group.tickNametags()
+
+        return Task.cont
+
+    def updateVisibility(self):
+        camNode = base.cam.node()
+        camTransform = base.cam.getNetTransform()
+        camMoved = camTransform != self.lastCamTransform
+        self.lastCamTransform = camTransform
+
+        self.numTested = 0
+        self.numChanged = 0
+        for group in list(self.groups):
+            tested, changed = group.updateVisibility(camNode, camMoved)
+            self.numTested += tested
+            self.numChanged += changed
+
+        if self.numChanged:
+            self.notify.debug("{0} of {1} nametag groups changed".format(self.numChanged, len(self.groups)))
+
+_manager = None
+
+def getNametagManager():
+    global _manager
+    if not _manager:
+        _manager = NametagManager()
+    return _manager
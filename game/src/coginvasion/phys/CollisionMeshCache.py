@@ -0,0 +1,251 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file CollisionMeshCache.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from panda3d.core import Datagram, DatagramIterator, Filename, VirtualFileSystem, GeomNode
+from panda3d.core import TypedWritableReferenceCount
+from panda3d.bullet import BulletTriangleMesh, BulletTriangleMeshShape
+from libpandabsp import BSPFaceAttrib, BSPMaterialAttrib
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+
+from array import array
+import hashlib
+import os
+
+class SurfaceTable:
+    """
+    The surfaceprop of each triangle of a collision mesh, as one surface id per triangle.
+    Looks up like the triangle index -> surfaceprop dicts it replaces.
+    """
+
+    def __init__(self, names, ids):
+        self.names = names
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, idx):
+        return 0 <= idx < len(self.ids)
+
+    def __getitem__(self, idx):
+        return self.names[self.ids[idx]]
+
+    def get(self, idx, default = None):
+        if idx in self:
+            return self[idx]
+        return default
+
+class CollisionMesh:
+    """
+    The Bullet triangle mesh of one face type of one GeomNode. Read-only once built,
+    the shape is shared by every body made from it.
+    """
+
+    def __init__(self, geomNodeIndex, faceType, shape, surfaces):
+        # Index of the GeomNode in findGeomNodes() of the root.
+        self.geomNodeIndex = geomNodeIndex
+        self.faceType = faceType
+        self.shape = shape
+        self.surfaces = surfaces
+
+def findGeomNodes(rootNode, exclusions = []):
+    return [np for np in rootNode.findAllMatches("**")
+            if np.getName() not in exclusions and np.node().getType() == GeomNode.getClassType()]
+
+def buildCollisionMeshes(rootNode, exclusions = []):
+    """
+    Builds the CollisionMeshes of every GeomNode underneath `rootNode`.
+    """
+
+    meshes = []
+    geomNodes = findGeomNodes(rootNode, exclusions)
+    for i in xrange(len(geomNodes)):
+        node = geomNodes[i].node()
+
+        # Create a separate list of geoms for each possible face type
+        # ( a wall or floor )
+        type2geoms = {}
+        for j in xrange(node.getNumGeoms()):
+            geom = node.getGeom(j)
+            state = node.getGeomState(j)
+            if not geom.getPrimitive(0).isIndexed():
+                continue
+            if state.hasAttrib(BSPFaceAttrib.getClassSlot()):
+                facetype = state.getAttrib(BSPFaceAttrib.getClassSlot()).getFaceType()
+            else:
+                facetype = BSPFaceAttrib.FACETYPE_WALL
+            type2geoms.setdefault(facetype, []).append((geom, state))
+
+        for facetype, geoms in type2geoms.items():
+            mesh = BulletTriangleMesh()
+            names = []
+            ids = array('B')
+            for geom, state in geoms:
+                surfaceprop = "default"
+                if state.hasAttrib(BSPMaterialAttrib.getClassSlot()):
+                    mat = state.getAttrib(BSPMaterialAttrib.getClassSlot()).getMaterial()
+                    if mat:
+                        surfaceprop = mat.getSurfaceProp()
+                if not surfaceprop in names:
+                    names.append(surfaceprop)
+
+                # The mesh tells us how many triangles the geom had, no need to decompose it ourselves.
+                numTris = mesh.getNumTriangles()
+                mesh.addGeom(geom, True)
+                ids.extend([names.index(surfaceprop)] * (mesh.getNumTriangles() - numTris))
+
+            shape = BulletTriangleMeshShape(mesh, False)
+            meshes.append(CollisionMesh(i, facetype, shape, SurfaceTable(tuple(names), ids)))
+
+    return meshes
+
+class CollisionMeshCache:
+    """
+    Keeps the collision meshes of level geometry, so that they are only built once.
+
+    Meshes are shared by everything in the process that loads the same geometry, and
+    are written to the bullet-coll-cache-dir, keyed by the level file and the brush model
+    of the level they were built from, and checked against the hash of the level file.
+    A level that hasn't changed since the cache was written is loaded without touching
+    its geoms.
+    """
+
+    notify = directNotify.newCategory("CollisionMeshCache")
+
+    Magic = 'CICOL'
+    Version = 1
+    Extension = ".bcoll"
+
+    def __init__(self):
+        self.enabled = config.GetBool('bullet-coll-cache', True)
+        self.cacheDir = config.GetString('bullet-coll-cache-dir', 'cache/coll')
+        # (levelFile, modelNum) -> [CollisionMesh]
+        self.meshes = {}
+        # levelFile -> hash
+        self.levelHashes = {}
+
+    def getCacheFilename(self, levelFile, modelNum):
+        # Levels are read out of the read-only phase multifiles, so the meshes
+        # go in a directory of their own, named after the level's path.
+        name = Filename(levelFile).getFullpath().strip('/').replace('/', '_')
+        if modelNum is None:
+            name += ".level"
+        else:
+            name += ".model{0}".format(modelNum)
+        return os.path.join(self.cacheDir, name + self.Extension)
+
+    def getLevelHash(self, levelFile):
+        if not levelFile in self.levelHashes:
+            data = VirtualFileSystem.getGlobalPtr().readFile(Filename(levelFile), True)
+            self.levelHashes[levelFile] = hashlib.md5(data).hexdigest() if data else None
+        return self.levelHashes[levelFile]
+
+    def getMeshes(self, levelFile, rootNode, exclusions = [], modelNum = None):
+        """
+        Returns the CollisionMeshes of `rootNode`, which is brush model `modelNum` of the
+        level `levelFile`, or the whole level if `modelNum` is None.
+        """
+
+        key = (levelFile, modelNum)
+        meshes = self.meshes.get(key)
+        if meshes is not None:
+            return meshes
+
+        levelHash = None
+        cacheFile = self.getCacheFilename(levelFile, modelNum)
+        if self.enabled:
+            levelHash = self.getLevelHash(levelFile)
+            if levelHash:
+                meshes = self.read(cacheFile, levelHash)
+
+        if meshes is None:
+            meshes = buildCollisionMeshes(rootNode, exclusions)
+            if levelHash:
+                self.write(cacheFile, levelHash, meshes)
+
+        self.meshes[key] = meshes
+        return meshes
+
+    def read(self, cacheFile, levelHash):
+        vfs = VirtualFileSystem.getGlobalPtr()
+        filename = Filename.fromOsSpecific(cacheFile)
+        if not vfs.exists(filename):
+            return None
+
+        data = vfs.readFile(filename, True)
+        try:
+            dgi = DatagramIterator(Datagram(data))
+            if (dgi.getString() != self.Magic or dgi.getUint16() != self.Version or
+                dgi.getString() != levelHash):
+                # Stale, the level or the cache format changed.
+                return None
+
+            meshes = []
+            for i in xrange(dgi.getUint16()):
+                geomNodeIndex = dgi.getUint16()
+                faceType = dgi.getUint8()
+                names = tuple([dgi.getString() for j in xrange(dgi.getUint8())])
+                ids = array('B')
+                ids.fromstring(dgi.getBlob32())
+                shape = TypedWritableReferenceCount.decodeFromBamStream(dgi.getBlob32())
+                if not shape:
+                    return None
+                meshes.append(CollisionMesh(geomNodeIndex, faceType, shape, SurfaceTable(names, ids)))
+        except AssertionError:
+            # Ran off the end of the datagram.
+            self.notify.warning("{0} is corrupt, rebuilding.".format(cacheFile))
+            return None
+
+        self.notify.debug("Loaded {0} collision meshes from {1}".format(len(meshes), cacheFile))
+        return meshes
+
+    def write(self, cacheFile, levelHash, meshes):
+        dg = Datagram()
+        dg.addString(self.Magic)
+        dg.addUint16(self.Version)
+        dg.addString(levelHash)
+        dg.addUint16(len(meshes))
+        for mesh in meshes:
+            dg.addUint16(mesh.geomNodeIndex)
+            dg.addUint8(mesh.faceType)
+            dg.addUint8(len(mesh.surfaces.names))
+            for name in mesh.surfaces.names:
+                dg.addString(name)
+            dg.addBlob32(mesh.surfaces.ids.tostring())
+            dg.addBlob32(mesh.shape.encodeToBamStream())
+
+        try:
+            cacheDir = os.path.dirname(cacheFile)
+            if cacheDir and not os.path.isdir(cacheDir):
+                os.makedirs(cacheDir)
+            # Write it out whole before it replaces the old one, another process
+            # could be reading it.
+            tempFile = cacheFile + '.tmp'
+            with open(tempFile, 'wb') as f:
+                f.write(dg.getMessage())
+            if os.path.isfile(cacheFile):
+                os.remove(cacheFile)
+            os.rename(tempFile, cacheFile)
+        except (IOError, OSError):
+            # Not being able to cache the meshes just means we build them again next time.
+            self.notify.warning("Couldn't write collision meshes {0}".format(cacheFile))
+
+    def clear(self):
+        self.meshes = {}
+        self.levelHashes = {}
+
+_cache = None
+
+def getCollisionMeshCache():
+    global _cache
+    if not _cache:
+        _cache = CollisionMeshCache()
+    return _cache
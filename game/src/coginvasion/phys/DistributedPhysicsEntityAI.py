@@ -10,8 +10,9 @@ Copyright (c) CIO Team. All rights reserved.
 
 from direct.distributed.DistributedSmoothNodeAI import DistributedSmoothNodeAI
 from PhysicsNodePathAI import PhysicsNodePathAI
+from src.coginvasion.battle.SnapshotBroadcasterAI import SnapshotNodeAI
 
-class DistributedPhysicsEntityAI(DistributedSmoothNodeAI, PhysicsNodePathAI):
+class DistributedPhysicsEntityAI(SnapshotNodeAI, DistributedSmoothNodeAI, PhysicsNodePathAI):
     
     def __init__(self, air):
         DistributedSmoothNodeAI.__init__(self, air)
@@ -1,8 +1,9 @@
 from panda3d.core import Vec3, Point3, TransformState, GeomNode, CollisionNode, NodePath, BitMask32, NodePathCollection
 from panda3d.bullet import BulletBoxShape, BulletRigidBodyNode, BulletTriangleMesh, BulletTriangleMeshShape, BulletGhostNode
-from libpandabsp import BSPFaceAttrib, BSPMaterialAttrib
+from libpandabsp import BSPFaceAttrib
 
 from src.coginvasion.globals import CIGlobals
+from src.coginvasion.phys.CollisionMeshCache import getCollisionMeshCache, buildCollisionMeshes, findGeomNodes
 
 def isLocalAvatar(collider):
     return collider.hasPythonTag("localAvatar")
@@ -58,79 +59,50 @@ def makeBulletBoxColl(node, extents):
     rbnodeNp.setCollideMask(WallGroup)
     base.physicsWorld.attachRigidBody(rbnode)
 
-def makeBulletCollFromGeoms(rootNode, exclusions = [], enableNow = True, world = None):
+def makeBulletCollFromGeoms(rootNode, exclusions = [], enableNow = True, world = None, levelFile = None, modelNum = None):
     """
     Creates and attaches bullet triangle mesh nodes underneath each GeomNode
     of `rootNode`, which contains the same mesh as the Geoms.
     This can be expensive if the geometry contains lots of triangles or GeomNodes.
+
+    If `rootNode` is brush model `modelNum` of the level `levelFile` (or the whole
+    level when `modelNum` is None), the meshes come from the CollisionMeshCache:
+    they're only built the first time the level is loaded, and are shared by
+    everything in this process that loads the same level.
     """
 
     if not world:
         world = base.physicsWorld
 
+    if levelFile:
+        meshes = getCollisionMeshCache().getMeshes(levelFile, rootNode, exclusions, modelNum)
+    else:
+        meshes = buildCollisionMeshes(rootNode, exclusions)
+
     # BulletRigidBodyNode -> triangle index -> surfaceprop
     # (it's so we know which surface we are walking on)
     result = {}
 
-    for faceNp in rootNode.findAllMatches("**"):
-        if faceNp.getName() in exclusions:
-            continue
-        if faceNp.node().getType() != GeomNode.getClassType():
-            continue
+    geomNodes = findGeomNodes(rootNode, exclusions)
 
-        # Create a separate list of geoms for each possible face type
-        # ( a wall or floor )
-        type2geoms = {}
-        for i in xrange(faceNp.node().getNumGeoms()):
-            geom = faceNp.node().getGeom(i)
-            state = faceNp.node().getGeomState(i)
-            if not geom.getPrimitive(0).isIndexed():
-                continue
-            if state.hasAttrib(BSPFaceAttrib.getClassSlot()):
-                bca = state.getAttrib(BSPFaceAttrib.getClassSlot())
-                facetype = bca.getFaceType()
-            else:
-                facetype = BSPFaceAttrib.FACETYPE_WALL
-                
-            if not type2geoms.has_key(facetype):
-                type2geoms[facetype] = [(geom, state)]
-            else:
-                type2geoms[facetype].append((geom, state))
-
-        # Now create a separate body node to group each face type,
-        # and assign the correct bit
-        for facetype, geoms in type2geoms.items():
-            data = {}
-            numGeoms = 0
-            mesh = BulletTriangleMesh()
-            for i in xrange(len(geoms)):
-                geom, state = geoms[i]
-                mesh.addGeom(geom, True)
-                surfaceprop = "default"
-                if state.hasAttrib(BSPMaterialAttrib.getClassSlot()):
-					mat = state.getAttrib(BSPMaterialAttrib.getClassSlot()).getMaterial()
-					if mat:
-						surfaceprop = mat.getSurfaceProp()
-                for j in xrange(geom.getNumPrimitives()):
-                    prim = geom.getPrimitive(j)
-                    prim = prim.decompose()
-                    tris = prim.getNumVertices() / 3
-                    for tidx in xrange(tris):
-                        data[numGeoms] = surfaceprop
-                        numGeoms += 1
-            shape = BulletTriangleMeshShape(mesh, False)
-            rbnode = BulletRigidBodyNode(faceNp.getName() + "_bullet_type" + str(facetype))
-            rbnode.setKinematic(True)
-            rbnode.addShape(shape)
-            rbnodeNp = NodePath(rbnode)
-            rbnodeNp.reparentTo(faceNp)
-            if facetype == BSPFaceAttrib.FACETYPE_WALL:
-                rbnodeNp.setCollideMask(CIGlobals.WallGroup)
-            elif facetype == BSPFaceAttrib.FACETYPE_FLOOR:
-                rbnodeNp.setCollideMask(CIGlobals.FloorGroup)
-            if enableNow:
-                world.attachRigidBody(rbnode)
-            result[rbnode] = data
+    # Now create a separate body node to group each face type,
+    # and assign the correct bit
+    for mesh in meshes:
+        if mesh.geomNodeIndex >= len(geomNodes):
+            continue
+        faceNp = geomNodes[mesh.geomNodeIndex]
+        rbnode = BulletRigidBodyNode(faceNp.getName() + "_bullet_type" + str(mesh.faceType))
+        rbnode.setKinematic(True)
+        rbnode.addShape(mesh.shape)
+        rbnodeNp = NodePath(rbnode)
+        rbnodeNp.reparentTo(faceNp)
+        if mesh.faceType == BSPFaceAttrib.FACETYPE_WALL:
+            rbnodeNp.setCollideMask(CIGlobals.WallGroup)
+        elif mesh.faceType == BSPFaceAttrib.FACETYPE_FLOOR:
+            rbnodeNp.setCollideMask(CIGlobals.FloorGroup)
+        if enableNow:
+            world.attachRigidBody(rbnode)
+        result[rbnode] = mesh.surfaces
 
     return result
     
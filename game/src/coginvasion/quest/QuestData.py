@@ -6,9 +6,25 @@ Copyright (c) Cog Invasion Online. All rights reserved.
 @authors Maverick Liberty
 @date November 14, 2017
 
-@desc Parses and generates quest data strings used to store and load quest data.
+@desc Encodes and decodes the quest data strings used to store and load quest data.
 
-String format:
+Binary format (what we write):
+
+HEADER_MAGIC, FORMAT_VERSION                    (1 byte each)
+Tracking Quest ID                               (signed varint)
+Number of quests                                (varint)
+For each quest:
+    Quest ID                                    (varint)
+    Current Objective Index                     (signed varint)
+    Tracking Objective Index                    (signed varint, -1 if n/a)
+    Number of accessible objectives             (varint)
+    Progress of each accessible objective       (signed varint each)
+
+Varints are 7 bits per byte, least significant group first, with the high bit set
+on every byte but the last. Signed varints are zigzag encoded first so that -1 is one byte.
+The data isn't text, so setQuests is a blob field.
+
+Legacy string format (still read, so old database rows keep working):
 
 ACTIVE_QUEST_ID (-1 or value >= 0)
 <Quest ID,
@@ -21,98 +37,243 @@ Example: 0 <0,0,1,[30,50,0]>
 
 """
 
+HEADER_MAGIC = '\xc1'
+FORMAT_VERSION = 1
+
 BLOCK_OPENING_CHAR = '<'
 BLOCK_CLOSING_CHAR = '>'
 OBJECTIVE_BLOCK_OPENING_CHAR = '['
 OBJECTIVE_BLOCK_CLOSING_CHAR = ']'
 
-def getDataBlock(stump):
+class QuestDataError(Exception):
+    pass
+
+######################################################################
+# Varints
+
+def encodeVarint(value, out):
+    # Appends the bytes of an unsigned varint to the `out` list.
+    while value > 0x7F:
+        out.append(chr((value & 0x7F) | 0x80))
+        value >>= 7
+    out.append(chr(value))
+
+def encodeSignedVarint(value, out):
+    encodeVarint((value << 1) ^ (value >> 63), out)
+
+def decodeVarint(data, offset):
+    # Reads an unsigned varint from `data` starting at `offset`, without copying.
+    # Returns the value followed by the offset just past it.
+    value = 0
+    shift = 0
+    try:
+        while True:
+            byte = ord(data[offset])
+            offset += 1
+            value |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return value, offset
+            shift += 7
+    except IndexError:
+        raise QuestDataError('Quest data ended in the middle of a value.')
+
+def decodeSignedVarint(data, offset):
+    value, offset = decodeVarint(data, offset)
+    return (value >> 1) ^ -(value & 1), offset
+
+######################################################################
+# Binary format
+
+def isBinaryData(dataStr):
+    return len(dataStr) >= 2 and dataStr[0] == HEADER_MAGIC
+
+def encodeQuestData(trackingId, questsData):
+    # Encodes the tracking quest id and a list of [questId, curObjIndex, trackObjIndex, [progress, ...]]
+    # into the binary format.
+    out = [HEADER_MAGIC, chr(FORMAT_VERSION)]
+    encodeSignedVarint(trackingId, out)
+    encodeVarint(len(questsData), out)
+
+    for questId, curObjIndex, trackObjIndex, objProgress in questsData:
+        encodeVarint(questId, out)
+        encodeSignedVarint(curObjIndex, out)
+        encodeSignedVarint(trackObjIndex, out)
+        encodeVarint(len(objProgress), out)
+        for progress in objProgress:
+            encodeSignedVarint(progress, out)
+
+    return ''.join(out)
+
+def iterQuestData(dataStr, progressOffsets = None):
+    # Walks binary quest data, yielding the tracking quest id first and then
+    # [questId, curObjIndex, trackObjIndex, [progress, ...]] for each quest.
+    # If `progressOffsets` is a list, the (start, end) offsets of every progress value
+    # are appended to it as lists, one per quest.
+    if not isBinaryData(dataStr):
+        raise QuestDataError('Not binary quest data.')
+
+    version = ord(dataStr[1])
+    if version != FORMAT_VERSION:
+        raise QuestDataError('Unsupported quest data version %d.' % version)
+
+    offset = 2
+    trackingId, offset = decodeSignedVarint(dataStr, offset)
+    yield trackingId
+
+    numQuests, offset = decodeVarint(dataStr, offset)
+    for _ in xrange(numQuests):
+        questId, offset = decodeVarint(dataStr, offset)
+        curObjIndex, offset = decodeSignedVarint(dataStr, offset)
+        trackObjIndex, offset = decodeSignedVarint(dataStr, offset)
+        numProgress, offset = decodeVarint(dataStr, offset)
+
+        objProgress = []
+        questOffsets = []
+        for _ in xrange(numProgress):
+            start = offset
+            progress, offset = decodeSignedVarint(dataStr, offset)
+            objProgress.append(progress)
+            questOffsets.append((start, offset))
+
+        if progressOffsets is not None:
+            progressOffsets.append(questOffsets)
+
+        yield [questId, curObjIndex, trackObjIndex, objProgress]
+
+def patchObjectiveProgress(dataStr, progressByQuest):
+    # Returns the binary quest data with the objective progress of the quests in
+    # `progressByQuest` (questId -> [progress, ...]) replaced. Only the values that
+    # changed are re-encoded, everything else is copied over as is.
+    # Returns None if the data can't be patched (it's legacy data, or a quest's
+    # number of objectives changed), in which case the data has to be re-encoded.
+    if not isBinaryData(dataStr):
+        return None
+
+    progressOffsets = []
+    try:
+        questsData = list(iterQuestData(dataStr, progressOffsets))[1:]
+    except QuestDataError:
+        return None
+
+    out = []
+    copiedTo = 0
+    for questData, questOffsets in zip(questsData, progressOffsets):
+        newProgress = progressByQuest.get(questData[0], None)
+        if newProgress is None:
+            continue
+        oldProgress = questData[3]
+        if len(newProgress) != len(oldProgress):
+            return None
+
+        for i in xrange(len(oldProgress)):
+            if newProgress[i] == oldProgress[i]:
+                continue
+            start, end = questOffsets[i]
+            out.append(dataStr[copiedTo:start])
+            encodeSignedVarint(newProgress[i], out)
+            copiedTo = end
+
+    if copiedTo == 0:
+        # Nothing changed.
+        return dataStr
+
+    out.append(dataStr[copiedTo:])
+    return ''.join(out)
+
+######################################################################
+# Legacy string format
+
+def getDataBlock(stump, start = 0):
     # Retrieves data enclosed in a < > block and returns it in a list as integers followed
     # by the index of the ending of the block.
-    blockOpeningIndex = stump.index(BLOCK_OPENING_CHAR)
-    blockClosingIndex = stump.index(BLOCK_CLOSING_CHAR)
-    
+    blockOpeningIndex = stump.index(BLOCK_OPENING_CHAR, start)
+    blockClosingIndex = stump.index(BLOCK_CLOSING_CHAR, blockOpeningIndex)
+
     subStr = stump[blockOpeningIndex+1:blockClosingIndex]
     objBlockOpeningIndex = subStr.index(',' + OBJECTIVE_BLOCK_OPENING_CHAR)
-    
+
     # Generates a list of all the data enclosed within the block separated by a comma,
     # all the way up to the beginning of the list of accessible objectives.
     data = [int(element) for element in subStr[:objBlockOpeningIndex].split(',')]
     data.append(subStr[objBlockOpeningIndex+2:len(subStr)-1])
     return data, blockClosingIndex
 
+def extractLegacyData(dataStr):
+    # Reads a quest data string in the legacy format. Returns the active quest id
+    # followed by a list of quest data with integers.
+    questsData = []
+    activeQuestId = -1
+
+    if len(dataStr) == 0:
+        return activeQuestId, questsData
+
+    activeQuestId = int(dataStr[:dataStr.index(' ')])
+
+    # Walk the blocks by index rather than cutting the string down after each one.
+    start = 0
+    while dataStr.find(BLOCK_CLOSING_CHAR, start) != -1:
+        questData, start = getDataBlock(dataStr, start)
+
+        # Creates an integer list of the progress of the accessible objectives.
+        questData[3] = [int(element) for element in questData[3].split(',') if element]
+        questsData.append(questData)
+        start += 1
+
+    return activeQuestId, questsData
+
+def convertLegacyData(dataStr):
+    # Converts quest data in the legacy string format to the binary format.
+    if isBinaryData(dataStr):
+        return dataStr
+    return encodeQuestData(*extractLegacyData(dataStr))
+
+######################################################################
+
 def toDataStump(quests, trackingId = -1, currentObjectives = [], objectiveProgresses = []):
     # Generates a quest data stump for the quest data and returns it.
     # You can specify what the indexes of the current objectives with 'currentObjectives'; and
     # You can specify the progresses of each accessible objective in a list inside of 'objectiveProgresses'.
-    dataString = '%d ' % (trackingId)
-    
+    questsData = []
+
     for index, quest in enumerate(quests):
-        sectionString = '<%d,%d,%d,%s>'
-        objProgressStr = '['
-        
-        # This builds the string with the progress of each objective. Ex: [80,5,20]
-        if len(objectiveProgresses) == 0 or len(objectiveProgresses) > 0 and len(objectiveProgresses[index]) == 0:
+        if len(objectiveProgresses) == 0 or len(objectiveProgresses[index]) == 0:
             # Let's use the objective progress inside of the quest.
-            for i, objective in enumerate(quest.accessibleObjectives):
-                progress = objective.progress
-                
-                objProgressStr += str(progress)
-                if i < len(quest.accessibleObjectives) - 1:
-                    objProgressStr += ','
-
-            objProgressStr += ']'
+            objProgress = [objective.progress for objective in quest.accessibleObjectives]
         else:
             # Let's use the values given to us to use instead.
-            for i, progress in enumerate(objectiveProgresses[index]):
-                objProgressStr += str(progress)
-                if i < len(quest.accessibleObjectives) - 1:
-                    objProgressStr += ','
-            objProgressStr += ']'
-            
+            objProgress = list(objectiveProgresses[index])
+
         # Current Objective Index to use
         curObjIndex = quest.currentObjectiveIndex
-        
-        if len(currentObjectives) > 0 and 0 <= index <= len(currentObjectives):
+
+        if 0 <= index < len(currentObjectives):
             curObjIndex = currentObjectives[index]
-        
+
         # This index is the position of the tracking objective relative to the accessible objectives collection.
         trackObjIndex = -1 if not quest.trackingObjective else quest.accessibleObjectives.index(quest.trackingObjective)
-        
-        sectionString = sectionString % (quest.id,
-            curObjIndex, 
-            trackObjIndex,
-        objProgressStr)
-        
-        dataString += sectionString
-    return dataString, currentObjectives, objectiveProgresses
+
+        questsData.append([quest.id, curObjIndex, trackObjIndex, objProgress])
+
+    return encodeQuestData(trackingId, questsData), currentObjectives, objectiveProgresses
 
 def extractDataAsIntegerLists(dataStr, parseDataFunc = None):
     # If passed the parse data function, it will call that on the integer list
     # generated from every quest's data section.
-    # Extracts data for quests from a string and returns the active quest id 
+    # Extracts data for quests from a string and returns the active quest id
     # followed by a list of quest data with integers.
     # Objective progress is enclosed in an integer list within each quest's list.
-    questsData = []
-    activeQuestId = -1
-    
-    if not len(dataStr) == 0:
-        activeQuestId = int(dataStr[:dataStr.index(' ')])
-        
-        while BLOCK_CLOSING_CHAR in dataStr:
-            questData, cutOffIndex = getDataBlock(dataStr)
-            
-            # Creates an integer list of the progress of the accessible objectives.
-            objProgress = [int(element) for element in questData[3].split(',')]
-            questData[3] = objProgress
-            questsData.append(questData)
-            
-            # If a parse function has been specified, we will call it and pass it
-            # the newly extracted data.
-            if not parseDataFunc is None:
-                parseDataFunc(questData)
-            
-            # Let's remove this section of the data from the string.
-            dataStr = dataStr[cutOffIndex+1:]
+    # Reads both the binary and the legacy string format.
+    if isBinaryData(dataStr):
+        questsIter = iterQuestData(dataStr)
+        activeQuestId = next(questsIter)
+        questsData = list(questsIter)
+    else:
+        activeQuestId, questsData = extractLegacyData(dataStr)
+
+    # If a parse function has been specified, we will call it and pass it
+    # the newly extracted data.
+    if not parseDataFunc is None:
+        for questData in questsData:
+            parseDataFunc(questData)
+
     return activeQuestId, questsData
-    
\ No newline at end of file
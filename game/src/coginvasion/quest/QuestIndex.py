@@ -0,0 +1,98 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file QuestIndex.py
+@author agent
+@date October 18, 2026
+
+@desc Lookup tables over Quests.Quests, built once at import, used to find the quests
+      an avatar is able to pick up without scanning every quest.
+
+"""
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+
+from src.coginvasion.quest import Quests
+
+import random
+
+notify = directNotify.newCategory("QuestIndex")
+
+# tier -> sorted list of questIds in the tier
+QuestsByTier = {}
+
+# questId -> frozenset of questIds that must be in the quest history first
+Prerequisites = {}
+
+# questIds that may only be picked when nothing else in the tier is left
+FinalInTier = frozenset()
+
+def buildIndex():
+    global FinalInTier
+
+    QuestsByTier.clear()
+    Prerequisites.clear()
+
+    final = set()
+
+    # Sorted so that the order of the tier lists never depends on dict ordering,
+    # the client and the AI have to agree on the quests an NPC offers.
+    for questId in sorted(Quests.Quests.keys()):
+        data = Quests.Quests[questId]
+
+        QuestsByTier.setdefault(data[Quests.tier], []).append(questId)
+        Prerequisites[questId] = frozenset(data.get(Quests.requiredQuests, []))
+
+        if data.get(Quests.finalInTier, False) == True:
+            final.add(questId)
+
+    for questId, reqs in Prerequisites.items():
+        for reqQuest in reqs:
+            if not reqQuest in Quests.Quests:
+                notify.warning("Quest %d requires quest %d, which doesn't exist." % (questId, reqQuest))
+
+    FinalInTier = frozenset(final)
+
+def getQuestsInTier(tier):
+    return QuestsByTier.get(tier, [])
+
+def getPrerequisites(questId):
+    return Prerequisites.get(questId, frozenset())
+
+def getEligibleQuests(tier, questHistory):
+    """
+    Returns the questIds in the tier that can be picked by an avatar with the given quest history:
+    not picked before, every prerequisite in the history, and not the final quest of the tier
+    while there are other quests left.
+    """
+
+    history = questHistory if isinstance(questHistory, (set, frozenset)) else set(questHistory)
+
+    eligible = []
+    for questId in getQuestsInTier(tier):
+        if questId in history:
+            # We can't choose quests that we have already chosen or completed!
+            continue
+        if not Prerequisites[questId] <= history:
+            # A required quest is not in our avatar's quest history.
+            continue
+        eligible.append(questId)
+
+    if len(eligible) > 1:
+        # We cannot choose the final quest for our tier if we still have other quests to complete.
+        eligible = [questId for questId in eligible if not questId in FinalInTier]
+
+    return eligible
+
+def sampleQuests(eligible, seed, amount = 3):
+    """Picks `amount` of the eligible quests. The same seed (an NPC's doId) always gives the same picks."""
+
+    if len(eligible) <= amount:
+        return list(eligible)
+
+    generator = random.Random()
+    generator.seed(seed)
+    return generator.sample(eligible, amount)
+
+buildIndex()
@@ -144,8 +144,30 @@ class QuestManagerAI(QuestManagerBase):
         # Update the information on the network and database.
         self.avatar.b_setQuests(questData)
         
+    def getQuestsInOrder(self):
+        """ Returns our quests sorted by id, the order updateQuestData() expects its lists in. """
+        return [self.quests[questId] for questId in sorted(self.quests.keys())]
+
     def updateQuestData(self, currentObjectives = [], objectiveProgresses = []):
-        questData, _, _ = QuestData.toDataStump(self.quests.values(), self.trackingId, currentObjectives, objectiveProgresses)
+        # `currentObjectives` and `objectiveProgresses` go with the quests of getQuestsInOrder().
+        questData = None
+        quests = self.getQuestsInOrder()
+
+        if len(currentObjectives) == 0 and len(objectiveProgresses) > 0:
+            # Only progress is changing, patch just those values into the data we have.
+            progressByQuest = {}
+            for quest, progress in zip(quests, objectiveProgresses):
+                if len(progress) > 0:
+                    progressByQuest[quest.id] = progress
+            questData = QuestData.patchObjectiveProgress(self.avatar.getQuests(), progressByQuest)
+
+            if questData == self.avatar.getQuests():
+                # Nothing changed, don't bother the network or database.
+                return
+
+        if questData is None:
+            questData, _, _ = QuestData.toDataStump(quests, self.trackingId, currentObjectives, objectiveProgresses)
+
         self.avatar.b_setQuests(questData)
 
     def incrementQuestObjectiveProgress(self, questId, objIndex, increment = 1):
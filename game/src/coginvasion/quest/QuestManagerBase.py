@@ -15,8 +15,7 @@ from src.coginvasion.quest.Quest import Quest
 from src.coginvasion.quest import QuestData
 from src.coginvasion.quest import Objectives
 from src.coginvasion.quest import Quests
-
-import random
+from src.coginvasion.quest import QuestIndex
 
 class QuestManagerBase:
     notify = directNotify.newCategory('QuestManagerBase')
@@ -148,52 +147,10 @@ class QuestManagerBase:
         You have to pass in the DistributedHQNPCToonAI instance of the HQ officer that the avatar walked up to.
         """
 
+        eligible = QuestIndex.getEligibleQuests(self.avatar.getTier(), self.avatar.getQuestHistory())
+
         # Each NPC is random!
-        generator = random.Random()
-        generator.seed(npc.doId)
-
-        # This is the final quest list that will eventually hold the quests the avatar can choose.
-        # This variable will be returned at the end of the method.
-        quests = []
-
-        # Our possible quest list is every Quest, right now. We will go down the line and remove quests that shouldn't be available.
-        possibleQuestIds = list(Quests.Quests.keys())
-
-        for questId in possibleQuestIds:
-
-            if Quests.Quests[questId][Quests.tier] != self.avatar.getTier():
-                # This quest isn't in our tier. Remove it from the possible choices.
-                possibleQuestIds.remove(questId)
-                break
-
-            for reqQuest in Quests.Quests[questId].get(Quests.requiredQuests, []):
-                # Some quests need to have other quests completed before they are able to be chosen.
-                if not reqQuest in self.avatar.getQuestHistory() and questId in possibleQuestIds:
-                    # A required quest is not in our avatar's quest history. We can't choose it.
-                    possibleQuestIds.remove(questId)
-
-        for questId in self.avatar.getQuestHistory():
-            if questId in possibleQuestIds:
-                # We can't choose quests that we have already chosen or completed!
-                possibleQuestIds.remove(questId)
-
-        if len(possibleQuestIds) > 1:
-            # We have more than one quest to choose from.
-            for questId in possibleQuestIds:
-
-                if Quests.Quests[questId].get(Quests.finalInTier, False) == True:
-                    # We cannot choose the final quest for our tier if we still have other quests to complete.
-                    possibleQuestIds.remove(questId)
-
-        if len(possibleQuestIds) > 3:
-            # We have 4 or more quests available. Choose a random 3 out of that list.
-            quests += generator.sample(possibleQuestIds, 3)
-        else:
-            # We have less than 4 quests, use the stripped down quest list directly.
-            quests = possibleQuestIds
-
-        # And there's our quest list!
-        return quests
+        return QuestIndex.sampleQuests(eligible, npc.doId)
     
     def makeQuestFromData(self, questDataStump):
         id_ = questDataStump[0]
@@ -45,7 +45,9 @@ class DistributedFuncRotating(DistributedEntity, FSM):
         self.speed = self.getEntityValueFloat("speed")
         self.timeToFull = self.getEntityValueFloat("timeToFull")
         
-        base.materialData.update(PhysicsUtils.makeBulletCollFromGeoms(self.cEntity.getModelNp()))
+        base.materialData.update(PhysicsUtils.makeBulletCollFromGeoms(self.cEntity.getModelNp(),
+                                                                      levelFile = base.bspLevelFile,
+                                                                      modelNum = base.bspLoader.extractModelnum(self.entnum)))
         
     def __getRot(self):
         rot = Vec3(360, 360, 0)
@@ -38,7 +38,9 @@ class DistributedGenerator(DistributedEntity, FSM):
         self.powerDownSound = base.loadSfxOnNode("phase_14/audio/sfx/sewer_generator_winddown.ogg", self.cEntity.getModelNp())
         self.runSound = base.loadSfxOnNode("phase_14/audio/sfx/sewer_generator_hum.ogg", self.cEntity.getModelNp())
         self.runSound.setLoop(True)
-        base.materialData.update(PhysicsUtils.makeBulletCollFromGeoms(self.cEntity.getModelNp()))
+        base.materialData.update(PhysicsUtils.makeBulletCollFromGeoms(self.cEntity.getModelNp(),
+                                                                      levelFile = base.bspLevelFile,
+                                                                      modelNum = base.bspLoader.extractModelnum(self.entnum)))
         
     def setState(self, state):
         self.state = state
@@ -32,7 +32,6 @@ class DistributedSZBossSuitAI(DistributedSuitAI, DistributedEntityAI):
         self.b_setHealth(0)
         
     def delete(self):
-        taskMgr.remove(self.uniqueName('monitorHealth'))
         DistributedEntityAI.delete(self)
         DistributedSuitAI.delete(self)
         self.battleZone = None
@@ -59,7 +58,7 @@ class DistributedSZBossSuitAI(DistributedSuitAI, DistributedEntityAI):
         self.stopAI()
 
         self.b_setParent(CIGlobals.SPRender)
-        taskMgr.add(self.monitorHealth, self.uniqueName('monitorHealth'))
+        self.watchHealth()
         self.startPosHprBroadcast()
         
         spawnflags = self.getEntityValueInt("spawnflags")
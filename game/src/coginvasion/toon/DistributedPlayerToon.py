@@ -102,8 +102,11 @@ class DistributedPlayerToon(DistributedToon, DistributedPlayerToonShared):
         SoundInterval(hpSfx, node = self).start()
         del hpSfx
         
-    def setChat(self, chat):
-        chat = ChatGlobals.filterChat(chat, self.animal)
+    def d_setChat(self, chat):
+        # The AI filters it and sends it out as filteredChat.
+        self.sendUpdate('requestChat', [chat])
+
+    def filteredChat(self, chat):
         DistributedToon.setChat(self, chat)
     
     def goThroughTunnel(self, toZone, inOrOut, requestStatus = None):
@@ -428,6 +431,10 @@ class DistributedPlayerToon(DistributedToon, DistributedPlayerToonShared):
             self.backpack.setLoadout(loadout)
     
     def setBackpackAmmo(self, netString):
+        if len(self.attacks) != 0 and set(self.backpack.fromNetString(netString).keys()) == set(self.attacks.keys()):
+            # Same gags we already have, just update the supplies in place.
+            # Supply changes during battle arrive as deltas through updateAttackAmmo.
+            return self.backpack.updateSuppliesFromNetString(netString)
         if len(self.attackIds) != 0 or len(self.attacks) != 0:
             self.cleanupAttacks()
             self.clearAttackIds()
@@ -13,6 +13,7 @@ share the same code.
 
 from direct.directnotify.DirectNotifyGlobal import directNotify
 from direct.interval.IntervalGlobal import Sequence, Wait, Func
+from direct.task import Task
 
 from src.coginvasion.toon.DistributedToonAI import DistributedToonAI
 from src.coginvasion.toon.ToonGlobals import GAG_START_EVENT
@@ -21,6 +22,7 @@ from src.coginvasion.gags.backpack.BackpackAI import BackpackAI
 from src.coginvasion.gags import GagGlobals
 from src.coginvasion.hood import ZoneUtil
 from src.coginvasion.distributed import AdminCommands
+from src.coginvasion.globals import ChatGlobals
 from src.coginvasion.tutorial.DistributedTutorialAI import DistributedTutorialAI
 from DistributedPlayerToonShared import DistributedPlayerToonShared
 import ToonDNA
@@ -59,6 +61,8 @@ class DistributedPlayerToonAI(DistributedToonAI, DistributedPlayerToonShared):
         self.defaultShard = 0
         self.currentGag = -1
         self.trackExperience = dict(GagGlobals.DefaultTrackExperiences)
+        # Field name -> args of the profile fields the FriendsManagerUD hasn't heard about yet.
+        self.profileChanges = {}
         return
         
     def getHealth(self):
@@ -81,6 +85,7 @@ class DistributedPlayerToonAI(DistributedToonAI, DistributedPlayerToonShared):
             return
         
         DistributedToonAI.b_setHealth(self, hp)
+        self.d_profileChanged('setHealth', [hp])
         
     def b_setMaxHealth(self, hp):
         if self.battleZone and not self.battleZone.getGameRules().useRealHealth():
@@ -88,6 +93,37 @@ class DistributedPlayerToonAI(DistributedToonAI, DistributedPlayerToonShared):
             return
         
         DistributedToonAI.b_setMaxHealth(self, hp)
+        self.d_profileChanged('setMaxHealth', [hp])
+
+    def b_setName(self, name):
+        DistributedToonAI.b_setName(self, name)
+        self.d_profileChanged('setName', [name])
+
+    def b_setDNAStrand(self, strand):
+        DistributedToonAI.b_setDNAStrand(self, strand)
+        self.d_profileChanged('setDNAStrand', [strand])
+
+    def d_profileChanged(self, fieldName, args):
+        # The FriendsManagerUD caches our profile. Health changes a lot in battle,
+        # so the changes are gathered up and sent together every so often.
+        if not self.air or not self.isGenerated():
+            return
+
+        self.profileChanges[fieldName] = args
+        taskName = self.uniqueName('sendProfileChanges')
+        if not taskMgr.hasTaskNamed(taskName):
+            taskMgr.doMethodLater(config.GetFloat('ai-profile-update-delay', 5.0),
+                                  self.__sendProfileChangesTask, taskName)
+
+    def __sendProfileChangesTask(self, task):
+        self.sendProfileChanges()
+        return Task.done
+
+    def sendProfileChanges(self):
+        taskMgr.remove(self.uniqueName('sendProfileChanges'))
+        if self.profileChanges:
+            self.air.netMessenger.send('avatarProfileChanged', [self.doId, self.profileChanges])
+            self.profileChanges = {}
 
     def reqMakeSewer(self):
         # TEMPORARY
@@ -193,12 +229,15 @@ class DistributedPlayerToonAI(DistributedToonAI, DistributedPlayerToonShared):
     def b_setDefaultShard(self, shardId):
         self.d_setDefaultShard(shardId)
         self.setDefaultShard(shardId)
+        self.d_profileChanged('setDefaultShard', [shardId])
 
     def getDefaultShard(self):
         return self.defaultShard
 
     def setLastHood(self, zoneId):
         self.lastHood = zoneId
+        # Our client sets this as it goes from hood to hood.
+        self.d_profileChanged('setLastHood', [zoneId])
 
     def getLastHood(self):
         return self.lastHood
@@ -266,6 +305,7 @@ class DistributedPlayerToonAI(DistributedToonAI, DistributedPlayerToonShared):
     def b_setFriendsList(self, friends):
         self.d_setFriendsList(friends)
         self.setFriendsList(friends)
+        self.d_profileChanged('setFriendsList', [friends])
 
     def getFriendsList(self):
         return self.friends
@@ -303,6 +343,12 @@ class DistributedPlayerToonAI(DistributedToonAI, DistributedPlayerToonShared):
     def d_setChat(self, chat):
         self.sendUpdate('setChat', [chat])
 
+    def requestChat(self, chat):
+        self.d_filteredChat(ChatGlobals.filterChat(chat, self.getAnimal()))
+
+    def d_filteredChat(self, chat):
+        self.sendUpdate('filteredChat', [chat])
+
     def setQuests(self, dataStr):
         self.quests = dataStr
         self.questManager.makeQuestsFromData()
@@ -387,6 +433,8 @@ class DistributedPlayerToonAI(DistributedToonAI, DistributedPlayerToonShared):
                 self.air.dclassesByName['AccountAI'],
                 {"BANNED": 1}
             )
+            # The ClientServicesManager may have the account cached.
+            self.air.netMessenger.send('accountBanned', [accId])
 
         if self.getAccessLevel() > AdminCommands.NoAccess:
             if andBan:
@@ -450,6 +498,7 @@ class DistributedPlayerToonAI(DistributedToonAI, DistributedPlayerToonShared):
     def b_setAccessLevel(self, accessLevel):
         self.sendUpdate('setAccessLevel', [accessLevel])
         self.setAccessLevel(accessLevel)
+        self.d_profileChanged('setAccessLevel', [accessLevel])
 
     def getAccessLevel(self):
         return AdminCommands.NoAccess if not self.role else self.role.accessLevel
@@ -504,6 +553,12 @@ class DistributedPlayerToonAI(DistributedToonAI, DistributedPlayerToonShared):
             else:
                 self.backpack.setSupply(gagId, supply, updateEnabled=False)
 
+    def handleAttackAmmoChanged(self, attack):
+        DistributedToonAI.handleAttackAmmoChanged(self, attack)
+        if self.useBackpack() and self.backpack:
+            # The owner already got the delta, save it with the next snapshot.
+            self.backpack.scheduleSnapshot()
+
     def rebuildBackpack(self):
         self.cleanupAttacks()
         self.clearAttackIds()
@@ -518,7 +573,7 @@ class DistributedPlayerToonAI(DistributedToonAI, DistributedPlayerToonShared):
         
     def getBackpackAmmo(self):
         if self.backpack:
-            self.backpack.netString
+            return self.backpack.netString
         else:
             defaultBackpack = GagGlobals.getDefaultBackpack(isAI = True)
             return defaultBackpack.toNetString()
@@ -567,6 +622,9 @@ class DistributedPlayerToonAI(DistributedToonAI, DistributedPlayerToonShared):
             self.DistributedPlayerToonAI_deleted
         except:
             self.DistributedPlayerToonAI_deleted = 1
+            # Don't let the FriendsManagerUD miss anything from our last moments.
+            self.sendProfileChanges()
+            self.profileChanges = None
             DistributedPlayerToonShared.delete(self)
             self.questManager.cleanup()
             self.questManager = None
@@ -611,5 +669,6 @@ class DistributedPlayerToonAI(DistributedToonAI, DistributedPlayerToonShared):
             del self.lastHood
             del self.defaultShard
             del self.trackExperience
+            del self.profileChanges
             DistributedToonAI.delete(self)
         return
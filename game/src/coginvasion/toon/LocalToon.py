@@ -8,7 +8,7 @@ Copyright (c) CIO Team. All rights reserved.
 """
 
 from panda3d.core import Point3, ConfigVariableBool
-from src.coginvasion.globals import CIGlobals
+from src.coginvasion.globals import CIGlobals, ChatGlobals
 from direct.task import Task
 from DistributedPlayerToon import DistributedPlayerToon
 from SmartCamera import SmartCamera
@@ -277,6 +277,15 @@ class LocalToon(DistributedPlayerToon, BaseLocalAvatar):
 
         self.setPos(node, 0, 0, 0)
 
+    def b_setChat(self, chat):
+        self.d_setChat(chat)
+        # Show it right away, the AI's filter garbles the same words the same way.
+        self.setChat(ChatGlobals.filterChat(chat, self.animal))
+
+    def filteredChat(self, chat):
+        # We already showed it when we said it.
+        pass
+
     def setFriendsList(self, friends):
         DistributedPlayerToon.setFriendsList(self, friends)
         self.cr.friendsManager.d_requestFriendsList()
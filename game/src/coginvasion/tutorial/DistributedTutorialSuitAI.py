@@ -28,7 +28,6 @@ class DistributedTutorialSuitAI(DistributedSuitAI):
         self.walkTrack = None
 
     def delete(self):
-        base.taskMgr.remove(self.uniqueName('monitorHealth'))
         base.taskMgr.remove(self.uniqueName('doAttack'))
         base.taskMgr.remove(self.uniqueName('scwaa'))
         self.stopAttacks()
@@ -60,7 +59,7 @@ class DistributedTutorialSuitAI(DistributedSuitAI):
         self.track.append(Func(self.startAI))
         self.track.start()
         self.b_setParent(CIGlobals.SPRender)
-        taskMgr.add(self.monitorHealth, self.uniqueName('monitorHealth'))
+        self.watchHealth()
 
     def createPath(self, fromCurPos = False):
         durationFactor = 0.2
@@ -91,29 +90,25 @@ class DistributedTutorialSuitAI(DistributedSuitAI):
         self.b_setAnimState('walk')
         self.b_setSuitState(1, startIndex, endIndex)
 
-    def monitorHealth(self, task):
-        if self.health <= 0:
-            self.tutorial.sendUpdateToAvatarId(self.avatarId, 'suitNoHealth', [self.tutPartIndex])
-            self.tutorial.suitsKilled += 1
-            if self.tutorial.suitsKilled == 3:
-                self.battleZone.battleComplete()
-            if self.walkTrack:
-                self.ignore(self.walkTrack.getDoneEvent())
-                self.walkTrack.pause()
-                self.walkTrack = None
-            self.b_setSuitState(0, -1, -1)
-            currentAnim = SuitGlobals.getAnimByName(self.anim)
-            self.clearTrack()
-            base.taskMgr.remove(self.uniqueName('scwaa'))
-            self.stopAttacks()
-            if currentAnim:
-                self.track = Sequence(Wait(currentAnim.getDeathHoldTime()), Func(self.killSuit))
-                self.track.start()
-            else:
-                self.killSuit()
-
-            return Task.done
-        return Task.cont
+    def handleDeath(self):
+        self.tutorial.sendUpdateToAvatarId(self.avatarId, 'suitNoHealth', [self.tutPartIndex])
+        self.tutorial.suitsKilled += 1
+        if self.tutorial.suitsKilled == 3:
+            self.battleZone.battleComplete()
+        if self.walkTrack:
+            self.ignore(self.walkTrack.getDoneEvent())
+            self.walkTrack.pause()
+            self.walkTrack = None
+        self.b_setSuitState(0, -1, -1)
+        currentAnim = SuitGlobals.getAnimByName(self.anim)
+        self.clearTrack()
+        base.taskMgr.remove(self.uniqueName('scwaa'))
+        self.stopAttacks()
+        if currentAnim:
+            self.track = Sequence(Wait(currentAnim.getDeathHoldTime()), Func(self.killSuit))
+            self.track.start()
+        else:
+            self.killSuit()
 
     def setSuit(self, plan, variant = 0):
         DistributedSuitAI.setSuit(self, plan, variant, self.tutorial)
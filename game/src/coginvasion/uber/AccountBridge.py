@@ -0,0 +1,250 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file AccountBridge.py
+@author agent
+@date October 18, 2026
+
+The account bridge maps login usernames to the doIds of their AccountUD objects.
+
+The default backend is an SQLite database in WAL mode. Every mapping is kept in
+memory, so lookups never touch the disk, and new mappings are written in batches
+(group commits) instead of syncing the file once per account. The callback given
+to setAccountId() runs once its mapping is safely on disk, or once storing it failed.
+
+The old anydbm file can still be used with `account-bridge-backend dbm`, and it
+can be imported into SQLite with:
+
+    python -m src.coginvasion.uber.AccountBridge <dbm file> <sqlite file>
+
+"""
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+
+import os
+import sqlite3
+import whichdb
+
+BACKEND_SQLITE = 'sqlite'
+BACKEND_DBM = 'dbm'
+
+class AccountBridge:
+    """Base class for account bridge backends."""
+
+    notify = directNotify.newCategory("AccountBridge")
+
+    def getAccountId(self, username):
+        """Returns the account doId for the username, or 0 if there isn't one."""
+        raise NotImplementedError
+
+    def hasAccount(self, username):
+        return self.getAccountId(username) != 0
+
+    def setAccountId(self, username, accountId, callback = None):
+        """
+        Stores the account doId for the username.
+        `callback` is called with True once the mapping is durable, or with
+        False if it couldn't be stored.
+        """
+        raise NotImplementedError
+
+    def getNumAccounts(self):
+        raise NotImplementedError
+
+    def items(self):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+class DBMAccountBridge(AccountBridge):
+    """The legacy anydbm backend. Syncs the whole file on every new account."""
+
+    notify = directNotify.newCategory("DBMAccountBridge")
+
+    def __init__(self, filename, flag = 'c'):
+        import anydbm
+        self.dbm = anydbm.open(filename, flag)
+
+    def getAccountId(self, username):
+        return int(self.dbm.get(str(username), 0))
+
+    def setAccountId(self, username, accountId, callback = None):
+        self.dbm[str(username)] = str(accountId)
+        if getattr(self.dbm, 'sync', None):
+            self.dbm.sync()
+        else:
+            self.notify.warning("failed to store an account id in the database.")
+            if callback:
+                callback(False)
+            return
+        if callback:
+            callback(True)
+
+    def getNumAccounts(self):
+        return len(self.dbm)
+
+    def items(self):
+        for username in self.dbm.keys():
+            yield (username, int(self.dbm[username]))
+
+    def close(self):
+        if self.dbm is not None:
+            self.dbm.close()
+            self.dbm = None
+
+class SQLiteAccountBridge(AccountBridge):
+    """
+    SQLite (WAL) backend with an in-memory read cache and batched commits.
+    """
+
+    notify = directNotify.newCategory("SQLiteAccountBridge")
+
+    def __init__(self, filename, commitInterval = 0.25, commitBatchSize = 64):
+        self.filename = filename
+        self.commitInterval = commitInterval
+        self.commitBatchSize = commitBatchSize
+
+        dirname = os.path.dirname(filename)
+        if dirname and not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        self.db = sqlite3.connect(filename)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL is still safe against corruption, and a commit
+        # only has to wait on a checkpoint now and then.
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS accounts ("
+                        "username TEXT PRIMARY KEY NOT NULL, "
+                        "account_id INTEGER NOT NULL)")
+        self.db.commit()
+
+        # username -> accountId, every account in the table.
+        self.cache = {}
+        for username, accountId in self.db.execute("SELECT username, account_id FROM accounts"):
+            self.cache[str(username)] = int(accountId)
+
+        # [(username, accountId, callback)] waiting for the next commit.
+        self.pending = []
+        self.commitTaskName = 'SQLiteAccountBridge-commit-{0}'.format(id(self))
+
+        self.notify.info("Loaded {0} accounts from {1}".format(len(self.cache), filename))
+
+    def getAccountId(self, username):
+        return self.cache.get(str(username), 0)
+
+    def setAccountId(self, username, accountId, callback = None):
+        username = str(username)
+        accountId = int(accountId)
+        self.cache[username] = accountId
+        self.pending.append((username, accountId, callback))
+
+        if len(self.pending) >= self.commitBatchSize:
+            self.flush()
+        elif len(self.pending) == 1:
+            # First write of a new batch, commit it (and anything else that
+            # comes in) shortly.
+            taskMgr.doMethodLater(self.commitInterval, self.__commitTask, self.commitTaskName)
+
+    def __commitTask(self, task):
+        self.flush()
+        return task.done
+
+    def flush(self):
+        if not self.pending:
+            return
+
+        taskMgr.remove(self.commitTaskName)
+
+        batch = self.pending
+        self.pending = []
+
+        try:
+            self.db.executemany("INSERT OR REPLACE INTO accounts (username, account_id) VALUES (?, ?)",
+                                [(username, accountId) for username, accountId, _ in batch])
+            self.db.commit()
+        except sqlite3.Error as e:
+            self.notify.warning("failed to store {0} account ids in the database: {1}".format(len(batch), e))
+            self.db.rollback()
+            for username, _, _ in batch:
+                self.cache.pop(username, None)
+            # Don't leave the logins waiting on this batch hanging.
+            for _, _, callback in batch:
+                if callback:
+                    callback(False)
+            return
+
+        self.notify.debug("Committed {0} accounts.".format(len(batch)))
+
+        for _, _, callback in batch:
+            if callback:
+                callback(True)
+
+    def importAccounts(self, items):
+        """Bulk inserts (username, accountId) pairs in a single transaction."""
+        items = [(str(username), int(accountId)) for username, accountId in items]
+        self.db.executemany("INSERT OR REPLACE INTO accounts (username, account_id) VALUES (?, ?)", items)
+        self.db.commit()
+        for username, accountId in items:
+            self.cache[username] = accountId
+        return len(items)
+
+    def getNumAccounts(self):
+        return len(self.cache)
+
+    def items(self):
+        return self.cache.items()
+
+    def close(self):
+        self.flush()
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+def migrateDBM(dbmFilename, bridge):
+    """Copies every account from a legacy anydbm bridge file into `bridge`."""
+    legacy = DBMAccountBridge(dbmFilename, 'r')
+    try:
+        return bridge.importAccounts(legacy.items())
+    finally:
+        legacy.close()
+
+def makeAccountBridge():
+    """Opens the account bridge backend chosen in the config."""
+
+    backend = config.GetString('account-bridge-backend', BACKEND_SQLITE)
+    dbmFilename = config.GetString('account-bridge-filename', 'astron/databases/account-bridge.db')
+
+    if backend == BACKEND_DBM:
+        return DBMAccountBridge(dbmFilename)
+
+    if backend != BACKEND_SQLITE:
+        AccountBridge.notify.warning("Unknown account-bridge-backend {0}, using {1}".format(backend, BACKEND_SQLITE))
+
+    bridge = SQLiteAccountBridge(
+        config.GetString('account-bridge-sqlite-filename', 'astron/databases/account-bridge.sqlite'),
+        config.GetFloat('account-bridge-commit-interval', 0.25),
+        config.GetInt('account-bridge-commit-batch', 64))
+
+    if bridge.getNumAccounts() == 0 and whichdb.whichdb(dbmFilename):
+        # First run on SQLite, bring over the accounts from the old dbm file.
+        AccountBridge.notify.info("Migrating accounts from {0}...".format(dbmFilename))
+        num = migrateDBM(dbmFilename, bridge)
+        AccountBridge.notify.info("Migrated {0} accounts.".format(num))
+
+    return bridge
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print "usage: python -m src.coginvasion.uber.AccountBridge <dbm file> <sqlite file>"
+        sys.exit(1)
+
+    bridge = SQLiteAccountBridge(sys.argv[2])
+    print "Migrated {0} accounts.".format(migrateDBM(sys.argv[1], bridge))
+    bridge.close()
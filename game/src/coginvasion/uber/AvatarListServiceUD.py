@@ -0,0 +1,257 @@
+"""
+COG INVASION ONLINE
+Copyright (c) CIO Team. All rights reserved.
+
+@file AvatarListServiceUD.py
+@author agent
+@date October 18, 2026
+
+"""
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+
+class AccountListEntry:
+
+    def __init__(self, accFields, avList, expireTime):
+        self.accFields = accFields
+        self.avList = avList
+        self.expireTime = expireTime
+
+class AvatarListRequest:
+    """Gathers the toons on an account for everyone waiting on the avatar list."""
+
+    def __init__(self, service, accId):
+        self.service = service
+        self.accId = accId
+        self.callbacks = []
+        self.accFields = None
+        self.avList = []
+        self.pendingAvatars = set()
+        # Set if the account's toons changed while we were building the list.
+        self.stale = False
+
+    def addCallback(self, callback):
+        self.callbacks.append(callback)
+
+    def start(self):
+        self.service.getAccount(self.accId, self.accountResp)
+
+    def accountResp(self, accFields):
+        if accFields is None:
+            self.finish()
+            return
+
+        self.accFields = accFields
+        avIds = accFields['AVATAR_IDS']
+
+        for avId in avIds:
+            if avId != 0:
+                self.pendingAvatars.add(avId)
+
+        if not self.pendingAvatars:
+            self.finish()
+            return
+
+        # Ask for all of the toons at once. The responses come back in whatever
+        # order the database gets to them.
+        for avId in list(self.pendingAvatars):
+            self.service.queryObject(self.accId, avId,
+                                     lambda dclass, fields, avId = avId: self.toonResp(avId, dclass, fields),
+                                     'DistributedPlayerToonUD', AvatarListServiceUD.ToonFields)
+
+    def toonResp(self, avId, dclass, fields):
+        if avId not in self.pendingAvatars:
+            return
+        self.pendingAvatars.remove(avId)
+
+        air = self.service.air
+        if dclass == air.dclassesByName['DistributedPlayerToonUD'] and fields:
+            if fields.get('ACCOUNT', None) is None:
+                print "No field ACCOUNT in this toon, I'll add it for you."
+                air.dbInterface.updateObject(
+                    air.dbId,
+                    avId,
+                    air.dclassesByName['DistributedPlayerToonUD'],
+                    {"ACCOUNT": self.accId})
+            self.avList.append([avId, fields['setDNAStrand'][0],
+                                fields['setName'][0],
+                                self.accFields['AVATAR_IDS'].index(avId),
+                                fields['setLastHood'][0]])
+        else:
+            self.service.notify.warning("Couldn't get toon {0} on account {1}".format(avId, self.accId))
+
+        if not self.pendingAvatars:
+            self.finish()
+
+    def finish(self):
+        self.service.requestDone(self)
+        for callback in self.callbacks:
+            callback(self.accFields, self.avList)
+        self.cleanup()
+
+    def cleanup(self):
+        self.service = None
+        self.callbacks = None
+        self.accFields = None
+        self.avList = None
+        self.pendingAvatars = None
+
+class AvatarListServiceUD:
+    """
+    Builds the character select avatar list for the ClientServicesManager.
+
+    Only the fields the list needs are fetched from each toon, and all of the toon
+    queries go out together. Requests for the same account while a list is being
+    built share that one set of queries.
+
+    Finished lists are cached for `avatar-list-cache-ttl` seconds so that the
+    account isn't fetched again when the player picks a toon. The cache for an
+    account must be invalidated before a toon is created or deleted on it, and when
+    it is banned. It's thrown out when the account logs in, so the first list of a
+    login (and the BANNED field that comes with it) is always read from the database.
+
+    Astron's database server has no way to get several objects in one message, so
+    a list takes one query for the account and one for each toon on it.
+
+    The number of database round trips made for each login is counted and
+    logged when the avatar list goes out.
+    """
+
+    notify = directNotify.newCategory("AvatarListServiceUD")
+
+    ToonFields = ('ACCOUNT', 'setDNAStrand', 'setName', 'setLastHood')
+
+    def __init__(self, air):
+        self.air = air
+        self.cacheTTL = config.GetFloat('avatar-list-cache-ttl', 30.0)
+
+        # accId -> AccountListEntry
+        self.cache = {}
+        # accId -> AvatarListRequest
+        self.requests = {}
+        # accId -> database round trips since the account logged in.
+        self.loginRoundTrips = {}
+
+        self.resetStats()
+
+    def cleanup(self):
+        self.cache = None
+        self.requests = None
+        self.loginRoundTrips = None
+        self.air = None
+
+    def resetStats(self):
+        self.stats = {
+            'roundTrips' : 0,
+            'hits'       : 0,
+            'misses'     : 0,
+            'coalesced'  : 0
+        }
+
+    def getStats(self):
+        stats = dict(self.stats)
+        stats['cached'] = len(self.cache)
+        stats['pending'] = len(self.requests)
+        return stats
+
+    def accountLoggedIn(self, accId):
+        """Starts counting round trips for a new login on the account."""
+        self.loginRoundTrips[accId] = 0
+        self.invalidate(accId)
+
+    def getLoginRoundTrips(self, accId):
+        return self.loginRoundTrips.get(accId, 0)
+
+    def invalidate(self, accId):
+        """Throws out the cached account and avatar list. Call when the account's toons change."""
+        self.cache.pop(accId, None)
+        request = self.requests.get(accId, None)
+        if request is not None:
+            # It may have read the account before the change, don't cache what it gets.
+            request.stale = True
+
+    def __countRoundTrip(self, accId):
+        self.stats['roundTrips'] += 1
+        if accId in self.loginRoundTrips:
+            self.loginRoundTrips[accId] += 1
+
+    def __getEntry(self, accId):
+        entry = self.cache.get(accId, None)
+        if entry is None:
+            return None
+        if globalClock.getFrameTime() >= entry.expireTime:
+            del self.cache[accId]
+            return None
+        return entry
+
+    def queryObject(self, accId, doId, callback, dclassName = None, fieldNames = ()):
+        """
+        Queries a database object on behalf of the account, counting the round trip
+        against its login. Only `fieldNames` are fetched if they are given.
+        """
+
+        self.__countRoundTrip(accId)
+        if fieldNames:
+            self.air.dbInterface.queryObject(
+                self.air.dbId, doId, callback,
+                self.air.dclassesByName[dclassName], fieldNames)
+        else:
+            self.air.dbInterface.queryObject(self.air.dbId, doId, callback)
+
+    def getAccount(self, accId, callback):
+        """
+        Calls `callback` with the account's fields, or None if it isn't an account.
+        Uses the cached fields if they haven't expired.
+        """
+
+        entry = self.__getEntry(accId)
+        if entry is not None:
+            self.stats['hits'] += 1
+            callback(entry.accFields)
+            return
+
+        self.stats['misses'] += 1
+
+        def accountResp(dclass, fields):
+            if dclass != self.air.dclassesByName['AccountUD']:
+                callback(None)
+                return
+            callback(fields)
+
+        self.queryObject(accId, accId, accountResp)
+
+    def getAvatarList(self, accId, callback):
+        """
+        Calls `callback` with (account fields, avatar list) for the account.
+        The account fields are None if the account couldn't be found.
+        """
+
+        entry = self.__getEntry(accId)
+        if entry is not None:
+            self.stats['hits'] += 1
+            callback(entry.accFields, entry.avList)
+            return
+
+        request = self.requests.get(accId, None)
+        if request is not None:
+            # Already building this list, wait for it.
+            self.stats['coalesced'] += 1
+            request.addCallback(callback)
+            return
+
+        request = AvatarListRequest(self, accId)
+        request.addCallback(callback)
+        self.requests[accId] = request
+        request.start()
+
+    def requestDone(self, request):
+        accId = request.accId
+        if self.requests.get(accId, None) is request:
+            del self.requests[accId]
+
+        if request.accFields is not None and not request.stale:
+            self.cache[accId] = AccountListEntry(request.accFields, list(request.avList),
+                                                 globalClock.getFrameTime() + self.cacheTTL)
+
+        self.notify.info("Avatar list for account {0} took {1} database round trips this login.".format(
+            accId, self.getLoginRoundTrips(accId)))
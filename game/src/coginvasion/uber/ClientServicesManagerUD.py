@@ -17,8 +17,9 @@ from direct.directnotify.DirectNotifyGlobal import directNotify
 from src.coginvasion.gags import GagGlobals
 from src.coginvasion.distributed import AdminCommands
 from src.coginvasion.hood import ZoneUtil
+from src.coginvasion.uber.AccountBridge import makeAccountBridge
+from src.coginvasion.uber.AvatarListServiceUD import AvatarListServiceUD
 from panda3d.core import NetDatagram
-import anydbm
 import os
 
 class CreateToonProcess:
@@ -33,6 +34,8 @@ class CreateToonProcess:
         self.accFields = None
         self.newToonId = 0
         self.avList = None
+        # The account's toons are about to change.
+        self.csm.avatarList.invalidate(accountId)
         self.csm.queryAccount(accountId, self.accountResp)
 
     def cleanup(self):
@@ -47,6 +50,7 @@ class CreateToonProcess:
 
     def avatarCreateDone(self):
         self.notify.info("Avatar creation done.")
+        self.csm.avatarList.invalidate(self.accountId)
         self.csm.sendUpdateToAccountId(self.accountId, 'toonCreated', [self.newToonId])
         self.cleanup()
 
@@ -126,9 +130,10 @@ class ClientServicesManagerUD(DistributedObjectGlobalUD):
 
     def __init__(self, air):
         DistributedObjectGlobalUD.__init__(self, air)
-        filename = base.config.GetString('account-bridge-filename',
-                    'astron/databases/account-bridge.db')
-        self.dbm = anydbm.open(filename, 'c')
+        # Maps usernames to account ids, see AccountBridge.
+        self.accountBridge = makeAccountBridge()
+        self.avatarList = AvatarListServiceUD(air)
+        self.air.netMessenger.accept('accountBanned', self, self.avatarList.invalidate)
         self.private__dg = PyDatagram()
         return
 
@@ -160,15 +165,16 @@ class ClientServicesManagerUD(DistributedObjectGlobalUD):
         self.notify.info("Fields %s" % fields)
 
         def storeAccountID(accountId):
-            self.dbm[str(username)] = str(accountId)
             self.notify.info("storing id...")
-            if getattr(self.dbm, 'sync', None):
-                self.dbm.sync()
-                self.notify.info("synced db file.")
-            else:
-                self.notify.warning("failed to store an account id in the database.")
-                return
-            self.setAccount(sender, accountId)
+
+            def accountIdStored(success):
+                if not success:
+                    self.air.eject(sender, EC_INVALID_ACCOUNT, 'Your account could not be created, please try again.')
+                    return
+                self.setAccount(sender, accountId)
+
+            # The bridge batches writes, we log in once ours has been committed.
+            self.accountBridge.setAccountId(username, accountId, accountIdStored)
 
         def handleCreate(accountId):
             if not accountId:
@@ -208,6 +214,8 @@ class ClientServicesManagerUD(DistributedObjectGlobalUD):
         dg.addChannel(accountId << 32)
         self.air.send(dg)
 
+        self.avatarList.accountLoggedIn(accountId)
+
         # Unsandbox the client.
         self.unsandboxClient(sender)
         self.d_loginAccepted(sender)
@@ -372,20 +380,28 @@ class ClientServicesManagerUD(DistributedObjectGlobalUD):
             self.air.eject(sender, EC_BAD_TOKEN, 'I have rejected your token.')
             return
 
-        accountId = int(self.dbm.get(str(username), 0))
+        accountId = self.accountBridge.getAccountId(username)
 
-        if str(username) not in self.dbm:
+        if not accountId:
             self.createAccount(username, accountId, sender)
             self.notify.info("Creating a new account...")
         else:
             self.setAccount(sender, accountId)
             self.notify.info("Account already exists!")
 
+    def delete(self):
+        self.accountBridge.close()
+        self.accountBridge = None
+        self.air.netMessenger.ignore('accountBanned', self)
+        self.avatarList.cleanup()
+        self.avatarList = None
+        DistributedObjectGlobalUD.delete(self)
+
     def d_loginAccepted(self, sender):
         self.sendUpdateToChannel(sender, 'loginAccepted', [])
         
     def d_networkMessage(self, message):
-        for avId in self.air.friendsManager.toonsOnline:
+        for avId in self.air.friendsManager.presence.getOnlineAvIds():
             self.sendUpdateToAvatarId(avId, 'networkMessage', [message])
 
     def requestAvatars(self):
@@ -397,71 +413,33 @@ class ClientServicesManagerUD(DistributedObjectGlobalUD):
         self.queryAccount(accountId)
 
     def queryAccount(self, accountId, callback = None):
-
-        def accountResp(dclass, fields):
-            if dclass != self.air.dclassesByName['AccountUD']:
-                return
-            self.queryToons(fields, accountId)
-
         if callback:
-            self.air.dbInterface.queryObject(
-                self.air.dbId, accountId,
-                callback)
+            self.avatarList.queryObject(accountId, accountId, callback)
         else:
-            self.air.dbInterface.queryObject(
-                    self.air.dbId, accountId,
-                    accountResp)
-
-    def queryToons(self, accFields, accId):
-        collectedAvatars = []
-        pendingAvatars = set()
-        avId = 0
-
-        for avId in accFields['AVATAR_IDS']:
-            if avId != 0:
-                pendingAvatars.add(avId)
-
-                def toonResponse(dclass, fields, avId=avId):
-                    if dclass != self.air.dclassesByName['DistributedPlayerToonUD']:
-                        return
-                    if fields.get('ACCOUNT', None) is None:
-                        print "No field ACCOUNT in this toon, I'll add it for you."
-                        self.air.dbInterface.updateObject(
-                            self.air.dbId,
-                            avId,
-                            self.air.dclassesByName['DistributedPlayerToonUD'],
-                            {"ACCOUNT": accId}
-                        )
-                    collectedAvatars.append([avId, fields['setDNAStrand'][0],
-                            fields['setName'][0],
-                            accFields['AVATAR_IDS'].index(avId),
-                            fields['setLastHood'][0]])
-                    pendingAvatars.remove(avId)
-                    if not pendingAvatars:
-                        self.sendToons(collectedAvatars, accId)
-
-                self.air.dbInterface.queryObject(
-                        self.air.dbId, avId,
-                        toonResponse)
-
-        if not pendingAvatars:
-            self.sendToons(collectedAvatars, accId)
-
-        sender = self.GetAccountConnectionChannel(accId)
-
-        def checkAccountBanStatus(dclass, fields):
-            if dclass != self.air.dclassesByName['AccountUD']:
-                return
-            if fields.get("BANNED") == 1:
-                self.air.eject(sender, 0, 'You are banned.')
-            elif fields.get("BANNED", None) is None:
-                self.air.dbInterface.updateObject(
-                    self.air.dbId,
-                    accId,
-                    self.air.dclassesByName['AccountUD'],
-                    {"BANNED": 0})
+            self.avatarList.getAvatarList(accountId,
+                lambda accFields, avList: self.queryToons(accFields, avList, accountId))
 
-        self.queryAccount(accId, checkAccountBanStatus)
+    def queryToons(self, accFields, avList, accId):
+        # The AvatarListServiceUD has gathered the toons on the account.
+        if accFields is None:
+            return
+
+        # The account fields were read fresh when the account logged in, and a ban
+        # since then has thrown them out of the cache (see AvatarListServiceUD).
+        banned = accFields.get('BANNED', None)
+        if banned == 1:
+            self.avatarList.invalidate(accId)
+            self.air.eject(self.GetAccountConnectionChannel(accId), 0, 'You are banned.')
+            return
+        elif banned is None:
+            self.air.dbInterface.updateObject(
+                self.air.dbId,
+                accId,
+                self.air.dclassesByName['AccountUD'],
+                {"BANNED": 0})
+            accFields["BANNED"] = 0
+
+        self.sendToons(avList, accId)
 
     def sendToons(self, avs, accId):
         print avs
@@ -479,6 +457,9 @@ class ClientServicesManagerUD(DistributedObjectGlobalUD):
         avPos = avList.index(avId)
         avList[avPos] = 0
 
+        # The account's toons are about to change.
+        self.avatarList.invalidate(accountId)
+
         def deleteToonDone(fields):
             if fields:
                 self.notify.warning("Failed to delete toon on the account database!")
@@ -486,6 +467,7 @@ class ClientServicesManagerUD(DistributedObjectGlobalUD):
             self.notify.info("account fields update finished, deleting toon database file...")
             # Finally, delete the toon database file.
             os.remove("astron/databases/astrondb/" + str(avId) + ".yaml")
+            self.avatarList.invalidate(accountId)
             callback()
 
         # Then, update the account object fields on the database.
@@ -538,17 +520,15 @@ class ClientServicesManagerUD(DistributedObjectGlobalUD):
                 return
             self.setAvatar(fields, avId, accountId)
 
-        def accountResp(dclass, fields):
-            if dclass != self.air.dclassesByName['AccountUD']:
+        def accountResp(fields):
+            if fields is None:
                 return
             if not avId in fields['AVATAR_IDS']:
                 self.notify.warning("Client tried to play an avatar that doesn't belong to them or doesn't exist!")
                 self.air.eject(sender, EC_NON_EXISTENT_AV, "Client tried to play an avatar that doesn't belong to them or doesn't exist!")
                 return
 
-            self.air.dbInterface.queryObject(
-                                self.air.dbId,
-                                avId,
-                                __handleAvatar)
+            self.avatarList.queryObject(accountId, avId, __handleAvatar)
 
-        self.queryAccount(accountId, accountResp)
+        # Usually the account is still cached from the avatar list.
+        self.avatarList.getAccount(accountId, accountResp)